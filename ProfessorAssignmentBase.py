@@ -94,6 +94,24 @@ professor_load = {
     "Prof_E": 5,
 }
 
+# Eligible Pairs:
+# A cost of 999 (or more) means the professor cannot teach the course, so there
+# is no point in giving the solver a variable for that pair. We build, once, the
+# list of pairs that are actually allowed, plus an index of those pairs for each
+# course and each professor. In real data most pairs are ineligible, so the model
+# below grows with the number of eligible pairs rather than with
+# (number of professors) x (number of courses).
+FORBIDDEN_COST = 999
+
+ELIGIBLE_PAIRS = [
+    (p, c) for p in PROFESSORS for c in COURSES if preferences[p][c] < FORBIDDEN_COST
+]
+PROFESSORS_FOR_COURSE = {c: [] for c in COURSES}
+COURSES_FOR_PROFESSOR = {p: [] for p in PROFESSORS}
+for p, c in ELIGIBLE_PAIRS:
+    PROFESSORS_FOR_COURSE[c].append(p)
+    COURSES_FOR_PROFESSOR[p].append(c)
+
 # --- 3. Set up the Linear Programming Model ---
 
 # We create an instance of a PuLP problem. We can give it a name.
@@ -110,11 +128,11 @@ model = pulp.LpProblem("Professor_Course_Assignment", pulp.LpMinimize)
 # (yes or no), so we use binary variables.
 #
 # The variable `x_pc` will be 1 if Professor P is assigned to Course C, and 0 otherwise.
-# We will create one such variable for every possible professor-course pair.
-# We use a dictionary to store these variables for easy access.
+# We will create one such variable for every eligible professor-course pair.
+# We use a dictionary keyed by (professor, course) to store these variables.
 assignment_vars = pulp.LpVariable.dicts(
     "Assignment",  # A prefix for the variable names
-    (PROFESSORS, COURSES), # A tuple defining the indices of the dictionary
+    ELIGIBLE_PAIRS, # The (professor, course) pairs that get a variable
     cat='Binary'  # The category of variable: Binary (0 or 1)
 )
 
@@ -123,13 +141,13 @@ assignment_vars = pulp.LpVariable.dicts(
 # The objective function is the value we want to minimize or maximize.
 # We want to minimize the sum of the preference scores for all assignments made.
 #
-# The formula is: SUM ( preference_pc * assignment_vars_pc ) for all p in PROFESSORS and c in COURSES.
+# The formula is: SUM ( preference_pc * assignment_vars_pc ) for all eligible pairs (p, c).
 #
 # The `pulp.lpSum()` function is a convenient way to build this summation expression.
-# We iterate through all professor-course pairs and add their contribution
+# We iterate through the eligible professor-course pairs and add their contribution
 # (preference cost * decision variable) to the total sum.
 objective_function = pulp.lpSum(
-    [preferences[p][c] * assignment_vars[p][c] for p in PROFESSORS for c in COURSES]
+    [preferences[p][c] * assignment_vars[(p, c)] for p, c in ELIGIBLE_PAIRS]
 )
 
 # We add the objective function to our model.
@@ -143,10 +161,10 @@ model += objective_function, "Total_Preference_Cost"
 # Constraint 1: Each course must be taught the required number of times.
 # For each course 'c', the sum of assignments from all professors to that course
 # must equal the demand for that course.
-# SUM ( assignment_vars_pc ) for all p in PROFESSORS == course_demand_c
+# SUM ( assignment_vars_pc ) for all eligible p == course_demand_c
 for c in COURSES:
     model += (
-        pulp.lpSum([assignment_vars[p][c] for p in PROFESSORS]) == course_demand[c],
+        pulp.lpSum([assignment_vars[(p, c)] for p in PROFESSORS_FOR_COURSE[c]]) == course_demand[c],
         f"Course_{c}_Demand_Constraint" # A descriptive name for the constraint
     )
 
@@ -156,7 +174,7 @@ for c in COURSES:
 # for all c in COURSES <= professor_max_load_p
 for p in PROFESSORS:
     model += (
-        pulp.lpSum([assignment_vars[p][c] for c in COURSES]) == professor_load[p],
+        pulp.lpSum([assignment_vars[(p, c)] for c in COURSES_FOR_PROFESSOR[p]]) == professor_load[p],
         f"Professor_{p}_Load_Constraint" # A descriptive name for the constraint
     )
 
@@ -175,30 +193,44 @@ print("Solver finished.")
 status = pulp.LpStatus[model.status]
 print(f"Solution Status: {status}\n")
 
+# By default only the summary below is printed. Set this to True to also print
+# every assignment; on a large catalog that can be tens of thousands of lines.
+SHOW_ALL_ASSIGNMENTS = False
+
 # If an optimal solution was found, we can inspect the results.
 if model.status == pulp.LpStatusOptimal:
     print("Optimal Assignment Found:")
-    total_cost = 0
-    assigned_count = 0
-    # We iterate through the decision variables.
+    # We read each decision variable exactly once and keep the assigned pairs as
+    # a compact list of (professor, course, preference) triples. Everything
+    # below (printing, totals, saving to a file) works from this list.
     # The `varValue` attribute holds the optimal value (0 or 1) found by the solver.
-    for p in PROFESSORS:
-        for c in COURSES:
-            if assignment_vars[p][c].varValue == 1:
-                preference_score = preferences[p][c]
-                print(f"  - Assign {p} to {c} (Preference Score: {preference_score})")
-                total_cost += preference_score
-                assigned_count += 1
+    assignments = [
+        (p, c, preferences[p][c])
+        for (p, c), var in assignment_vars.items()
+        if var.varValue is not None and round(var.varValue) == 1
+    ]
+
+    if SHOW_ALL_ASSIGNMENTS:
+        print("\n".join(
+            f"  - Assign {p} to {c} (Preference Score: {score})" for p, c, score in assignments
+        ))
     
     # Print the final objective value, which is the total preference cost.
     objective_value = pulp.value(model.objective)
     print(f"\nTotal Preference Cost (minimized): {objective_value}")
+    print(f"Number of Assignments: {len(assignments)}")
     
     # Calculate and print the average preference score.
-    if assigned_count > 0:
-        average_preference = objective_value / assigned_count
+    if assignments:
+        average_preference = objective_value / len(assignments)
         print(f"Average Preference Score per Assignment: {average_preference:.2f}")
 
+    # To save the assignments instead of (or as well as) printing them, write the
+    # triples out in one go, for example:
+    #     import csv
+    #     with open("assignments.csv", "w", newline="") as f:
+    #         csv.writer(f).writerows([("ProfessorName", "CourseName", "Preference")] + assignments)
+
 else:
     print("No optimal solution found. The problem may be infeasible or unbounded.")
 
@@ -9,9 +9,23 @@ various constraints like course demand and professor workload.
 This version is modularized into functions to separate data loading, model building,
 and results display, making it easier to maintain and adapt.
 """
-import pulp
-import pandas as pd  # Required for the CSV data loading function
-# import sqlite3       # Required for the database data loading function
+import time
+_STARTED = time.perf_counter()  # the command line reports its startup time from here
+
+import os
+import sqlite3       # Required for the database data loading function
+
+import numpy as np
+
+# pulp, pandas and SciPy take most of the import time, so they are imported
+# only by the functions that need them (PuLP engine, CSV loader, precheck).
+from backends import BACKEND_ORDER, select_backend
+from eligibility import FORBIDDEN_COST, EligibilityIndex, build_eligibility_index
+from instrumentation import SolveStats, publish
+from problemInstance import ProblemInstance
+from results import extract_assignment, write_results
+from solution import (SOLUTION_STATUSES, STATUS_INFEASIBLE, STATUS_NAMES, STATUS_OPTIMAL,
+                      AssignmentRow, SolvedModel, build_assignment_vars)
 
 # --- 1. Data Loading Functions ---
 
@@ -21,8 +35,9 @@ def get_data_hardcoded():
     This is useful for testing and simple examples.
     
     Returns:
-        tuple: A tuple containing professors, courses, preferences,
-               course_demand, and professor_load.
+        ProblemInstance: The instance, with every listed pair kept (including
+                         the 999 ones). It unpacks as professors, courses,
+                         preferences, course_demand, and professor_load.
     """
     print("Loading hardcoded data set...")
     professors = [
@@ -54,12 +69,48 @@ def get_data_hardcoded():
         "Prof_A": 5, "Prof_B": 5, "Prof_C": 5, "Prof_D": 5, "Prof_E": 5,
     }
     
-    return professors, courses, preferences, course_demand, professor_load
-
-def get_data_from_csvs(folder_path="."):
+    return ProblemInstance.from_data(professors, courses, preferences, course_demand, professor_load)
+
+CSV_CHUNK_SIZE = 1_000_000
+
+def _read_name_table(path, column):
+    """Reads a one-column name table and checks that the names are unique."""
+    import pandas as pd
+    names = pd.read_csv(path, usecols=[column], dtype={column: str})[column]
+    duplicated = names[names.duplicated()]
+    if not duplicated.empty:
+        raise ValueError(f"{path}: duplicate {column} values: {duplicated.unique()[:10].tolist()}")
+    return names.tolist()
+
+def _read_amounts(path, key_column, value_column, names):
+    """Reads a (name, amount) table into a vector aligned with `names`."""
+    import pandas as pd
+    df = pd.read_csv(path, usecols=[key_column, value_column],
+                     dtype={key_column: str, value_column: np.int64})
+    ids = pd.Categorical(df[key_column], categories=names).codes
+    unknown = df[key_column][ids < 0]
+    if not unknown.empty:
+        raise ValueError(f"{path}: unknown {key_column} values: {unknown.unique()[:10].tolist()}")
+    counts = np.bincount(ids, minlength=len(names))
+    if (counts != 1).any():
+        bad = [names[i] for i in np.flatnonzero(counts != 1)[:10]]
+        raise ValueError(f"{path}: each {key_column} must appear exactly once; check {bad}")
+    values = np.zeros(len(names), dtype=np.int64)
+    values[ids] = df[value_column].to_numpy()
+    return values
+
+def get_data_from_csvs(folder_path=".", chunksize=CSV_CHUNK_SIZE, forbidden_cost=FORBIDDEN_COST):
     """
     Loads the optimization problem data from a set of CSV files.
-    This function is a placeholder and demonstrates how you would implement it.
+
+    The long-format preferences file can have tens of millions of rows, so it is
+    read in chunks with explicit dtypes. Professor and course names are interned
+    to dense integer ids (their positions in professors.csv and courses.csv),
+    every chunk is checked for referential integrity in a vectorized pass, and
+    only eligible pairs (cost below `forbidden_cost`) are kept. The data comes
+    back as an array-backed ProblemInstance whose preferences are an
+    EligibilityIndex, which can be used wherever the nested preference
+    dictionary is expected.
 
     Expected CSV formats:
     - professors.csv: A single column "ProfessorName"
@@ -67,175 +118,648 @@ def get_data_from_csvs(folder_path="."):
     - course_demand.csv: Columns "CourseName", "Demand"
     - professor_load.csv: Columns "ProfessorName", "Load"
     - preferences.csv: Columns "ProfessorName", "CourseName", "Preference" (long format)
+    - course_times.csv (optional): Columns "CourseName", "Day", "Start", "End",
+      one row per meeting; courses that meet at the same time become the
+      instance's `conflicts` (see timeConflicts.py)
 
     Args:
         folder_path (str): The path to the directory containing the CSV files.
+        chunksize (int): The number of preference rows read at a time.
+        forbidden_cost (int, optional): The "cannot teach" cost threshold.
 
     Returns:
-        tuple: A tuple containing the data structures for the problem.
+        ProblemInstance: The instance. It unpacks as professors, courses,
+                         preferences (an EligibilityIndex), course_demand,
+                         and professor_load.
+
+    Raises:
+        ValueError: If a file refers to an unknown professor or course, or
+            lists a name or pair more than once.
     """
+    import pandas as pd
+
     print(f"Loading data from CSV files in '{folder_path}'...")
-    # This is a placeholder implementation. To make it work, you would create
-    # the CSV files with the described structure.
-    # For example, preferences.csv would look like:
-    # ProfessorName,CourseName,Preference
-    # Prof_A,Intro_to_AI,1
-    # Prof_A,Advanced_Algorithms,2
-    # ...
-    
-    # Read the simple lists
-    # professors_df = pd.read_csv(f"{folder_path}/professors.csv")
-    # professors = professors_df['ProfessorName'].tolist()
-    # courses_df = pd.read_csv(f"{folder_path}/courses.csv")
-    # courses = courses_df['CourseName'].tolist()
-
-    # Read the dictionaries
-    # demand_df = pd.read_csv(f"{folder_path}/course_demand.csv")
-    # course_demand = demand_df.set_index('CourseName')['Demand'].to_dict()
-    # load_df = pd.read_csv(f"{folder_path}/professor_load.csv")
-    # professor_load = load_df.set_index('ProfessorName')['Load'].to_dict()
-
-    # Read the nested preference dictionary
-    # prefs_df = pd.read_csv(f"{folder_path}/preferences.csv")
-    # preferences = prefs_df.set_index(['ProfessorName', 'CourseName'])['Preference'].to_dict('index')
-    # preferences = {k[0]: {} for k in preferences.keys()}
-    # for (prof, course), pref in prefs_df.set_index(['ProfessorName', 'CourseName'])['Preference'].items():
-    #     preferences[prof][course] = pref
-
-    # raise NotImplementedError("This function is a placeholder. You need to create the CSV files.")
-    # For now, we return the hardcoded data so the script can run.
-    return get_data_hardcoded()
-
-def get_data_from_database(db_path="university.db"):
+    professors = _read_name_table(os.path.join(folder_path, "professors.csv"), "ProfessorName")
+    courses = _read_name_table(os.path.join(folder_path, "courses.csv"), "CourseName")
+    demand = _read_amounts(os.path.join(folder_path, "course_demand.csv"),
+                           "CourseName", "Demand", courses)
+    load = _read_amounts(os.path.join(folder_path, "professor_load.csv"),
+                         "ProfessorName", "Load", professors)
+
+    # Stream the preferences, keeping only compact integer arrays per chunk.
+    prefs_path = os.path.join(folder_path, "preferences.csv")
+    prof_type = pd.CategoricalDtype(professors)
+    course_type = pd.CategoricalDtype(courses)
+    prof_parts, course_parts, cost_parts = [], [], []
+    reader = pd.read_csv(
+        prefs_path, usecols=["ProfessorName", "CourseName", "Preference"],
+        dtype={"ProfessorName": prof_type, "CourseName": course_type, "Preference": np.int32},
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        prof_ids = chunk["ProfessorName"].cat.codes.to_numpy()
+        course_ids = chunk["CourseName"].cat.codes.to_numpy()
+        unknown = (prof_ids < 0) | (course_ids < 0)
+        if unknown.any():
+            # Unknown names do not survive the categorical parse, so report the line.
+            line = int(chunk.index[unknown][0]) + 2
+            raise ValueError(f"{prefs_path}: unknown ProfessorName or CourseName on line {line}")
+        cost = chunk["Preference"].to_numpy()
+        keep = cost < forbidden_cost if forbidden_cost is not None else slice(None)
+        prof_parts.append(prof_ids[keep].astype(np.int32))
+        course_parts.append(course_ids[keep].astype(np.int32))
+        cost_parts.append(cost[keep])
+
+    prof_idx = np.concatenate(prof_parts) if prof_parts else np.zeros(0, dtype=np.int32)
+    course_idx = np.concatenate(course_parts) if course_parts else np.zeros(0, dtype=np.int32)
+    cost = np.concatenate(cost_parts) if cost_parts else np.zeros(0, dtype=np.int32)
+    keys = prof_idx.astype(np.int64) * len(courses) + course_idx
+    if len(np.unique(keys)) != len(keys):
+        raise ValueError(f"{prefs_path}: a (ProfessorName, CourseName) pair is listed more than once")
+
+    conflicts = None
+    times_path = os.path.join(folder_path, "course_times.csv")
+    if os.path.exists(times_path):
+        from timeConflicts import find_conflict_groups
+        times = pd.read_csv(times_path, usecols=["CourseName", "Day", "Start", "End"],
+                            dtype={"CourseName": course_type, "Day": str, "Start": str, "End": str})
+        meeting_course = times["CourseName"].cat.codes.to_numpy()
+        if (meeting_course < 0).any():
+            line = int(np.flatnonzero(meeting_course < 0)[0]) + 2
+            raise ValueError(f"{times_path}: unknown CourseName on line {line}")
+        conflicts = find_conflict_groups(courses, meeting_course, times["Day"].to_numpy(),
+                                         times["Start"].to_numpy(), times["End"].to_numpy())
+
+    preferences = EligibilityIndex(professors, courses, prof_idx, course_idx, cost)
+    return ProblemInstance(preferences, demand, load, conflicts)
+
+DB_BATCH_SIZE = 100_000
+
+def _table_columns(conn, table):
+    """Returns the column names of a table, or an empty set if it does not exist."""
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+def _fetch_array(cursor, columns, batch_size=DB_BATCH_SIZE):
+    """Drains a cursor with `fetchmany` into one int64 array of shape (rows, columns)."""
+    parts = []
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        parts.append(np.array(batch, dtype=np.int64))
+    return np.concatenate(parts) if parts else np.zeros((0, columns), dtype=np.int64)
+
+def _amounts_from_rows(rows, size, what):
+    """Turns (id, amount) rows into a vector, checking every id appears once."""
+    counts = np.bincount(rows[:, 0], minlength=size)
+    if (counts != 1).any():
+        raise ValueError(f"Every {what} must have exactly one row; "
+                         f"{int((counts != 1).sum())} do not.")
+    values = np.zeros(size, dtype=np.int64)
+    values[rows[:, 0]] = rows[:, 1]
+    return values
+
+def get_data_from_database(db_path="university.db", department=None, term=None,
+                           forbidden_cost=FORBIDDEN_COST, batch_size=DB_BATCH_SIZE):
     """
     Loads the optimization problem data from a SQLite database.
-    This function is a placeholder and demonstrates how you would implement it.
-    
-    Expected Table Schemas:
+
+    Two schema layouts are supported, the one in sampleSQL.sql / codeGen.py and
+    an older one that keeps the demand on the Courses table:
     - Professors(ProfessorName TEXT PRIMARY KEY)
-    - Courses(CourseName TEXT PRIMARY KEY, Demand INTEGER)
-    - ProfessorLoad(ProfessorName TEXT, Load INTEGER)
+    - Courses(CourseName TEXT PRIMARY KEY [, Demand INTEGER])
+    - CourseDemand(CourseName TEXT PRIMARY KEY, Demand INTEGER)  -- if Courses has no Demand
+    - ProfessorLoad(ProfessorName TEXT PRIMARY KEY, Load INTEGER)
     - Preferences(ProfessorName TEXT, CourseName TEXT, Preference INTEGER)
-    
+    - CourseTimes(CourseName TEXT, Day TEXT, Start, End)  -- optional meeting
+      times; courses that meet at the same time become the instance's
+      `conflicts` (see timeConflicts.py)
+
+    Names are interned to ids (their rowid order) inside SQLite, so each table is
+    read with one set-based query whose integer rows are drained in `fetchmany`
+    batches straight into NumPy arrays. An index on
+    Preferences(ProfessorName, CourseName) is created if missing. Filters on a
+    Department or Term column are pushed down into the WHERE clauses, and only
+    eligible pairs (cost below `forbidden_cost`) leave the database.
+
     Args:
         db_path (str): The path to the SQLite database file.
+        department (str, optional): Keep only rows whose Department column has
+            this value (applied to every table that has the column).
+        term (str, optional): Keep only rows whose Term column has this value.
+        forbidden_cost (int, optional): The "cannot teach" cost threshold.
+        batch_size (int): The number of rows fetched at a time.
 
     Returns:
-        tuple: A tuple containing the data structures for the problem.
+        ProblemInstance: The instance. It unpacks as professors, courses,
+                         preferences (an EligibilityIndex), course_demand,
+                         and professor_load.
+
+    Raises:
+        ValueError: If a filter column is missing or a demand/load row is
+            missing or duplicated.
     """
     print(f"Loading data from database '{db_path}'...")
-    # This is a placeholder implementation.
-    # conn = sqlite3.connect(db_path)
-    # cursor = conn.cursor()
-    # ... execute SQL queries to fetch data ...
-    # conn.close()
-    # raise NotImplementedError("This function is a placeholder. You need to set up the database.")
-    # For now, we return the hardcoded data so the script can run.
-    return get_data_hardcoded()
+    conn = sqlite3.connect(db_path)
+    try:
+        try:
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_preferences_professor_course "
+                         "ON Preferences(ProfessorName, CourseName)")
+            conn.commit()
+        except sqlite3.OperationalError:
+            pass  # a read-only database; the query still works, only slower
+
+        filters = {"Department": department, "Term": term}
+        filters = {column: value for column, value in filters.items() if value is not None}
+        tables = {t: _table_columns(conn, t) for t in ("Professors", "Courses", "CourseDemand")}
+        for column in filters:
+            if column not in tables["Professors"] | tables["Courses"]:
+                raise ValueError(f"Cannot filter on {column}: neither Professors nor Courses has it.")
+
+        def where(table):
+            applied = [c for c in filters if c in tables[table]]
+            clause = " AND ".join(f"{c} = ?" for c in applied)
+            return (f" WHERE {clause}" if clause else ""), [filters[c] for c in applied]
+
+        prof_where, prof_args = where("Professors")
+        course_where, course_args = where("Courses")
+        professors = [row[0] for row in conn.execute(
+            f"SELECT ProfessorName FROM Professors{prof_where} ORDER BY rowid", prof_args)]
+        courses = [row[0] for row in conn.execute(
+            f"SELECT CourseName FROM Courses{course_where} ORDER BY rowid", course_args)]
+
+        # Temporary id tables let every other query join on names and return integers.
+        conn.execute("DROP TABLE IF EXISTS temp.prof_ids")
+        conn.execute("DROP TABLE IF EXISTS temp.course_ids")
+        conn.execute("CREATE TEMP TABLE prof_ids (ProfessorName TEXT PRIMARY KEY, id INTEGER)")
+        conn.execute("CREATE TEMP TABLE course_ids (CourseName TEXT PRIMARY KEY, id INTEGER)")
+        conn.executemany("INSERT INTO prof_ids VALUES (?, ?)",
+                         zip(professors, range(len(professors))))
+        conn.executemany("INSERT INTO course_ids VALUES (?, ?)",
+                         zip(courses, range(len(courses))))
+
+        if "Demand" in tables["Courses"]:
+            demand_sql = "SELECT i.id, t.Demand FROM Courses t JOIN course_ids i USING (CourseName)"
+        else:
+            demand_sql = "SELECT i.id, t.Demand FROM CourseDemand t JOIN course_ids i USING (CourseName)"
+        demand = _amounts_from_rows(_fetch_array(conn.execute(demand_sql), 2, batch_size),
+                                    len(courses), "course demand")
+        load = _amounts_from_rows(_fetch_array(conn.execute(
+            "SELECT i.id, t.Load FROM ProfessorLoad t JOIN prof_ids i USING (ProfessorName)"
+        ), 2, batch_size), len(professors), "professor load")
+
+        cost_filter = " WHERE t.Preference < ?" if forbidden_cost is not None else ""
+        cost_args = [forbidden_cost] if forbidden_cost is not None else []
+        pairs = _fetch_array(conn.execute(
+            "SELECT p.id, c.id, t.Preference FROM Preferences t "
+            "JOIN prof_ids p USING (ProfessorName) JOIN course_ids c USING (CourseName)"
+            + cost_filter, cost_args
+        ), 3, batch_size)
+
+        conflicts = None
+        if _table_columns(conn, "CourseTimes"):
+            from timeConflicts import find_conflict_groups
+            # Meetings of courses outside the filters drop out of the join.
+            meetings = conn.execute(
+                "SELECT i.id, t.Day, t.Start, t.End FROM CourseTimes t "
+                "JOIN course_ids i USING (CourseName)"
+            ).fetchall()
+            columns = list(zip(*meetings)) or [[], [], [], []]
+            conflicts = find_conflict_groups(courses, *(np.array(column) for column in columns))
+    finally:
+        conn.close()
+
+    preferences = EligibilityIndex(professors, courses, pairs[:, 0], pairs[:, 1], pairs[:, 2])
+    return ProblemInstance(preferences, demand, load, conflicts)
 
 # --- 2. Model Building and Solving Functions ---
 
-def build_and_solve_model(professors, courses, preferences, course_demand, professor_load):
+ENGINES = ("pulp", "matrix", "flow", "heuristic")
+
+def build_and_solve_model(professors, courses=None, preferences=None, course_demand=None,
+                          professor_load=None, engine="pulp", eligibility=None, forbidden_cost=FORBIDDEN_COST,
+                          decompose=False, max_workers=None, cache=None, on_stats=None,
+                          log_stats=False, precheck=True, time_limit=None, initial_assignment=None,
+                          backend=None, threads=None, mip_gap=None, sensitivity=False,
+                          fairness=False, conflicts=None):
     """
     Builds and solves the linear programming model for course assignment.
 
+    Only eligible professor-course pairs (cost below `forbidden_cost`) become
+    decision variables; see eligibility.py. Phase timings and solver statistics
+    are attached to the returned model as `model.stats` (see instrumentation.py).
+
     Args:
-        professors (list): A list of professor names.
+        professors (list): A list of professor names, or a ProblemInstance
+            (see problemInstance.py), in which case the next four arguments
+            are left out.
         courses (list): A list of course names.
         preferences (dict): A nested dictionary of preferences.
         course_demand (dict): A dictionary of course demand.
         professor_load (dict): A dictionary of professor teaching loads.
+        engine (str): Which solver engine to use:
+            - "pulp" (the default): with the "cbc" backend, build a PuLP model
+              and solve it with `model.solve()`. The in-memory backends take
+              arrays, so no PuLP model is built for them and the model is
+              solved as with "matrix".
+            - "matrix": build the model as a sparse matrix and solve it with `backend`.
+            - "flow": solve it as a min-cost flow, bypassing the MIP solver.
+            - "heuristic": greedy construction plus local search within
+              `time_limit` (default 0.2 s); near-optimal, with a lower bound
+              and gap on the model. Its status is Feasible unless the bound
+              proves the assignment optimal (see heuristic.py).
+        eligibility (EligibilityIndex, optional): A prebuilt index of eligible
+            pairs. Built from `preferences` when not given.
+        forbidden_cost (int, optional): The "cannot teach" cost threshold used
+            when building the index. None keeps every pair.
+        decompose (bool): If True, split the problem into the connected
+            components of the eligibility graph and solve them in parallel
+            (see decomposition.py).
+        max_workers (int, optional): The process pool size used with `decompose`.
+        cache (SolutionCache, optional): If given, an unchanged problem is answered
+            from the cache instead of being solved again (see solutionCache.py).
+        on_stats (callable, optional): Called with the SolveStats of this solve,
+            after any hooks registered with `instrumentation.add_stats_hook`.
+        log_stats (bool or file, optional): Write the SolveStats as one JSON line
+            to stderr (True) or to the given stream.
+        precheck (bool): Check feasibility on the eligibility graph before
+            building a model (see feasibility.py). An infeasible instance is then
+            returned right away as an infeasible SolvedModel whose `feasibility`
+            attribute holds the explanation.
+        time_limit (float, optional): A time limit in seconds for the MIP solver
+            or the heuristic. A time-limited MIP run returns its best solution.
+        initial_assignment (dict, optional): The assignment_vars of an earlier
+            solve, e.g. from the "heuristic" engine, given to the MIP solver as
+            its starting incumbent ("pulp" and "matrix" engines). A model
+            without side constraints is solved as an LP, which needs none.
+        backend (str, optional): The MIP solver for the "pulp" and "matrix"
+            engines: "highs" (in memory via highspy), "scipy" (SciPy's milp) or
+            "cbc" (the CBC binary via temporary files). Defaults to the first
+            available one, in that order (see backends.py).
+        threads (int, optional): The number of MIP solver threads.
+        mip_gap (float, optional): The relative optimality gap at which the MIP
+            solver may stop.
+        sensitivity (bool): If True, attach `model.sensitivity`, a
+            SensitivityReport with the dual prices of the demand and load
+            constraints and the reduced cost and cost range of every eligible
+            pair (see sensitivity.py). It is None unless the solve was optimal.
+            The duals are those of the plain assignment model, so it cannot be
+            combined with `fairness` or time `conflicts` (ValueError).
+        fairness (bool): If True, first minimize the largest total cost given
+            to any one professor, then the total cost under that bound, by
+            bisection on one reused model (see fairness.py). Needs a MIP
+            engine ("pulp" or "matrix"); the bound is on `model.max_professor_cost`.
+        conflicts (ConflictGroups, optional): Groups of courses that meet at the
+            same time; no professor is given two courses of one group (see
+            timeConflicts.py). None takes them from the ProblemInstance when
+            one is passed; False ignores them, so that the "flow" and
+            "heuristic" engines can solve an instance with meeting times.
+            Needs a MIP engine ("pulp" or "matrix").
 
     Returns:
         tuple: A tuple containing the solved model and the assignment variables.
     """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Expected one of {ENGINES}.")
+    if fairness and (engine not in ("pulp", "matrix") or decompose):
+        raise ValueError("fairness=True needs the 'pulp' or 'matrix' engine, without decompose.")
+    if isinstance(professors, ProblemInstance):
+        if eligibility is None:
+            eligibility = professors.eligibility(forbidden_cost)
+        if conflicts is None:
+            conflicts = professors.conflicts
+        professors, courses, preferences, course_demand, professor_load = professors
+    if conflicts is False or (conflicts is not None and not len(conflicts)):
+        conflicts = None
+    if conflicts is not None and (engine not in ("pulp", "matrix") or decompose):
+        raise ValueError("Time conflicts need the 'pulp' or 'matrix' engine, without decompose.")
+    if sensitivity and (fairness or conflicts is not None):
+        raise ValueError("sensitivity=True only applies to the plain assignment model: not with "
+                         "fairness=True or time conflicts (pass conflicts=False to ignore them).")
+    if cache is not None:
+        # The cache reports the statistics of whichever path answers: a hit or a fresh solve.
+        if eligibility is None:
+            eligibility = build_eligibility_index(professors, courses, preferences, forbidden_cost)
+        model, assignment_vars = cache.solve(
+            professors, courses, preferences, course_demand, professor_load,
+            eligibility=eligibility, forbidden_cost=forbidden_cost, engine=engine,
+            decompose=decompose, max_workers=max_workers, on_stats=on_stats, log_stats=log_stats,
+            precheck=precheck, time_limit=time_limit, initial_assignment=initial_assignment,
+            backend=backend, threads=threads, mip_gap=mip_gap, fairness=fairness,
+            conflicts=conflicts
+        )
+        if sensitivity:
+            model.sensitivity = _analyze_sensitivity(model, assignment_vars, eligibility)
+        return model, assignment_vars
+
+    stats = SolveStats(engine)
+    if eligibility is None:
+        with stats.phase("eligibility"):
+            eligibility = build_eligibility_index(professors, courses, preferences, forbidden_cost)
+
+    report = None
+    if precheck:
+        from feasibility import check_feasibility
+        with stats.phase("precheck"):
+            report = check_feasibility(professors, courses, course_demand, professor_load, eligibility)
+        if not report:
+            print(report.explain())
+
+    if report is not None and not report:
+        model = SolvedModel("Professor_Course_Assignment", STATUS_INFEASIBLE)
+        model.feasibility = report
+        assignment_vars = build_assignment_vars(professors, courses, [])
+    elif fairness:
+        from fairness import build_and_solve_fair_model
+        model, assignment_vars = build_and_solve_fair_model(
+            professors, courses, preferences, course_demand, professor_load, eligibility,
+            time_limit=time_limit, stats=stats, backend=backend, threads=threads, mip_gap=mip_gap,
+            conflicts=conflicts
+        )
+    elif decompose:
+        from decomposition import build_and_solve_decomposed
+        model, assignment_vars = build_and_solve_decomposed(
+            professors, courses, preferences, course_demand, professor_load,
+            engine=engine, eligibility=eligibility, max_workers=max_workers, stats=stats,
+            backend=backend, threads=threads, mip_gap=mip_gap, time_limit=time_limit,
+            precheck=precheck
+        )
+    elif engine == "matrix":
+        from matrixModel import build_and_solve_matrix_model
+        model, assignment_vars = build_and_solve_matrix_model(
+            professors, courses, preferences, course_demand, professor_load, eligibility,
+            time_limit=time_limit, stats=stats, backend=backend, threads=threads, mip_gap=mip_gap,
+            conflicts=conflicts, initial_assignment=initial_assignment
+        )
+    elif engine == "flow":
+        from flowSolver import build_and_solve_flow_model
+        model, assignment_vars = build_and_solve_flow_model(
+            professors, courses, preferences, course_demand, professor_load, eligibility,
+            stats=stats
+        )
+    elif engine == "heuristic":
+        from heuristic import build_and_solve_heuristic_model
+        model, assignment_vars = build_and_solve_heuristic_model(
+            professors, courses, preferences, course_demand, professor_load, eligibility,
+            time_limit=time_limit, stats=stats
+        )
+    elif select_backend(backend).in_memory:
+        # The in-memory backends take arrays; a PuLP model would be built only to be discarded.
+        from matrixModel import build_and_solve_matrix_model
+        model, assignment_vars = build_and_solve_matrix_model(
+            professors, courses, preferences, course_demand, professor_load, eligibility,
+            time_limit=time_limit, stats=stats, backend=backend, threads=threads, mip_gap=mip_gap,
+            conflicts=conflicts, initial_assignment=initial_assignment
+        )
+    else:
+        model, assignment_vars = _build_and_solve_pulp_model(
+            professors, courses, course_demand, professor_load, eligibility, stats,
+            time_limit=time_limit, initial_assignment=initial_assignment,
+            threads=threads, mip_gap=mip_gap, conflicts=conflicts
+        )
+
+    if sensitivity:
+        with stats.phase("sensitivity"):
+            model.sensitivity = _analyze_sensitivity(model, assignment_vars, eligibility)
+
+    objective = model.objective
+    if hasattr(objective, "value"):  # a PuLP expression
+        objective = objective.value()
+    stats.status = model.status
+    stats.objective = None if objective is None else float(objective)
+    model.stats = stats
+    publish(stats, on_stats, log_stats)
+    return model, assignment_vars
+
+def _analyze_sensitivity(model, assignment_vars, eligibility):
+    """Returns the SensitivityReport of a solve, or None if it is not (proven) optimal."""
+    from sensitivity import analyze_sensitivity
+    try:
+        return analyze_sensitivity(model, assignment_vars, eligibility)
+    except ValueError as error:
+        # E.g. a time-limited MIP solution that stopped short of the optimum.
+        print(f"No sensitivity analysis: {error}")
+        return None
+
+def _build_and_solve_pulp_model(professors, courses, course_demand, professor_load, eligibility,
+                                stats, time_limit=None, initial_assignment=None, threads=None,
+                                mip_gap=None, conflicts=None):
+    """Builds the PuLP model over the eligible pairs and solves it with CBC, filling in `stats`."""
+    import pulp
+
     # --- Model Setup ---
     model = pulp.LpProblem("Professor_Course_Assignment", pulp.LpMinimize)
 
     # --- Decision Variables ---
-    assignment_vars = pulp.LpVariable.dicts(
-        "Assignment", (professors, courses), cat='Binary'
-    )
+    # One binary variable per eligible pair; pairs that were pruned read as 0.
+    with stats.phase("variables"):
+        assignment_vars = {p: AssignmentRow() for p in professors}
+        pair_vars = []
+        for p_idx, c_idx in zip(eligibility.prof_idx.tolist(), eligibility.course_idx.tolist()):
+            p, c = professors[p_idx], courses[c_idx]
+            var = pulp.LpVariable(f"Assignment_{p}_{c}", cat='Binary')
+            if initial_assignment is not None:
+                var.setInitialValue(1 if initial_assignment[p][c].varValue == 1 else 0)
+            assignment_vars[p][c] = var
+            pair_vars.append(var)
 
     # --- Objective Function ---
-    objective_function = pulp.lpSum(
-        [preferences[p][c] * assignment_vars[p][c] for p in professors for c in courses]
-    )
-    model += objective_function, "Total_Preference_Cost"
-
-    # --- Constraints ---
-    # Each course must meet its demand.
-    for c in courses:
-        model += (
-            pulp.lpSum([assignment_vars[p][c] for p in professors]) == course_demand[c],
-            f"Course_{c}_Demand_Constraint"
+    with stats.phase("objective"):
+        objective_function = pulp.lpSum(
+            [cost * var for cost, var in zip(eligibility.cost.tolist(), pair_vars)]
         )
+        model += objective_function, "Total_Preference_Cost"
 
-    # Each professor must teach their required number of courses.
-    for p in professors:
-        model += (
-            pulp.lpSum([assignment_vars[p][c] for c in courses]) == professor_load[p],
-            f"Professor_{p}_Load_Constraint"
-        )
+    # --- Constraints ---
+    with stats.phase("constraints"):
+        # Each course must meet its demand.
+        for c_idx, c in enumerate(courses):
+            model += (
+                pulp.lpSum([pair_vars[k] for k in eligibility.pairs_of_course(c_idx)]) == course_demand[c],
+                f"Course_{c}_Demand_Constraint"
+            )
+
+        # Each professor must teach their required number of courses.
+        for p_idx, p in enumerate(professors):
+            model += (
+                pulp.lpSum([pair_vars[k] for k in eligibility.pairs_of_professor(p_idx)]) == professor_load[p],
+                f"Professor_{p}_Load_Constraint"
+            )
+
+        # A professor teaches at most one course of each group that meets at the same time.
+        conflict_matrix = None
+        if conflicts is not None:
+            from timeConflicts import conflict_rows
+            conflict_matrix = conflict_rows(conflicts, eligibility)
+            for r in range(conflict_matrix.shape[0]):
+                row = conflict_matrix.indices[conflict_matrix.indptr[r]:conflict_matrix.indptr[r + 1]]
+                model += pulp.lpSum([pair_vars[k] for k in row.tolist()]) <= 1, f"Time_Conflict_{r}"
+    stats.num_variables = eligibility.num_pairs
+    stats.num_constraints = len(courses) + len(professors)
+    stats.nonzeros = 2 * eligibility.num_pairs
+    if conflict_matrix is not None:
+        stats.num_constraints += conflict_matrix.shape[0]
+        stats.nonzeros += conflict_matrix.nnz
 
     # --- Solve the model ---
     print("Solving the assignment problem...")
-    model.solve()
+    select_backend("cbc").solve_model(model, threads=threads, time_limit=time_limit, mip_gap=mip_gap,
+                                      warm_start=initial_assignment is not None, stats=stats)
     print("Solver finished.")
-    
+
     return model, assignment_vars
 
 # --- 3. Results Display Function ---
 
-def display_results(model, assignment_vars, preferences, professors, courses):
+def display_results(model, assignment_vars, preferences, professors=None, courses=None,
+                    detail=False, output=None, sink=None):
     """
-    Displays the results of the solved optimization model.
+    Displays a summary of the solved optimization model and optionally writes it out.
+
+    The assigned pairs are extracted once into (professor, course, cost)
+    triples (see results.py), so the cost does not grow with P x C.
+
+    Args:
+        model: The solved model.
+        assignment_vars (dict): The nested assignment variables.
+        preferences (dict): A nested dictionary of preferences, or a
+            ProblemInstance, in which case `professors` and `courses` are left out.
+        professors (list): A list of professor names.
+        courses (list): A list of course names.
+        detail (bool): Also print every assignment, grouped by professor.
+        output (str, optional): A file (or database for the "sqlite" sink) to
+            write the assignments to.
+        sink (str, optional): "csv", "jsonl" or "sqlite". Guessed from the
+            extension of `output` when not given.
+
+    Returns:
+        AssignmentResult: The extracted assignments.
     """
-    status = pulp.LpStatus[model.status]
+    if isinstance(preferences, ProblemInstance):
+        professors, courses, preferences = preferences.professors, preferences.courses, preferences.preferences
+    result = extract_assignment(model, assignment_vars, professors, courses, preferences)
+    status = STATUS_NAMES[model.status]
     print(f"Solution Status: {status}\n")
 
-    if model.status == pulp.LpStatusOptimal:
-        print("Optimal Assignment Found:")
-        assigned_count = 0
-        for p in professors:
-            print(f"\n--- Courses for {p} ---")
-            prof_courses = []
-            for c in courses:
-                if assignment_vars[p][c].varValue == 1:
-                    preference_score = preferences[p][c]
-                    prof_courses.append(f"  - {c} (Preference: {preference_score})")
-                    assigned_count += 1
-            if prof_courses:
-                for item in prof_courses:
-                    print(item)
-            else:
-                print("  - No courses assigned.")
-        
-        objective_value = pulp.value(model.objective)
-        print(f"\nTotal Preference Cost (minimized): {objective_value}")
-        
-        if assigned_count > 0:
-            average_preference = objective_value / assigned_count
-            print(f"Average Preference Score per Assignment: {average_preference:.2f}")
+    if model.status in SOLUTION_STATUSES:
+        proven = model.status == STATUS_OPTIMAL
+        print("Optimal Assignment Found:" if proven else "Feasible Assignment Found (not proven optimal):")
+        if detail:
+            starts = np.searchsorted(result.prof_idx, np.arange(len(professors) + 1))
+            for p_idx, p in enumerate(professors):
+                print(f"\n--- Courses for {p} ---")
+                if starts[p_idx] == starts[p_idx + 1]:
+                    print("  - No courses assigned.")
+                    continue
+                print("\n".join(
+                    f"  - {courses[c_idx]} (Preference: {cost})"
+                    for c_idx, cost in zip(result.course_idx[starts[p_idx]:starts[p_idx + 1]].tolist(),
+                                           result.cost[starts[p_idx]:starts[p_idx + 1]].tolist())
+                ))
+
+        summary = result.summary()
+        print(f"\nTotal Preference Cost{' (minimized)' if proven else ''}: {summary['objective']}")
+        if not proven and getattr(model, "lower_bound", None) is not None:
+            print(f"Lower bound on the optimum: {model.lower_bound} (gap at most {model.gap:.2%})")
+        print(f"Assignments: {summary['assignments']} "
+              f"({summary['idle_professors']} professors without a course)")
+        if summary["assignments"] > 0:
+            print(f"Average Preference Score per Assignment: {summary['average_cost']:.2f}")
+            print("Assignments by preference score: " + ", ".join(
+                f"{cost}: {count}" for cost, count in summary["cost_counts"].items()
+            ))
 
     else:
-        print("No optimal solution found. The problem may be infeasible or unbounded.")
+        print("No solution found. The problem may be infeasible, or the time limit too short.")
+
+    if output is not None:
+        if sink is None:
+            sink = {".csv": "csv", ".jsonl": "jsonl", ".db": "sqlite",
+                    ".sqlite": "sqlite"}.get(os.path.splitext(output)[1].lower(), "csv")
+        write_results(result, sink, output)
+        print(f"Wrote {len(result)} assignments to {output} ({sink}).")
+    return result
+
+# --- 4. Command Line ---
+
+SOURCES = ("hardcoded", "csv", "sqlite")
+
+def parse_args(argv=None):
+    """Parses the command-line options; `argv` defaults to sys.argv[1:]."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Assign professors to courses by preference.")
+    parser.add_argument("--source", choices=SOURCES, default="hardcoded", help="where to load the data from")
+    parser.add_argument("--path", help="CSV folder (default: .) or SQLite file (default: university.db)")
+    parser.add_argument("--department", help="SQLite only: solve one department")
+    parser.add_argument("--term", help="SQLite only: solve one term")
+    parser.add_argument("--engine", choices=ENGINES, default="pulp", help="solver engine")
+    parser.add_argument("--backend", choices=("auto",) + BACKEND_ORDER,
+                        help="MIP solver for the pulp and matrix engines (default: auto)")
+    parser.add_argument("--time-limit", type=float, help="time limit in seconds")
+    parser.add_argument("--fairness", action="store_true",
+                        help="minimize the worst per-professor cost first, then the total")
+    parser.add_argument("--ignore-times", action="store_true",
+                        help="do not enforce the course meeting times (the flow and heuristic "
+                             "engines always ignore them)")
+    parser.add_argument("--output", help="write the assignments to a .csv, .jsonl or .db file")
+    parser.add_argument("--detail", action="store_true", help="list every assignment")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Runs the command line: loads the chosen source, solves it and reports the result.
 
-# --- 4. Main Execution Block ---
+    Only the modules the chosen source and engine need are imported, e.g. the
+    hardcoded data with the flow engine never loads pulp or pandas. The time
+    from the start of this module's imports to the first line of work is
+    printed as the startup time.
 
-if __name__ == "__main__":
-    # To change the data source, simply swap which function is called here.
-    # For example, to use CSV files, you would change the line to:
-    # professors, courses, preferences, course_demand, professor_load = get_data_from_csvs()
-    
-    # Step 1: Load the data
-    professors, courses, preferences, course_demand, professor_load = get_data_hardcoded()
-    
-    # Step 2: Build and solve the model
+    Args:
+        argv (list, optional): The command-line arguments; defaults to sys.argv[1:].
+
+    Returns:
+        AssignmentResult: The extracted assignments.
+    """
+    args = parse_args(argv)
+    print(f"Started in {(time.perf_counter() - _STARTED) * 1000:.0f} ms.")
+
+    start = time.perf_counter()
+    if args.source == "csv":
+        instance = get_data_from_csvs(args.path or ".")
+    elif args.source == "sqlite":
+        instance = get_data_from_database(args.path or "university.db",
+                                          department=args.department, term=args.term)
+    else:
+        instance = get_data_hardcoded()
+    load_s = time.perf_counter() - start
+
+    conflicts = None
+    if instance.conflicts is not None and (args.ignore_times or args.engine in ("flow", "heuristic")):
+        if not args.ignore_times:
+            print(f"Note: the {args.engine} engine ignores the course meeting times; "
+                  "use --engine pulp or matrix to enforce them.")
+        conflicts = False
+
+    start = time.perf_counter()
     model, assignment_vars = build_and_solve_model(
-        professors, courses, preferences, course_demand, professor_load
+        instance, engine=args.engine, backend=args.backend, time_limit=args.time_limit,
+        fairness=args.fairness, conflicts=conflicts
     )
-    
-    # Step 3: Display the results
-    display_results(model, assignment_vars, preferences, professors, courses)
+    solve_s = time.perf_counter() - start
+
+    result = display_results(model, assignment_vars, instance, detail=args.detail, output=args.output)
+    if getattr(model, "max_professor_cost", None) is not None:
+        print(f"Largest cost given to one professor: {model.max_professor_cost} "
+              f"({model.fairness_solves} solves)")
+    print(f"\nLoad {load_s:.3f}s, solve {solve_s:.3f}s, "
+          f"total {time.perf_counter() - _STARTED:.3f}s since startup.")
+    return result
 
+if __name__ == "__main__":
+    # For example:
+    #   python ProfessorAssignmentModular.py --source sqlite --path university.db --engine flow
+    #   python ProfessorAssignmentModular.py --source csv --path data/ --output assignments.csv
+    # rankedAssignments.k_best_assignments lists the next-best alternatives too.
+    main()
@@ -0,0 +1,480 @@
+# -*- coding: utf-8 -*-
+"""
+Pluggable MIP solver backends for the assignment model.
+
+PuLP's default `model.solve()` writes the model to an MPS file, starts the CBC
+binary, waits for it to write a solution file and parses that back. On large
+instances the file I/O and process start cost more than the optimization
+itself. The backends here take the model as arrays (a cost vector, a sparse
+equality matrix and its right-hand side, see `matrixModel.build_matrix_model`)
+and hand it to a library solver in memory:
+
+- "highs": HiGHS through its Python bindings (`highspy`). The CSR arrays are
+           passed straight to `Highs.passModel`, with no copy into Python objects.
+- "scipy": SciPy's `milp` and `linprog`, which bundle their own HiGHS. Always
+           installed with SciPy, but they expose no thread count or starting solution.
+- "cbc":   the CBC binary through PuLP, with the file round trip. Kept as the
+           fallback when neither library is available.
+
+Every backend accepts the same options: `threads`, `time_limit` (seconds) and
+`mip_gap` (relative gap at which to stop). A run stopped by the time limit
+returns its best solution with the STATUS_FEASIBLE code unless its gap is closed
+(down to `mip_gap`), and records the remaining gap in the SolveStats. Only a
+proven answer has the STATUS_OPTIMAL code.
+
+The assignment model's constraint matrix is the incidence matrix of a bipartite
+graph, which is totally unimodular: every vertex of its LP relaxation is already
+0/1. Callers say so with `totally_unimodular=True` and the library backends then
+solve the LP with the dual simplex method and no presolve, which on these models
+is one to two orders of magnitude faster than HiGHS's MIP path (its presolve
+dominates the run time). A fractional LP answer, which should not happen, is
+re-solved as a MIP.
+
+Models with extra inequality rows (e.g. the per-professor cost bounds of
+fairness.py) pass `upper`, so that the rows read `rhs <= matrix @ x <= upper`.
+`bounded_model` builds such a model once and re-solves it after changing only
+row upper bounds; HiGHS keeps the model loaded between those solves.
+
+Usage:
+    backend = select_backend("highs")
+    status, objective_value, x = backend.solve(objective, matrix, rhs, threads=4, time_limit=60)
+"""
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from instrumentation import SolveStats, parse_cbc_log
+from solution import (SOLUTION_STATUSES, STATUS_FEASIBLE, STATUS_INFEASIBLE, STATUS_NOT_SOLVED,
+                      STATUS_OPTIMAL, STATUS_UNBOUNDED, STATUS_UNDEFINED)
+
+# Backends tried, in this order, when none is requested or the requested one is missing.
+BACKEND_ORDER = ("highs", "scipy", "cbc")
+
+# Maps scipy.optimize.milp status codes to pulp.LpStatus codes.
+MILP_STATUS = {
+    0: STATUS_OPTIMAL,
+    1: STATUS_NOT_SOLVED,   # iteration or time limit reached
+    2: STATUS_INFEASIBLE,
+    3: STATUS_UNBOUNDED,
+    4: STATUS_UNDEFINED,
+}
+
+
+def incumbent_status(gap, mip_gap=None):
+    """
+    Returns the status of a solution that a limit stopped the solver on.
+
+    Args:
+        gap (float): The relative gap the solver reported, or None if unknown.
+        mip_gap (float, optional): The relative gap the caller accepts.
+
+    Returns:
+        int: STATUS_OPTIMAL if the gap is closed down to `mip_gap`, else STATUS_FEASIBLE.
+    """
+    if gap is not None and gap <= (mip_gap or 0.0):
+        return STATUS_OPTIMAL
+    return STATUS_FEASIBLE
+
+
+class SolverBackend:
+    """
+    A MIP solver that minimizes `objective @ x` subject to `matrix @ x == rhs`, x binary.
+
+    With `upper` the constraints are `rhs <= matrix @ x <= upper` instead.
+
+    Attributes:
+        name (str): The name used to select the backend.
+        in_memory (bool): Whether the model reaches the solver without temporary files.
+    """
+    name = None
+    in_memory = True
+
+    def available(self):
+        """Returns True if the solver can be used in this environment."""
+        raise NotImplementedError
+
+    def solve(self, objective, matrix, rhs, threads=None, time_limit=None, mip_gap=None,
+              initial=None, stats=None, totally_unimodular=False, upper=None):
+        """
+        Solves a matrix-form assignment model.
+
+        Args:
+            objective (np.ndarray): The objective cost vector.
+            matrix (scipy.sparse.csr_matrix): The equality constraint matrix.
+            rhs (np.ndarray): The right-hand side of the equality constraints,
+                or their lower bounds (-inf for none) when `upper` is given.
+            threads (int, optional): The number of solver threads.
+            time_limit (float, optional): A time limit in seconds.
+            mip_gap (float, optional): The relative gap at which to stop.
+            initial (np.ndarray, optional): A 0/1 starting solution.
+            stats (SolveStats, optional): Receives the handoff and solve timings,
+                nodes, iterations and gap.
+            totally_unimodular (bool): The matrix is totally unimodular, so the
+                LP relaxation may be solved instead of the MIP.
+            upper (np.ndarray, optional): The upper bounds of the rows (inf for
+                none); the rows are equalities when not given.
+
+        Returns:
+            tuple: The pulp-style status code (STATUS_FEASIBLE for a solution
+                   that is not proven optimal), the objective value (or None) and
+                   the rounded 0/1 solution vector (or None).
+        """
+        raise NotImplementedError
+
+    def bounded_model(self, objective, matrix, rhs, upper, threads=None, time_limit=None,
+                      mip_gap=None):
+        """
+        Builds a model whose row upper bounds can be changed between solves.
+
+        Args:
+            objective, matrix, rhs, upper, threads, time_limit, mip_gap: As for `solve`.
+
+        Returns:
+            BoundedModel: The model, not yet solved.
+        """
+        return BoundedModel(self, objective, matrix, rhs, upper, threads, time_limit, mip_gap)
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class HighsBackend(SolverBackend):
+    """HiGHS through `highspy`, fed the CSR arrays directly."""
+    name = "highs"
+
+    def available(self):
+        return importlib.util.find_spec("highspy") is not None
+
+    def _load(self, objective, matrix, rhs, upper, threads, time_limit, mip_gap,
+              totally_unimodular):
+        """Returns a Highs object with the options set and the model passed in."""
+        import highspy
+
+        num_rows, num_cols = matrix.shape
+        highs = highspy.Highs()
+        highs.setOptionValue("output_flag", False)
+        if threads is not None:
+            # HiGHS sizes its thread pool once per process unless it is reset.
+            highspy.Highs.resetGlobalScheduler(True)
+            highs.setOptionValue("threads", int(threads))
+        if time_limit is not None:
+            highs.setOptionValue("time_limit", float(time_limit))
+        if mip_gap is not None:
+            highs.setOptionValue("mip_rel_gap", float(mip_gap))
+        if totally_unimodular:
+            highs.setOptionValue("presolve", "off")
+            highs.setOptionValue("solver", "simplex")
+        rhs = np.asarray(rhs, dtype=np.float64)
+        upper = rhs if upper is None else np.asarray(upper, dtype=np.float64)
+        highs.passModel(
+            num_cols, num_rows, matrix.nnz,
+            int(highspy.MatrixFormat.kRowwise), int(highspy.ObjSense.kMinimize), 0.0,
+            np.asarray(objective, dtype=np.float64),
+            np.zeros(num_cols), np.ones(num_cols), rhs, upper,
+            matrix.indptr.astype(np.int32), matrix.indices.astype(np.int32),
+            matrix.data.astype(np.float64),
+            np.full(num_cols, 0 if totally_unimodular else 1, dtype=np.int32),
+        )
+        return highs
+
+    def _run(self, highs, initial, stats, totally_unimodular, mip_gap=None):
+        """
+        Runs HiGHS on a loaded model and reads back its result, filling in `stats`.
+
+        `mip_gap` is the gap the caller accepts from a run that a limit stopped.
+
+        Returns:
+            tuple: The pulp-style status code, the objective value and the
+                   column values, the last two None without a solution.
+        """
+        import highspy
+
+        if initial is not None and not totally_unimodular:
+            num_cols = len(initial)
+            highs.setSolution(num_cols, np.arange(num_cols, dtype=np.int32),
+                              np.asarray(initial, dtype=np.float64))
+        with stats.phase("solve"):
+            run_status = highs.run()
+
+        info = highs.getInfo()
+        model_status = highs.getModelStatus()
+        has_solution = info.primal_solution_status == 2  # kSolutionStatusFeasible
+        stats.nodes = 0 if totally_unimodular else info.mip_node_count
+        stats.iterations = info.simplex_iteration_count
+        if run_status == highspy.HighsStatus.kError:
+            return STATUS_UNDEFINED, None, None
+        if model_status == highspy.HighsModelStatus.kOptimal:
+            status = STATUS_OPTIMAL
+        elif model_status in (highspy.HighsModelStatus.kInfeasible,
+                              highspy.HighsModelStatus.kUnboundedOrInfeasible):
+            status = STATUS_INFEASIBLE
+        elif model_status == highspy.HighsModelStatus.kUnbounded:
+            status = STATUS_UNBOUNDED
+        elif totally_unimodular:
+            # A limit stopped the simplex method; its point need not be feasible.
+            status = STATUS_NOT_SOLVED
+        else:
+            # A limit was reached: keep the best solution found, if any.
+            status = incumbent_status(info.mip_gap, mip_gap) if has_solution else STATUS_NOT_SOLVED
+        if status not in SOLUTION_STATUSES or not has_solution:
+            return status, None, None
+        stats.gap = 0.0 if totally_unimodular else info.mip_gap
+        return status, info.objective_function_value, np.asarray(highs.getSolution().col_value)
+
+    def solve(self, objective, matrix, rhs, threads=None, time_limit=None, mip_gap=None,
+              initial=None, stats=None, totally_unimodular=False, upper=None):
+        stats = stats if stats is not None else SolveStats(self.name)
+        with stats.phase("handoff"):
+            highs = self._load(objective, matrix, rhs, upper, threads, time_limit, mip_gap,
+                               totally_unimodular)
+        status, objective_value, values = self._run(highs, initial, stats, totally_unimodular,
+                                                    mip_gap)
+        if values is None:
+            return status, None, None
+        x = np.rint(values).astype(np.int8)
+        if totally_unimodular and not np.allclose(values, x, atol=1e-6):
+            return self.solve(objective, matrix, rhs, threads, time_limit, mip_gap, initial, stats,
+                              upper=upper)
+        return status, objective_value, x
+
+    def bounded_model(self, objective, matrix, rhs, upper, threads=None, time_limit=None,
+                      mip_gap=None):
+        return _HighsBoundedModel(self, objective, matrix, rhs, upper, threads, time_limit, mip_gap)
+
+
+class ScipyBackend(SolverBackend):
+    """SciPy's `milp` (or `linprog`); `threads` and `initial` are not supported and are ignored."""
+    name = "scipy"
+
+    def available(self):
+        try:
+            from scipy.optimize import milp  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def solve(self, objective, matrix, rhs, threads=None, time_limit=None, mip_gap=None,
+              initial=None, stats=None, totally_unimodular=False, upper=None):
+        from scipy.optimize import Bounds, LinearConstraint, linprog, milp
+
+        stats = stats if stats is not None else SolveStats(self.name)
+        if totally_unimodular and upper is None:
+            options = {"presolve": False}
+            if time_limit is not None:
+                options["time_limit"] = time_limit
+            with stats.phase("solve"):
+                result = linprog(objective, A_eq=matrix, b_eq=rhs, bounds=(0, 1),
+                                 method="highs-ds", options=options)
+            stats.nodes, stats.iterations = 0, getattr(result, "nit", None)
+            if result.status != 0:
+                return MILP_STATUS.get(result.status, STATUS_UNDEFINED), None, None
+            x = np.rint(result.x).astype(np.int8)
+            if not np.allclose(result.x, x, atol=1e-6):
+                return self.solve(objective, matrix, rhs, threads, time_limit, mip_gap, initial, stats)
+            stats.gap = 0.0
+            return STATUS_OPTIMAL, result.fun, x
+
+        options = {}
+        if time_limit is not None:
+            options["time_limit"] = time_limit
+        if mip_gap is not None:
+            options["mip_rel_gap"] = mip_gap
+        with stats.phase("solve"):
+            result = milp(
+                objective,
+                constraints=LinearConstraint(matrix, rhs, rhs if upper is None else upper),
+                integrality=np.ones(objective.shape[0], dtype=np.uint8),
+                bounds=Bounds(0, 1),
+                options=options,
+            )
+        status = MILP_STATUS.get(result.status, STATUS_UNDEFINED)
+        stats.nodes = getattr(result, "mip_node_count", None)
+        stats.gap = getattr(result, "mip_gap", None)
+        if result.x is None:
+            return status, None, None
+        if status != STATUS_OPTIMAL:
+            # A run stopped by the time limit still returns its best solution.
+            status = incumbent_status(stats.gap, mip_gap)
+        return status, result.fun, np.rint(result.x).astype(np.int8)
+
+
+class CbcBackend(SolverBackend):
+    """The CBC binary through PuLP, via MPS and solution files; always solves the MIP."""
+    name = "cbc"
+    in_memory = False
+
+    def available(self):
+        import pulp
+        return pulp.PULP_CBC_CMD(msg=False).available()
+
+    def solve_model(self, model, threads=None, time_limit=None, mip_gap=None, warm_start=False,
+                    stats=None):
+        """
+        Solves a PuLP model with CBC, echoing its log and filling in `stats`.
+
+        CBC writes its log to a file so that nodes, iterations and its own solve
+        time can be read back; the log is then echoed to stdout. Everything else
+        (writing the MPS file, starting CBC, reading the solution) is the handoff.
+        When a limit stops CBC on a solution whose gap is not closed,
+        `model.status` is set to STATUS_FEASIBLE instead of PuLP's Optimal.
+
+        Args:
+            model (pulp.LpProblem): The model to solve; its variables receive the solution.
+            warm_start (bool): Start from the variables' initial values.
+            threads, time_limit, mip_gap, stats: As for `solve`.
+        """
+        import pulp
+
+        stats = stats if stats is not None else SolveStats(self.name)
+        log_fd, log_path = tempfile.mkstemp(suffix=".log")
+        os.close(log_fd)
+        try:
+            start = time.perf_counter()
+            model.solve(pulp.PULP_CBC_CMD(msg=False, logPath=log_path, timeLimit=time_limit,
+                                          gapRel=mip_gap, threads=threads, warmStart=warm_start))
+            elapsed = time.perf_counter() - start
+            with open(log_path) as log_file:
+                cbc_log = log_file.read()
+        finally:
+            os.remove(log_path)
+        sys.stdout.write(cbc_log)
+
+        cbc = parse_cbc_log(cbc_log)
+        solve_time = min(cbc.get("wallclock", elapsed), elapsed)
+        stats.timings["handoff"] = stats.timings.get("handoff", 0.0) + elapsed - solve_time
+        stats.timings["solve"] = stats.timings.get("solve", 0.0) + solve_time
+        stats.nodes = cbc.get("nodes")
+        stats.iterations = cbc.get("iterations")
+        # PuLP reports a run that a limit stopped on a solution as Optimal too.
+        stopped = (model.status == pulp.LpStatusOptimal
+                   and model.sol_status == pulp.LpSolutionIntegerFeasible)
+        proven = model.status == pulp.LpStatusOptimal and not stopped
+        stats.gap = cbc.get("gap", 0.0 if proven else None)
+        if stopped:
+            model.status = incumbent_status(stats.gap, mip_gap)
+
+    def solve(self, objective, matrix, rhs, threads=None, time_limit=None, mip_gap=None,
+              initial=None, stats=None, totally_unimodular=False, upper=None):
+        import pulp
+
+        stats = stats if stats is not None else SolveStats(self.name)
+        with stats.phase("handoff"):
+            model = pulp.LpProblem("Matrix_Model", pulp.LpMinimize)
+            x = [pulp.LpVariable(f"x_{k}", cat="Binary") for k in range(matrix.shape[1])]
+            if initial is not None:
+                for var, value in zip(x, np.asarray(initial).tolist()):
+                    var.setInitialValue(value)
+            model += pulp.LpAffineExpression(zip(x, np.asarray(objective).tolist()))
+            for r in range(matrix.shape[0]):
+                row = slice(matrix.indptr[r], matrix.indptr[r + 1])
+                expression = pulp.LpAffineExpression(
+                    zip([x[k] for k in matrix.indices[row].tolist()], matrix.data[row].tolist()))
+                lower_bound = float(rhs[r])
+                upper_bound = lower_bound if upper is None else float(upper[r])
+                if lower_bound == upper_bound:
+                    model += expression == lower_bound, f"Row_{r}"
+                    continue
+                if upper_bound < np.inf:
+                    model += expression <= upper_bound, f"Row_{r}"
+                if lower_bound > -np.inf:
+                    model += expression >= lower_bound, f"Row_{r}_lower"
+        self.solve_model(model, threads, time_limit, mip_gap, initial is not None, stats)
+        if model.status not in SOLUTION_STATUSES:
+            return model.status, None, None
+        values = np.array([var.varValue or 0 for var in x])
+        return model.status, pulp.value(model.objective), np.rint(values).astype(np.int8)
+
+
+class BoundedModel:
+    """
+    A model built once and re-solved after changing row upper bounds.
+
+    This version keeps the arrays and hands them to its backend's `solve` on
+    every solve; `HighsBackend` keeps the model loaded in HiGHS instead.
+    """
+
+    def __init__(self, backend, objective, matrix, rhs, upper, threads=None, time_limit=None,
+                 mip_gap=None):
+        self.backend = backend
+        self.objective = objective
+        self.matrix = matrix
+        self.rhs = np.asarray(rhs, dtype=np.float64)
+        self.upper = np.array(upper, dtype=np.float64)
+        self.threads = threads
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+
+    def set_upper(self, rows, values, time_limit=None):
+        """Sets the upper bounds of `rows` (and the time limit of the next solves, if given)."""
+        self.upper[rows] = values
+        if time_limit is not None:
+            self.time_limit = time_limit
+
+    def solve(self, initial=None, stats=None):
+        """
+        Solves the model with its current bounds.
+
+        Returns:
+            tuple: As for `SolverBackend.solve`.
+        """
+        return self.backend.solve(self.objective, self.matrix, self.rhs, threads=self.threads,
+                                  time_limit=self.time_limit, mip_gap=self.mip_gap,
+                                  initial=initial, stats=stats, upper=self.upper)
+
+
+class _HighsBoundedModel(BoundedModel):
+    """A BoundedModel kept loaded in one Highs object; only the changed bounds are passed on."""
+
+    def __init__(self, backend, objective, matrix, rhs, upper, threads=None, time_limit=None,
+                 mip_gap=None):
+        super().__init__(backend, objective, matrix, rhs, upper, threads, time_limit, mip_gap)
+        self.highs = backend._load(objective, matrix, self.rhs, self.upper, threads, time_limit,
+                                   mip_gap, totally_unimodular=False)
+
+    def set_upper(self, rows, values, time_limit=None):
+        super().set_upper(rows, values, time_limit)
+        rows = np.atleast_1d(np.asarray(rows, dtype=np.int32))
+        self.highs.changeRowsBounds(len(rows), rows, self.rhs[rows], self.upper[rows])
+        if time_limit is not None:
+            self.highs.setOptionValue("time_limit", float(time_limit))
+
+    def solve(self, initial=None, stats=None):
+        stats = stats if stats is not None else SolveStats(self.backend.name)
+        status, objective_value, values = self.backend._run(self.highs, initial, stats, False,
+                                                            self.mip_gap)
+        if values is None:
+            return status, None, None
+        return status, objective_value, np.rint(values).astype(np.int8)
+
+
+BACKENDS = {backend.name: backend for backend in (HighsBackend(), ScipyBackend(), CbcBackend())}
+
+
+def select_backend(name=None):
+    """
+    Returns the solver backend called `name`, falling back if it is not installed.
+
+    Args:
+        name (str, optional): "highs", "scipy", "cbc", or None/"auto" for the
+            first available one in BACKEND_ORDER.
+
+    Returns:
+        SolverBackend: The backend to use.
+    """
+    if name is None or name == "auto":
+        for candidate in BACKEND_ORDER:
+            if BACKENDS[candidate].available():
+                return BACKENDS[candidate]
+        raise RuntimeError("No MIP solver backend is available.")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'. Expected one of {tuple(BACKENDS)}.")
+    backend = BACKENDS[name]
+    if not backend.available():
+        fallback = select_backend()
+        print(f"The {name} backend is not available; using {fallback.name} instead.")
+        return fallback
+    return backend
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""
+Batch runner that solves many scenario variants of the assignment problem on a process pool.
+
+Every term dozens of variants are solved: different campuses, fall and spring,
+and load policies such as sabbatical adjustments to `professor_load`. Running
+each one as its own script invocation re-imports pulp and pandas and reloads the
+same data every time. Here a manifest lists the scenarios instead. Each one is a
+data source plus overrides:
+
+    {
+      "defaults": {"engine": "flow"},
+      "scenarios": [
+        {"name": "fall", "source": {"type": "sqlite", "path": "university.db", "term": "Fall"}},
+        {"name": "fall-sabbatical", "source": {"type": "sqlite", "path": "university.db", "term": "Fall"},
+         "professor_load": {"Prof_A": 0}, "course_demand": {"Databases": 2},
+         "preferences": {"Prof_B": {"Databases": 999}}, "output": "fall-sabbatical.csv"}
+      ]
+    }
+
+- "source" is "hardcoded", or {"type": "csv", "path": folder}, or
+  {"type": "sqlite", "path": file, "department": ..., "term": ...}, or
+  {"type": "instance", "path": folder} for a saved ProblemInstance, which is
+  memory-mapped and reaches the workers as its folder name only.
+- "professor_load" and "course_demand" replace single amounts.
+- "preferences" replaces single costs (999 forbids a pair).
+- "engine", "backend", "threads", "mip_gap", "time_limit" and "precheck" are
+  passed to `build_and_solve_model`.
+- "output" writes the assignment to a CSV, JSON Lines or SQLite file.
+- "ignore_times": true solves without the course meeting times of a CSV or
+  SQLite source (see timeConflicts.py). The "flow" and "heuristic" engines
+  cannot enforce them and always ignore them; their records then carry
+  "times_ignored".
+
+Keys under "defaults" apply to every scenario that does not set them. A manifest
+can also be a plain JSON list of scenarios, or a JSON Lines file with one
+scenario per line.
+
+Each distinct source is loaded once, in this process, into a compact
+ProblemInstance (see problemInstance.py). The instances are handed to every
+worker once, when it starts, and never per scenario.
+Under the fork start method they are inherited without being copied at all.
+Workers then only apply their scenario's overrides to those arrays. Records are
+yielded as soon as each scenario finishes, in completion order.
+
+Usage:
+    python batchRunner.py scenarios.json --workers 4 --output batch_results.jsonl
+
+    for record in run_batch(load_manifest("scenarios.json"), max_workers=4):
+        print(record["name"], record["objective"], record["wall_s"])
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from eligibility import FORBIDDEN_COST, EligibilityIndex
+from problemInstance import ProblemInstance
+from ProfessorAssignmentModular import (build_and_solve_model, get_data_from_csvs,
+                                        get_data_from_database, get_data_hardcoded)
+from results import extract_assignment, write_results
+from solution import STATUS_NAMES
+
+RESULTS_FILE = "batch_results.jsonl"
+# Scenario keys passed through to build_and_solve_model.
+SOLVER_OPTIONS = ("engine", "backend", "threads", "mip_gap", "time_limit", "precheck")
+OVERRIDES = ("professor_load", "course_demand", "preferences")
+SCENARIO_KEYS = {"name", "source", "output", "ignore_times"} | set(SOLVER_OPTIONS) | set(OVERRIDES)
+SINK_EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".db": "sqlite", ".sqlite": "sqlite"}
+
+# The base data of every source, set in each worker by `_init_worker`.
+_BASES = {}
+
+
+def source_key(source):
+    """Returns a canonical string for a scenario's source, used to share its base data."""
+    return json.dumps(source, sort_keys=True)
+
+
+def load_source(source):
+    """
+    Loads the data of one scenario source.
+
+    Args:
+        source (str or dict): "hardcoded", or a dict with a "type" of "hardcoded",
+            "csv" (with a "path" folder), "sqlite" (with a "path" and optional
+            "department" and "term" filters) or "instance" (with the "path" of
+            a folder written by `ProblemInstance.save`).
+
+    Returns:
+        ProblemInstance: The loaded data. The hardcoded source keeps its
+                         forbidden pairs; the CSV and SQLite loaders drop them
+                         while reading. A scenario that lowers the cost of a
+                         dropped pair adds it back (see `apply_overrides`).
+    """
+    if isinstance(source, str):
+        source = {"type": source}
+    if source.get("type") == "instance":
+        return ProblemInstance.open(source["path"])
+    kind = source.get("type")
+    if kind == "hardcoded":
+        data = get_data_hardcoded()
+    elif kind == "csv":
+        data = get_data_from_csvs(source.get("path", "."))
+    elif kind == "sqlite":
+        data = get_data_from_database(source.get("path", "university.db"),
+                                      department=source.get("department"), term=source.get("term"))
+    else:
+        raise ValueError(f"Unknown source type '{kind}'. Expected hardcoded, csv, sqlite or instance.")
+    return data
+
+
+def load_manifest(path):
+    """
+    Reads a scenario manifest and applies its defaults.
+
+    Args:
+        path (str): A JSON file (an object with "defaults" and "scenarios", or a
+            list of scenarios) or a JSON Lines file with one scenario per line.
+
+    Returns:
+        list: The scenarios as dictionaries, each with a unique "name".
+
+    Raises:
+        ValueError: If a scenario has an unknown key, no source, or a duplicate name.
+    """
+    with open(path) as manifest_file:
+        if path.endswith(".jsonl"):
+            manifest = [json.loads(line) for line in manifest_file if line.strip()]
+        else:
+            manifest = json.load(manifest_file)
+    if isinstance(manifest, list):
+        manifest = {"scenarios": manifest}
+
+    defaults = manifest.get("defaults", {})
+    scenarios, names = [], set()
+    for position, entry in enumerate(manifest.get("scenarios", [])):
+        scenario = {**defaults, **entry}
+        scenario.setdefault("name", f"scenario_{position}")
+        unknown = set(scenario) - SCENARIO_KEYS
+        if unknown:
+            raise ValueError(f"Scenario '{scenario['name']}' has unknown keys: {sorted(unknown)}.")
+        if "source" not in scenario:
+            raise ValueError(f"Scenario '{scenario['name']}' has no source.")
+        if scenario["name"] in names:
+            raise ValueError(f"Duplicate scenario name '{scenario['name']}'.")
+        names.add(scenario["name"])
+        scenarios.append(scenario)
+    return scenarios
+
+
+def apply_overrides(base, scenario, forbidden_cost=FORBIDDEN_COST):
+    """
+    Builds one scenario's problem from its base data and overrides.
+
+    Args:
+        base (ProblemInstance): The data of the scenario's source.
+        scenario (dict): The scenario, with optional "professor_load",
+            "course_demand" and "preferences" overrides.
+        forbidden_cost (int, optional): The "cannot teach" cost threshold.
+
+    Returns:
+        ProblemInstance: The scenario's problem, with only the pairs below
+                         `forbidden_cost`.
+
+    Raises:
+        ValueError: If an override names an unknown professor or course.
+    """
+    professors, courses = base.professors, base.courses
+    prof_ids, course_ids = base.preferences.prof_ids, base.preferences.course_ids
+
+    def ids(names, table, what):
+        missing = [name for name in names if name not in table]
+        if missing:
+            raise ValueError(f"Scenario '{scenario['name']}' overrides unknown {what}: {missing}.")
+        return [table[name] for name in names]
+
+    load = base.load.copy()
+    overrides = scenario.get("professor_load", {})
+    load[ids(overrides, prof_ids, "professors")] = list(overrides.values())
+    demand = base.demand.copy()
+    overrides = scenario.get("course_demand", {})
+    demand[ids(overrides, course_ids, "courses")] = list(overrides.values())
+
+    prof_idx, course_idx, cost = base.preferences.prof_idx, base.preferences.course_idx, base.preferences.cost
+    changes = [(p, c, value) for p, row in scenario.get("preferences", {}).items()
+               for c, value in row.items()]
+    if changes:
+        change_prof = np.array(ids([p for p, _, _ in changes], prof_ids, "professors"), dtype=np.int64)
+        change_course = np.array(ids([c for _, c, _ in changes], course_ids, "courses"), dtype=np.int64)
+        change_cost = np.array([value for _, _, value in changes], dtype=np.int64)
+        # Pairs are sorted by professor and course, so their flat keys are sorted too.
+        keys = prof_idx * len(courses) + course_idx
+        change_keys = change_prof * len(courses) + change_course
+        pos = np.minimum(np.searchsorted(keys, change_keys), max(len(keys) - 1, 0))
+        found = (keys[pos] == change_keys) if len(keys) else np.zeros(len(changes), dtype=bool)
+        cost = cost.copy()
+        cost[pos[found]] = change_cost[found]
+        new = ~found
+        prof_idx = np.concatenate([prof_idx, change_prof[new]])
+        course_idx = np.concatenate([course_idx, change_course[new]])
+        cost = np.concatenate([cost, change_cost[new]])
+
+    if changes:
+        eligibility = EligibilityIndex(professors, courses, prof_idx, course_idx, cost)
+    else:
+        eligibility = base.preferences
+    return ProblemInstance(eligibility.restrict(forbidden_cost), demand, load, base.conflicts)
+
+
+def _init_worker(bases):
+    """Worker initializer: keeps the base data of every source for all later scenarios."""
+    _BASES.update(bases)
+
+
+def _solve_scenario(scenario, forbidden_cost=FORBIDDEN_COST):
+    """
+    Worker: solves one scenario and returns a JSON-serializable record.
+
+    A scenario that fails is reported with an "error" entry instead of
+    stopping the batch.
+    """
+    start = time.perf_counter()
+    record = {"name": scenario["name"], "worker": os.getpid()}
+    try:
+        instance = apply_overrides(_BASES[source_key(scenario["source"])], scenario, forbidden_cost)
+        options = {key: scenario[key] for key in SOLVER_OPTIONS if key in scenario}
+        if instance.conflicts is not None and (
+                scenario.get("ignore_times") or options.get("engine") in ("flow", "heuristic")):
+            options["conflicts"] = False
+            record["times_ignored"] = True
+        with contextlib.redirect_stdout(io.StringIO()):
+            model, assignment_vars = build_and_solve_model(
+                instance, forbidden_cost=forbidden_cost, **options
+            )
+        result = extract_assignment(model, assignment_vars, instance)
+        if scenario.get("output") and len(result):
+            output = scenario["output"]
+            write_results(result, SINK_EXTENSIONS.get(os.path.splitext(output)[1].lower(), "csv"),
+                          output)
+        record.update(result.summary())
+        record["status"] = STATUS_NAMES[model.status]
+        record["timings"] = dict(model.stats.timings)
+        if getattr(model, "feasibility", None) is not None:
+            record["explanation"] = model.feasibility.explain()
+    except Exception as error:  # one bad scenario must not stop the batch
+        record["error"] = f"{type(error).__name__}: {error}"
+    record["wall_s"] = time.perf_counter() - start
+    return record
+
+
+def run_batch(scenarios, max_workers=None, forbidden_cost=FORBIDDEN_COST):
+    """
+    Solves every scenario on a process pool and yields records as they finish.
+
+    Args:
+        scenarios (list): Scenarios as returned by `load_manifest`.
+        max_workers (int, optional): The size of the process pool. Defaults to
+            the number of CPUs; 1 solves the scenarios in this process.
+        forbidden_cost (int, optional): The "cannot teach" cost threshold.
+
+    Yields:
+        dict: One record per scenario, in completion order: its name, status,
+              objective, assignment summary, phase timings, wall time and the
+              worker's process id (or an "error").
+    """
+    bases = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for scenario in scenarios:
+            key = source_key(scenario["source"])
+            if key not in bases:
+                bases[key] = load_source(scenario["source"])
+
+    if max_workers == 1 or len(scenarios) <= 1:
+        _init_worker(bases)
+        for scenario in scenarios:
+            yield _solve_scenario(scenario, forbidden_cost)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(bases,)) as executor:
+        futures = [executor.submit(_solve_scenario, scenario, forbidden_cost)
+                   for scenario in scenarios]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve a manifest of assignment scenarios in parallel.")
+    parser.add_argument("manifest", help="JSON or JSON Lines scenario manifest")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPUs)")
+    parser.add_argument("--output", default=RESULTS_FILE, help="JSON lines file to append records to")
+    args = parser.parse_args()
+
+    scenarios = load_manifest(args.manifest)
+    print(f"Solving {len(scenarios)} scenarios...")
+    print(f"{'scenario':<24} {'status':>10} {'objective':>10} {'seconds':>8}")
+    batch_start = time.perf_counter()
+    with open(args.output, "a") as out:
+        for record in run_batch(scenarios, max_workers=args.workers):
+            out.write(json.dumps(record, default=float) + "\n")
+            out.flush()
+            status = "error" if "error" in record else record["status"]
+            objective = record.get("objective")
+            print(f"{record['name']:<24} {status:>10} "
+                  f"{'-' if objective is None else format(objective, '.0f'):>10} "
+                  f"{record['wall_s']:>8.3f}" + (f"  {record['error']}" if "error" in record else ""))
+    print(f"Finished in {time.perf_counter() - batch_start:.2f}s; records appended to {args.output}.")
@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of the data loaders and solver engines on generated instances.
+
+Two benchmarks are available:
+
+- The phase suite (default) generates instances from small to large with
+  `codeGen.generate_synthetic_instance`. For every combination of data source
+  and engine, it times these phases separately:
+
+  - load: CSV and SQLite parse the generated files. "hardcoded" builds the
+    instance from the same data held as plain lists and dicts, as
+    `get_data_hardcoded` does, so all sources solve the same instance. The
+    data is read from the CSV files once when the suite is generated and
+    unpickled by the case, so pandas does not count towards its peak RSS;
+  - build: the eligibility index of the pairs below the forbidden cost, which
+    every engine starts from. The engine's own model building is part of
+    solve, and `solve_phases` splits it out;
+  - solve: `build_and_solve_model`;
+  - report: `display_results`.
+
+  The case first solves the sample data once, untimed, so that the modules
+  the loaders and engines import on first use do not count. It also records
+  the peak resident set size. The "pulp" engine is run with the CBC backend,
+  i.e. the PuLP model plus `model.solve()`; with an in-memory backend it would
+  solve exactly as "matrix". Each case runs in a fresh process so that peak
+  RSS belongs to that case alone. Results are appended as JSON lines to
+  `benchmark_results.jsonl`, one record per case, to track regressions between
+  versions.
+- The engine comparison (`--compare`) times `build_and_solve_model` with the
+  PuLP engine and CBC (the original `model.solve()` baseline) against the
+  min-cost-flow engine, checking that both reach the same objective. It runs
+  on the suite's instances, loaded into memory first, up to the sizes where
+  building the PuLP model dominates. PuLP is skipped above PULP_MAX_PAIRS.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --sizes 200x500 1000x2500 --engines flow matrix --sources csv sqlite
+    python benchmark.py --compare
+    python benchmark.py --compare --sizes 1000x2500 4000x10000
+"""
+import argparse
+import contextlib
+import json
+import os
+import pickle
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from ProfessorAssignmentModular import ENGINES, build_and_solve_model
+from solution import STATUS_NAMES
+
+# Instance sizes of the phase suite, from small to large.
+SUITE_SIZES = [(50, 100), (200, 500), (1000, 2500), (2000, 5000)]
+SOURCES = ("hardcoded", "csv", "sqlite")
+# The PuLP engine is skipped above this many eligible pairs: model building alone takes minutes.
+PULP_MAX_PAIRS = 200_000
+# The backend each engine is benchmarked with; "pulp" keeps the PuLP + CBC baseline.
+ENGINE_BACKENDS = {"pulp": "cbc"}
+RESULTS_FILE = "benchmark_results.jsonl"
+# The "hardcoded" source's plain lists and dicts, written next to the generated files.
+IN_MEMORY_FILE = "instance.pickle"
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silences stdout, including the output of solver subprocesses such as CBC."""
+    sys.stdout.flush()
+    saved = os.dup(1)
+    with open(os.devnull, "w") as devnull:
+        os.dup2(devnull.fileno(), 1)
+        try:
+            with contextlib.redirect_stdout(devnull):
+                yield
+        finally:
+            sys.stdout.flush()
+            os.dup2(saved, 1)
+            os.close(saved)
+
+
+def time_engine(data, engine):
+    """Returns (seconds, objective) for one solve, with the engine's output suppressed."""
+    start = time.perf_counter()
+    with quiet():
+        model, _ = build_and_solve_model(*data, engine=engine, backend=ENGINE_BACKENDS.get(engine))
+    elapsed = time.perf_counter() - start
+    return elapsed, model.stats.objective
+
+
+def peak_rss_mb():
+    """Returns the peak resident set size of this process in MiB, or None if unknown."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def generate_suite_files(num_profs, num_courses, folder, seed=0):
+    """
+    Writes a synthetic instance as CSV files, a SQLite database and the
+    in-memory data of the "hardcoded" source (see `in_memory_data`) in `folder`.
+
+    Departments of about 100 professors keep eligibility clustered, as in real
+    catalogs, so the number of eligible pairs grows roughly linearly with size.
+    """
+    from codeGen import generate_synthetic_instance
+
+    with quiet():
+        generate_synthetic_instance(
+            num_profs, num_courses, density=0.2, num_departments=max(1, num_profs // 100),
+            cross_density=0.002, seed=seed, folder=folder,
+            db_file=os.path.join(folder, "university.db"),
+        )
+        data = in_memory_data(folder)
+    with open(os.path.join(folder, IN_MEMORY_FILE), "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def in_memory_data(folder):
+    """Reads a generated instance into the plain lists and dicts that `get_data_hardcoded` starts from."""
+    from ProfessorAssignmentModular import get_data_from_csvs
+
+    instance = get_data_from_csvs(folder)
+    professors, courses, index = instance.professors, instance.courses, instance.preferences
+    preferences = {p: {} for p in professors}
+    for i, j, cost in zip(index.prof_idx.tolist(), index.course_idx.tolist(), index.cost.tolist()):
+        preferences[professors[i]][courses[j]] = cost
+    return professors, courses, preferences, instance.course_demand, instance.professor_load
+
+
+def warm_up(source, engine):
+    """Solves the sample data once, so that later timings leave out first-use imports."""
+    from ProfessorAssignmentModular import display_results, get_data_hardcoded
+
+    if source == "csv":
+        import pandas  # noqa: F401 (imported by the CSV loader on first use)
+    instance = get_data_hardcoded()
+    model, assignment_vars = build_and_solve_model(instance, engine=engine,
+                                                   backend=ENGINE_BACKENDS.get(engine))
+    display_results(model, assignment_vars, instance)
+
+
+def load_data(source, folder, data=None):
+    """
+    Loads one instance from `source`.
+
+    "hardcoded" builds the instance from `data` (see `in_memory_data`), or
+    returns the sample data when `data` is None.
+    """
+    from ProfessorAssignmentModular import (get_data_from_csvs, get_data_from_database,
+                                            get_data_hardcoded)
+    from problemInstance import ProblemInstance
+
+    if source == "hardcoded":
+        if data is None:
+            return get_data_hardcoded()
+        return ProblemInstance.from_data(*data)
+    if source == "csv":
+        return get_data_from_csvs(folder)
+    if source == "sqlite":
+        return get_data_from_database(os.path.join(folder, "university.db"))
+    raise ValueError(f"Unknown source '{source}'. Expected one of {SOURCES}.")
+
+
+def run_case(case):
+    """
+    Worker: times the load, build, solve and report phases of one case.
+
+    Args:
+        case (dict): The source, engine, size and instance folder of the case.
+
+    Returns:
+        dict: The case with the phase timings (seconds), the solve's own phase
+              split (see instrumentation.py), status, objective, number of
+              eligible pairs and peak RSS added.
+    """
+    from eligibility import build_eligibility_index
+    from ProfessorAssignmentModular import display_results
+
+    record = dict(case)
+    clock = time.perf_counter
+    with quiet():
+        warm_up(case["source"], case["engine"])
+        data = None
+        if case["source"] == "hardcoded":
+            # The "source code" of the instance, without the CSV loader's imports.
+            with open(os.path.join(case["folder"], IN_MEMORY_FILE), "rb") as f:
+                data = pickle.load(f)
+
+        start = clock()
+        professors, courses, preferences, course_demand, professor_load = load_data(
+            case["source"], case["folder"], data
+        )
+        record["load_s"] = clock() - start
+
+        start = clock()
+        eligibility = build_eligibility_index(professors, courses, preferences)
+        record["build_s"] = clock() - start
+        record["pairs"] = eligibility.num_pairs
+
+        if case["engine"] == "pulp" and eligibility.num_pairs > PULP_MAX_PAIRS:
+            record["skipped"] = f"more than {PULP_MAX_PAIRS} eligible pairs"
+            record["peak_rss_mb"] = peak_rss_mb()
+            return record
+
+        start = clock()
+        model, assignment_vars = build_and_solve_model(
+            professors, courses, preferences, course_demand, professor_load,
+            engine=case["engine"], eligibility=eligibility,
+            backend=ENGINE_BACKENDS.get(case["engine"])
+        )
+        record["solve_s"] = clock() - start
+        # The model build / handoff / solver split reported by build_and_solve_model.
+        record["solve_phases"] = dict(model.stats.timings)
+        record["nodes"], record["iterations"] = model.stats.nodes, model.stats.iterations
+
+        start = clock()
+        display_results(model, assignment_vars, preferences, professors, courses)
+        record["report_s"] = clock() - start
+
+    record["status"] = STATUS_NAMES[model.status]
+    record["objective"] = model.stats.objective
+    record["peak_rss_mb"] = peak_rss_mb()
+    return record
+
+
+def git_revision():
+    """Returns the current git commit of the benchmarked code, or None outside a checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes=SUITE_SIZES, sources=SOURCES, engines=ENGINES, output=RESULTS_FILE, seed=0):
+    """
+    Runs every (size, source, engine) case and appends one JSON line per case to `output`.
+
+    Args:
+        sizes (list): (professors, courses) pairs, small to large.
+        sources (tuple): Data sources to load from.
+        engines (tuple): Engines passed to `build_and_solve_model`.
+        output (str): The JSON lines file the records are appended to.
+        seed (int): The random seed of the generated instances.
+
+    Returns:
+        list: The records of all cases.
+    """
+    run = {"revision": git_revision(), "python": platform.python_version(),
+           "platform": platform.platform(), "started": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    records = []
+    header = (f"{'size':>12} {'source':>9} {'engine':>6} {'pairs':>8} {'load':>8} "
+              f"{'build':>8} {'solve':>8} {'report':>8} {'RSS MiB':>8}")
+    print(header)
+    # A fresh spawned process per case keeps peak RSS and import state separate.
+    context = get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp, open(output, "a") as out:
+        for num_profs, num_courses in sizes:
+            folder = os.path.join(tmp, f"{num_profs}x{num_courses}")
+            os.makedirs(folder)
+            generate_suite_files(num_profs, num_courses, folder, seed)
+            for source in sources:
+                for engine in engines:
+                    case = {"source": source, "engine": engine, "professors": num_profs,
+                            "courses": num_courses, "seed": seed, "folder": folder}
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        record = executor.submit(run_case, case).result()
+                    del record["folder"]
+                    record.update(run)
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+                    records.append(record)
+
+                    times = [f"{record[k]:>8.3f}" if k in record else f"{'-':>8}"
+                             for k in ("load_s", "build_s", "solve_s", "report_s")]
+                    rss = record["peak_rss_mb"]
+                    print(f"{num_profs:>5}x{num_courses:<6} {source:>9} {engine:>6} "
+                          f"{record['pairs']:>8} {' '.join(times)} "
+                          f"{rss if rss is None else round(rss):>8}"
+                          + (f"  (skipped: {record['skipped']})" if "skipped" in record else ""))
+    print(f"\nResults appended to {output}.")
+    return records
+
+
+def compare_engines(sizes=SUITE_SIZES, seed=0):
+    """
+    Prints the PuLP + CBC vs. flow engine comparison on the suite's instances.
+
+    Args:
+        sizes (list): (professors, courses) pairs, small to large.
+        seed (int): The random seed of the generated instances.
+    """
+    from ProfessorAssignmentModular import get_data_from_database
+
+    with quiet():
+        for engine in ("pulp", "flow"):
+            warm_up("hardcoded", engine)
+    print(f"{'size':>12} {'pairs':>8} {'pulp+cbc (s)':>12} {'flow (s)':>10} {'speedup':>8}  objective")
+    with tempfile.TemporaryDirectory() as tmp:
+        for num_profs, num_courses in sizes:
+            folder = os.path.join(tmp, f"{num_profs}x{num_courses}")
+            os.makedirs(folder)
+            generate_suite_files(num_profs, num_courses, folder, seed)
+            with quiet():
+                instance = get_data_from_database(os.path.join(folder, "university.db"))
+            pairs = instance.preferences.num_pairs
+            flow_time, flow_obj = time_engine(instance, "flow")
+            if pairs > PULP_MAX_PAIRS:
+                print(f"{num_profs:>5}x{num_courses:<6} {pairs:>8} {'-':>12} {flow_time:>10.3f} "
+                      f"{'-':>8}  {flow_obj:.0f}  (pulp skipped: more than {PULP_MAX_PAIRS} pairs)")
+                continue
+            pulp_time, pulp_obj = time_engine(instance, "pulp")
+            assert pulp_obj == flow_obj, (pulp_obj, flow_obj)
+            print(f"{num_profs:>5}x{num_courses:<6} {pairs:>8} {pulp_time:>12.3f} {flow_time:>10.3f} "
+                  f"{pulp_time / flow_time:>7.1f}x  {flow_obj:.0f}")
+
+
+def parse_size(text):
+    """Parses a size such as "1000x2500" into (professors, courses)."""
+    num_profs, num_courses = text.lower().split("x")
+    return int(num_profs), int(num_courses)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark loaders and solver engines.")
+    parser.add_argument("--compare", action="store_true",
+                        help="run the PuLP + CBC vs. flow comparison instead of the phase suite")
+    parser.add_argument("--sizes", nargs="+", type=parse_size, default=SUITE_SIZES,
+                        help="instance sizes as PROFESSORSxCOURSES")
+    parser.add_argument("--sources", nargs="+", choices=SOURCES, default=SOURCES)
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=ENGINES)
+    parser.add_argument("--output", default=RESULTS_FILE, help="JSON lines file to append to")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_engines(args.sizes, args.seed)
+    else:
+        run_suite(args.sizes, args.sources, args.engines, args.output, args.seed)
@@ -8,10 +8,44 @@ This script creates:
 
 These generated files can be used to test the data loading functions in the
 main optimization script.
+
+Without arguments the fixed 5-professor / 10-course example is written. Passing
+`--professors` and `--courses` instead generates a synthetic, benchmark-sized
+instance (see `generate_synthetic_instance`), for example:
+
+    python codeGen.py --professors 2000 --courses 5000 --density 0.05 --departments 20
 """
-import pandas as pd
-import sqlite3
+import argparse
+import csv
 import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from eligibility import FORBIDDEN_COST
+
+# The schema written to university.db; it matches sampleSQL.sql. The Preferences
+# index is created after the bulk insert, which is much faster than inserting
+# into an indexed table.
+SCHEMA = """
+DROP TABLE IF EXISTS Professors;
+DROP TABLE IF EXISTS Courses;
+DROP TABLE IF EXISTS CourseDemand;
+DROP TABLE IF EXISTS ProfessorLoad;
+DROP TABLE IF EXISTS Preferences;
+CREATE TABLE Professors (ProfessorName TEXT PRIMARY KEY);
+CREATE TABLE Courses (CourseName TEXT PRIMARY KEY);
+CREATE TABLE CourseDemand (CourseName TEXT PRIMARY KEY, Demand INTEGER NOT NULL);
+CREATE TABLE ProfessorLoad (ProfessorName TEXT PRIMARY KEY, Load INTEGER NOT NULL);
+CREATE TABLE Preferences (
+    ProfessorName TEXT NOT NULL,
+    CourseName TEXT NOT NULL,
+    Preference INTEGER NOT NULL
+);
+"""
+PREFERENCES_INDEX = ("CREATE UNIQUE INDEX IF NOT EXISTS idx_preferences_professor_course "
+                     "ON Preferences(ProfessorName, CourseName)")
 
 def get_data():
     """Returns the hardcoded data as pandas DataFrames."""
@@ -72,29 +106,215 @@ def create_csv_files(professors_df, courses_df, demand_df, load_df, prefs_df):
     prefs_df.to_csv("preferences.csv", index=False)
     print("CSV files created successfully.")
 
-def create_database(professors_df, courses_df, demand_df, load_df, prefs_df):
-    """Creates and populates a SQLite database."""
-    db_file = "university.db"
+def open_database(db_file):
+    """Creates a fresh database file with the schema and fast bulk-load settings."""
     if os.path.exists(db_file):
         os.remove(db_file)
         print(f"Removed existing database file '{db_file}'.")
-        
-    print(f"Creating SQLite database '{db_file}'...")
     conn = sqlite3.connect(db_file)
-    
-    # We need separate tables for courses and demand to match the SQL schema
-    courses_for_db = courses_df[['CourseName']]
-    
-    professors_df.to_sql("Professors", conn, index=False, if_exists='replace')
-    courses_for_db.to_sql("Courses", conn, index=False, if_exists='replace')
-    demand_df.to_sql("CourseDemand", conn, index=False, if_exists='replace')
-    load_df.to_sql("ProfessorLoad", conn, index=False, if_exists='replace')
-    prefs_df.to_sql("Preferences", conn, index=False, if_exists='replace')
-    
+    # The file is rebuilt from scratch on failure, so journaling is not needed.
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.executescript(SCHEMA)
+    return conn
+
+def create_database(professors_df, courses_df, demand_df, load_df, prefs_df):
+    """Creates and populates a SQLite database."""
+    db_file = "university.db"
+    print(f"Creating SQLite database '{db_file}'...")
+    conn = open_database(db_file)
+
+    # One transaction and one executemany per table.
+    with conn:
+        conn.executemany("INSERT INTO Professors VALUES (?)",
+                         professors_df[['ProfessorName']].itertuples(index=False))
+        conn.executemany("INSERT INTO Courses VALUES (?)",
+                         courses_df[['CourseName']].itertuples(index=False))
+        conn.executemany("INSERT INTO CourseDemand VALUES (?, ?)",
+                         demand_df[['CourseName', 'Demand']].itertuples(index=False))
+        conn.executemany("INSERT INTO ProfessorLoad VALUES (?, ?)",
+                         load_df[['ProfessorName', 'Load']].itertuples(index=False))
+        conn.executemany("INSERT INTO Preferences VALUES (?, ?, ?)",
+                         prefs_df[['ProfessorName', 'CourseName', 'Preference']].itertuples(index=False))
+        conn.execute(PREFERENCES_INDEX)
+
     conn.close()
     print("Database created and populated successfully.")
 
+def draw_costs(rng, size, distribution, max_cost):
+    """
+    Draws preference costs between 1 (first choice) and `max_cost`.
+
+    Args:
+        rng (np.random.Generator): The random generator.
+        size (int): The number of costs to draw.
+        distribution (str): "uniform" (every rank equally likely) or "skewed"
+            (geometric: most pairs are ranked 1 or 2).
+        max_cost (int): The largest cost.
+
+    Returns:
+        np.ndarray: The costs.
+    """
+    if distribution == "uniform":
+        return rng.integers(1, max_cost + 1, size)
+    if distribution == "skewed":
+        return np.minimum(rng.geometric(0.5, size), max_cost)
+    raise ValueError(f"Unknown cost distribution '{distribution}'. Expected 'uniform' or 'skewed'.")
+
+def generate_synthetic_instance(num_professors, num_courses, density=0.1, num_departments=1,
+                                cross_density=0.0, cost_distribution="uniform", max_cost=5,
+                                load_range=(3, 5), seed=0, folder=".", db_file="university.db",
+                                write_forbidden=True, batch_rows=100_000):
+    """
+    Streams a synthetic instance to the five CSV files and a SQLite database.
+
+    Professors and courses are split into `num_departments` contiguous
+    departments. A professor is eligible for a course in their own department
+    with probability `density` and for a course in another department with
+    probability `cross_density`. To guarantee feasibility, each professor's load
+    is first planted on distinct courses of their own department, those pairs
+    are made eligible, and course demand is set to the number of planted
+    sections, so total demand always equals total load.
+
+    Rows are generated one professor at a time and written in batches (CSV
+    writer plus `executemany` inside a single transaction), so memory stays
+    bounded by the number of courses, even for 10^7 pairs.
+
+    Args:
+        num_professors (int): The number of professors.
+        num_courses (int): The number of courses.
+        density (float): The probability that a same-department pair is eligible.
+        num_departments (int): The number of departments.
+        cross_density (float): The probability that a cross-department pair is eligible.
+        cost_distribution (str): "uniform" or "skewed" (see `draw_costs`).
+        max_cost (int): The largest preference cost of an eligible pair.
+        load_range (tuple): The (min, max) teaching load of a professor.
+        seed (int): The random seed.
+        folder (str): The directory for the CSV files.
+        db_file (str): The SQLite database path, or None to skip the database.
+        write_forbidden (bool): Also write the 999 rows of ineligible pairs, as
+            in the sample files. Set False to write only eligible pairs.
+        batch_rows (int): The number of preference rows written at a time.
+
+    Returns:
+        tuple: The number of preference rows written and the total demand.
+    """
+    rng = np.random.default_rng(seed)
+    prof_dept = np.arange(num_professors) * num_departments // num_professors
+    course_dept = np.arange(num_courses) * num_departments // num_courses
+    dept_courses = [np.flatnonzero(course_dept == d) for d in range(num_departments)]
+    min_load, max_load = load_range
+    if min(len(c) for c in dept_courses) < max_load:
+        raise ValueError("Every department needs at least as many courses as the maximum load.")
+
+    width = len(str(max(num_professors, num_courses) - 1))
+    professors = [f"Prof_{i:0{width}d}" for i in range(num_professors)]
+    courses = [f"Course_{j:0{width}d}" for j in range(num_courses)]
+    course_names = np.array(courses, dtype=object)
+    demand = np.zeros(num_courses, dtype=np.int64)
+
+    os.makedirs(folder, exist_ok=True)
+    conn = open_database(db_file) if db_file else None
+    rows_written = 0
+    batch = []
+
+    def flush(prefs_writer):
+        prefs_writer.writerows(batch)
+        if conn is not None:
+            conn.executemany("INSERT INTO Preferences VALUES (?, ?, ?)", batch)
+        batch.clear()
+
+    print(f"Generating {num_professors} professors x {num_courses} courses "
+          f"in {num_departments} department(s)...")
+    with open(os.path.join(folder, "professors.csv"), "w", newline="") as prof_file, \
+            open(os.path.join(folder, "professor_load.csv"), "w", newline="") as load_file, \
+            open(os.path.join(folder, "preferences.csv"), "w", newline="") as prefs_file:
+        prof_writer, load_writer, prefs_writer = (
+            csv.writer(prof_file), csv.writer(load_file), csv.writer(prefs_file)
+        )
+        prof_writer.writerow(["ProfessorName"])
+        load_writer.writerow(["ProfessorName", "Load"])
+        prefs_writer.writerow(["ProfessorName", "CourseName", "Preference"])
+        if conn is not None:
+            conn.execute("BEGIN")
+
+        for i, p in enumerate(professors):
+            load = int(rng.integers(min_load, max_load + 1))
+            own = dept_courses[prof_dept[i]]
+            planted = rng.choice(own, size=load, replace=False)
+            demand[planted] += 1
+
+            probability = np.where(course_dept == prof_dept[i], density, cross_density)
+            eligible = rng.random(num_courses) < probability
+            eligible[planted] = True
+            cost = np.full(num_courses, FORBIDDEN_COST, dtype=np.int64)
+            cost[eligible] = draw_costs(rng, int(eligible.sum()), cost_distribution, max_cost)
+
+            keep = slice(None) if write_forbidden else eligible
+            batch.extend(zip([p] * len(course_names[keep]), course_names[keep].tolist(),
+                             cost[keep].tolist()))
+            prof_writer.writerow([p])
+            load_writer.writerow([p, load])
+            if conn is not None:
+                conn.execute("INSERT INTO Professors VALUES (?)", (p,))
+                conn.execute("INSERT INTO ProfessorLoad VALUES (?, ?)", (p, load))
+            if len(batch) >= batch_rows:
+                rows_written += len(batch)
+                flush(prefs_writer)
+        rows_written += len(batch)
+        flush(prefs_writer)
+
+    with open(os.path.join(folder, "courses.csv"), "w", newline="") as course_file, \
+            open(os.path.join(folder, "course_demand.csv"), "w", newline="") as demand_file:
+        course_writer, demand_writer = csv.writer(course_file), csv.writer(demand_file)
+        course_writer.writerow(["CourseName"])
+        course_writer.writerows([c] for c in courses)
+        demand_writer.writerow(["CourseName", "Demand"])
+        demand_writer.writerows(zip(courses, demand.tolist()))
+
+    if conn is not None:
+        conn.executemany("INSERT INTO Courses VALUES (?)", ([c] for c in courses))
+        conn.executemany("INSERT INTO CourseDemand VALUES (?, ?)", zip(courses, demand.tolist()))
+        conn.execute(PREFERENCES_INDEX)
+        conn.commit()
+        conn.close()
+
+    print(f"Wrote {rows_written} preference rows; total demand = total load = {int(demand.sum())}.")
+    return rows_written, int(demand.sum())
+
+def parse_args():
+    """Parses the command-line options of the synthetic generator."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--professors", type=int, help="number of professors (synthetic mode)")
+    parser.add_argument("--courses", type=int, help="number of courses (synthetic mode)")
+    parser.add_argument("--density", type=float, default=0.1,
+                        help="eligibility probability within a department")
+    parser.add_argument("--departments", type=int, default=1, help="number of departments")
+    parser.add_argument("--cross-density", type=float, default=0.0,
+                        help="eligibility probability across departments")
+    parser.add_argument("--costs", choices=["uniform", "skewed"], default="uniform",
+                        help="cost distribution of eligible pairs")
+    parser.add_argument("--max-cost", type=int, default=5, help="largest cost of an eligible pair")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--folder", default=".", help="output directory for the CSV files")
+    parser.add_argument("--db", default="university.db", help="SQLite output file ('' to skip)")
+    parser.add_argument("--eligible-only", action="store_true",
+                        help="write only eligible pairs, not the 999 rows")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.professors or args.courses:
+        if not (args.professors and args.courses):
+            raise SystemExit("Both --professors and --courses are required for a synthetic instance.")
+        generate_synthetic_instance(
+            args.professors, args.courses, density=args.density,
+            num_departments=args.departments, cross_density=args.cross_density,
+            cost_distribution=args.costs, max_cost=args.max_cost, seed=args.seed,
+            folder=args.folder, db_file=args.db or None, write_forbidden=not args.eligible_only,
+        )
+        raise SystemExit(0)
+
     # Get data as pandas DataFrames
     professors, courses, demand, load, prefs = get_data()
     
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Parallel decomposition of the assignment problem into independent departments.
+
+Eligibility splits naturally into clusters: CS faculty never teach Math sections
+and the reverse. In the bipartite graph whose nodes are professors and courses
+and whose edges are eligible pairs, each connected component is a subproblem
+that shares no variables or constraints with the others. We find the components,
+solve each one as its own model on a process pool, and merge the answers back
+into one assignment and objective for `display_results`. Wall-clock time then
+scales with the largest department instead of the whole university.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from eligibility import build_eligibility_index
+from instrumentation import SolveStats
+from solution import (SOLUTION_STATUSES, STATUS_FEASIBLE, STATUS_INFEASIBLE, STATUS_OPTIMAL,
+                      SolvedModel, build_assignment_vars)
+
+
+def find_components(eligibility):
+    """
+    Finds the connected components of the professor-course eligibility graph.
+
+    Args:
+        eligibility (EligibilityIndex): The eligible pairs.
+
+    Returns:
+        tuple: The number of components, the component label of each professor
+               and the component label of each course.
+    """
+    num_profs, num_courses = len(eligibility.professors), len(eligibility.courses)
+    graph = csr_matrix(
+        (np.ones(eligibility.num_pairs, dtype=np.int8),
+         (eligibility.prof_idx, num_profs + eligibility.course_idx)),
+        shape=(num_profs + num_courses, num_profs + num_courses),
+    )
+    num_components, labels = connected_components(graph, directed=False)
+    return num_components, labels[:num_profs], labels[num_profs:]
+
+
+def _solve_component(task):
+    """
+    Worker: solves one component and returns plain, picklable results.
+
+    Args:
+        task (tuple): (professors, courses, preferences, course_demand,
+            professor_load, engine, options) for the component, where `options`
+            holds the solver options passed on to `build_and_solve_model`.
+
+    Returns:
+        tuple: The status code, the objective value, the list of assigned
+               (professor, course) name pairs and the component's statistics.
+    """
+    # Imported here to avoid a circular import with the main module.
+    from ProfessorAssignmentModular import build_and_solve_model
+
+    professors, courses, preferences, course_demand, professor_load, engine, options = task
+    # The component's preferences hold only eligible pairs already, so no threshold.
+    model, assignment_vars = build_and_solve_model(
+        professors, courses, preferences, course_demand, professor_load,
+        engine=engine, forbidden_cost=None, **options
+    )
+    assigned = [
+        (p, c) for p in professors for c in preferences[p]
+        if assignment_vars[p][c].varValue is not None and round(assignment_vars[p][c].varValue) == 1
+    ]
+    return model.status, model.stats.objective, assigned, model.stats.as_dict()
+
+
+def build_and_solve_decomposed(professors, courses, preferences, course_demand, professor_load,
+                               engine="flow", eligibility=None, max_workers=None, stats=None,
+                               **options):
+    """
+    Solves each connected component of the eligibility graph as its own model.
+
+    Args:
+        professors (list): A list of professor names.
+        courses (list): A list of course names.
+        preferences (dict): A nested dictionary of preferences.
+        course_demand (dict): A dictionary of course demand.
+        professor_load (dict): A dictionary of professor teaching loads.
+        engine (str): The engine used for every component (see `build_and_solve_model`).
+        eligibility (EligibilityIndex, optional): The eligible pairs. Built
+            from `preferences` when not given.
+        max_workers (int, optional): The size of the process pool. Defaults to
+            the number of CPUs; 1 solves the components in this process.
+        stats (SolveStats, optional): Receives the decomposition and solve
+            timings and the model sizes and effort summed over the components.
+        **options: Solver options (backend, threads, mip_gap, time_limit,
+            precheck) applied to every component.
+
+    Returns:
+        tuple: A tuple containing the merged solved model and the assignment variables.
+    """
+    if stats is None:
+        stats = SolveStats(engine)
+    if eligibility is None:
+        eligibility = build_eligibility_index(professors, courses, preferences)
+    with stats.phase("decompose"):
+        tasks, status = _component_tasks(professors, courses, course_demand, professor_load,
+                                         engine, eligibility, options)
+
+    # Largest departments first so that they do not end up as the stragglers.
+    tasks.sort(key=lambda task: len(task[0]) + len(task[1]), reverse=True)
+    print(f"Solving {len(tasks)} independent components "
+          f"(largest has {len(tasks[0][0]) if tasks else 0} professors)...")
+    with stats.phase("solve"):
+        if max_workers == 1 or len(tasks) <= 1:
+            results = list(map(_solve_component, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_solve_component, tasks))
+
+    position = {p: i for i, p in enumerate(professors)}
+    course_position = {c: j for j, c in enumerate(courses)}
+    objective, assigned_pairs = 0, []
+    for comp_status, comp_objective, comp_assigned, comp_stats in results:
+        for name in ("num_variables", "num_constraints", "nonzeros", "nodes", "iterations"):
+            if comp_stats[name] is not None:
+                setattr(stats, name, (getattr(stats, name) or 0) + comp_stats[name])
+        if comp_status not in SOLUTION_STATUSES:
+            if status in SOLUTION_STATUSES:
+                status = comp_status
+            continue
+        if comp_status == STATUS_FEASIBLE and status == STATUS_OPTIMAL:
+            status = STATUS_FEASIBLE  # e.g. a heuristic component that is not proven optimal
+        objective += comp_objective
+        assigned_pairs.extend((position[p], course_position[c]) for p, c in comp_assigned)
+
+    if status not in SOLUTION_STATUSES:
+        objective, assigned_pairs = None, []
+    stats.gap = 0.0 if status == STATUS_OPTIMAL else None
+    model = SolvedModel("Professor_Course_Assignment", status, objective)
+    return model, build_assignment_vars(professors, courses, assigned_pairs)
+
+
+def _component_tasks(professors, courses, course_demand, professor_load, engine, eligibility,
+                     options=None):
+    """
+    Splits the problem into one solver task per connected component.
+
+    Returns:
+        tuple: The list of tasks for `_solve_component` and the status implied
+               by isolated professors and courses (infeasible if any of them
+               must teach or be taught).
+    """
+    num_components, prof_labels, course_labels = find_components(eligibility)
+    pair_labels = prof_labels[eligibility.prof_idx]
+
+    # Group professors, courses and pairs by component with one sort each.
+    prof_groups = np.split(np.argsort(prof_labels, kind="stable"),
+                           np.cumsum(np.bincount(prof_labels, minlength=num_components))[:-1])
+    course_groups = np.split(np.argsort(course_labels, kind="stable"),
+                             np.cumsum(np.bincount(course_labels, minlength=num_components))[:-1])
+    pair_groups = np.split(np.argsort(pair_labels, kind="stable"),
+                           np.cumsum(np.bincount(pair_labels, minlength=num_components))[:-1])
+
+    status, tasks = STATUS_OPTIMAL, []
+    for prof_ids, course_ids, pair_ids in zip(prof_groups, course_groups, pair_groups):
+        comp_profs = [professors[i] for i in prof_ids]
+        comp_courses = [courses[j] for j in course_ids]
+        comp_demand = {c: course_demand[c] for c in comp_courses}
+        comp_load = {p: professor_load[p] for p in comp_profs}
+        if len(pair_ids) == 0:
+            # An isolated professor or course: feasible only if nothing is required of it.
+            if any(comp_demand.values()) or any(comp_load.values()):
+                status = STATUS_INFEASIBLE
+            continue
+        comp_prefs = {p: {} for p in comp_profs}
+        for k in pair_ids.tolist():
+            p = professors[eligibility.prof_idx[k]]
+            comp_prefs[p][courses[eligibility.course_idx[k]]] = int(eligibility.cost[k])
+        tasks.append((comp_profs, comp_courses, comp_prefs, comp_demand, comp_load, engine,
+                      options or {}))
+    return tasks, status
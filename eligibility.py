@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Sparse eligibility index for the professor-course assignment problem.
+
+The preference data uses the sentinel cost 999 to mean "this professor cannot
+teach this course". Creating a decision variable for such a pair only makes the
+model bigger: in real data most pairs are ineligible. This module builds, once
+at load time, a compact index of the pairs that are actually allowed:
+
+- flat arrays `prof_idx`, `course_idx` and `cost`, one entry per eligible pair,
+  sorted by professor and then course;
+- a per-professor adjacency (`prof_ptr`, CSR style) into those arrays;
+- a per-course adjacency (`course_ptr` and `course_order`, CSC style).
+
+The model builders create variables and constraint coefficients only for these
+pairs, so model size grows with the number of eligible pairs instead of P x C.
+
+An index can also stand in for the nested `preferences` dictionary: it is a
+read-only mapping, so `index[p][c]` returns the cost of an eligible pair. The
+CSV loader returns one directly instead of building a dict of dicts.
+"""
+from collections.abc import Mapping
+
+import numpy as np
+
+# Preference costs at or above this value mean "cannot teach".
+FORBIDDEN_COST = 999
+
+# The arrays that make up an index, as saved by problemInstance.py.
+INDEX_ARRAYS = ("prof_idx", "course_idx", "cost", "prof_ptr", "course_order", "course_ptr")
+
+
+class PreferenceRow(Mapping):
+    """One professor's eligible courses and costs, read from an EligibilityIndex."""
+    __slots__ = ("_index", "_start", "_end")
+
+    def __init__(self, index, start, end):
+        self._index = index
+        self._start = start
+        self._end = end
+
+    def __getitem__(self, course):
+        index = self._index
+        c_idx = index.course_ids.get(course)
+        if c_idx is not None:
+            row = index.course_idx[self._start:self._end]
+            pos = np.searchsorted(row, c_idx)
+            if pos < len(row) and row[pos] == c_idx:
+                return int(index.cost[self._start + pos])
+        raise KeyError(course)
+
+    def __iter__(self):
+        courses = self._index.courses
+        return (courses[j] for j in self._index.course_idx[self._start:self._end].tolist())
+
+    def __len__(self):
+        return int(self._end - self._start)
+
+
+class EligibilityIndex(Mapping):
+    """
+    The allowed (professor, course) pairs and their costs, with adjacency in both directions.
+
+    As a mapping it behaves like a read-only `preferences` dictionary keyed by
+    professor name, holding only the eligible pairs.
+
+    Attributes:
+        professors (list): The professor names; positions are professor ids.
+        courses (list): The course names; positions are course ids.
+        prof_idx (np.ndarray): Professor id of each eligible pair.
+        course_idx (np.ndarray): Course id of each eligible pair.
+        cost (np.ndarray): Preference cost of each eligible pair.
+        prof_ptr (np.ndarray): Pairs of professor p are `prof_ptr[p]:prof_ptr[p + 1]`.
+        course_order (np.ndarray): Pair positions sorted by course.
+        course_ptr (np.ndarray): Pairs of course c are
+            `course_order[course_ptr[c]:course_ptr[c + 1]]`.
+    """
+    __slots__ = ("professors", "courses", "prof_idx", "course_idx", "cost",
+                 "prof_ptr", "course_order", "course_ptr", "_prof_ids", "_course_ids")
+
+    def __init__(self, professors, courses, prof_idx, course_idx, cost):
+        order = np.lexsort((course_idx, prof_idx))
+        self.professors = professors
+        self.courses = courses
+        self.prof_idx = np.asarray(prof_idx, dtype=np.int64)[order]
+        self.course_idx = np.asarray(course_idx, dtype=np.int64)[order]
+        self.cost = np.asarray(cost, dtype=np.int64)[order]
+
+        self.prof_ptr = np.zeros(len(professors) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.prof_idx, minlength=len(professors)), out=self.prof_ptr[1:])
+        self.course_order = np.argsort(self.course_idx, kind="stable")
+        self.course_ptr = np.zeros(len(courses) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.course_idx, minlength=len(courses)), out=self.course_ptr[1:])
+        self._prof_ids = None
+        self._course_ids = None
+
+    @classmethod
+    def from_arrays(cls, professors, courses, arrays):
+        """
+        Rebuilds an index from its INDEX_ARRAYS without sorting or copying them.
+
+        The arrays may be read-only memory maps; nothing here writes to them.
+
+        Args:
+            professors (list): The professor names; positions are professor ids.
+            courses (list): The course names; positions are course ids.
+            arrays (dict): The INDEX_ARRAYS of an existing index, by name.
+
+        Returns:
+            EligibilityIndex: The index.
+        """
+        index = cls.__new__(cls)
+        index.professors = professors
+        index.courses = courses
+        for name in INDEX_ARRAYS:
+            setattr(index, name, arrays[name])
+        index._prof_ids = None
+        index._course_ids = None
+        return index
+
+    def arrays(self):
+        """Returns the INDEX_ARRAYS of this index, by name."""
+        return {name: getattr(self, name) for name in INDEX_ARRAYS}
+
+    @property
+    def prof_ids(self):
+        """Maps professor names to ids (built on first use)."""
+        if self._prof_ids is None:
+            self._prof_ids = {p: i for i, p in enumerate(self.professors)}
+        return self._prof_ids
+
+    @property
+    def course_ids(self):
+        """Maps course names to ids (built on first use)."""
+        if self._course_ids is None:
+            self._course_ids = {c: j for j, c in enumerate(self.courses)}
+        return self._course_ids
+
+    def __getitem__(self, professor):
+        p_idx = self.prof_ids[professor]
+        return PreferenceRow(self, self.prof_ptr[p_idx], self.prof_ptr[p_idx + 1])
+
+    def __iter__(self):
+        return iter(self.professors)
+
+    def __len__(self):
+        return len(self.professors)
+
+    def restrict(self, forbidden_cost):
+        """Returns an index without the pairs whose cost is at or above `forbidden_cost`."""
+        if forbidden_cost is None or not (self.cost >= forbidden_cost).any():
+            return self
+        keep = self.cost < forbidden_cost
+        return EligibilityIndex(self.professors, self.courses, self.prof_idx[keep],
+                                self.course_idx[keep], self.cost[keep])
+
+    @property
+    def num_pairs(self):
+        """The number of eligible pairs."""
+        return len(self.cost)
+
+    def pairs_of_professor(self, p_idx):
+        """Returns the pair positions of professor `p_idx`."""
+        return np.arange(self.prof_ptr[p_idx], self.prof_ptr[p_idx + 1])
+
+    def pairs_of_course(self, c_idx):
+        """Returns the pair positions of course `c_idx`."""
+        return self.course_order[self.course_ptr[c_idx]:self.course_ptr[c_idx + 1]]
+
+    def courses_for(self, p_idx):
+        """Returns the ids of the courses professor `p_idx` may teach."""
+        return self.course_idx[self.prof_ptr[p_idx]:self.prof_ptr[p_idx + 1]]
+
+    def professors_for(self, c_idx):
+        """Returns the ids of the professors who may teach course `c_idx`."""
+        return self.prof_idx[self.pairs_of_course(c_idx)]
+
+    def __repr__(self):
+        return (f"EligibilityIndex({len(self.professors)} professors, "
+                f"{len(self.courses)} courses, {self.num_pairs} eligible pairs)")
+
+
+def build_eligibility_index(professors, courses, preferences, forbidden_cost=FORBIDDEN_COST):
+    """
+    Builds the sparse eligibility index from the nested preference dictionary.
+
+    Pairs whose cost is at or above `forbidden_cost`, and pairs missing from
+    `preferences` altogether, are treated as ineligible. If `preferences` is
+    already an EligibilityIndex over the same professors and courses, it is
+    reused as is.
+
+    Args:
+        professors (list): A list of professor names.
+        courses (list): A list of course names.
+        preferences (dict): A nested dictionary of preferences.
+        forbidden_cost (int, optional): The "cannot teach" threshold. Pass None
+            to keep every listed pair.
+
+    Returns:
+        EligibilityIndex: The index of eligible pairs.
+    """
+    if (isinstance(preferences, EligibilityIndex) and list(preferences.professors) == list(professors)
+            and list(preferences.courses) == list(courses)):
+        return preferences.restrict(forbidden_cost)
+
+    course_pos = {c: j for j, c in enumerate(courses)}
+    prof_idx, course_idx, cost = [], [], []
+    for i, p in enumerate(professors):
+        for c, pref in preferences.get(p, {}).items():
+            if (forbidden_cost is None or pref < forbidden_cost) and c in course_pos:
+                prof_idx.append(i)
+                course_idx.append(course_pos[c])
+                cost.append(pref)
+    return EligibilityIndex(professors, courses, prof_idx, course_idx, cost)
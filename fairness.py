@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Min-max fair assignment: first the smallest worst per-professor cost, then the cheapest schedule under it.
+
+Minimizing the total preference cost can leave one professor with all of their
+worst choices. The fair objective is lexicographic:
+
+1. minimize B, the largest total cost any single professor is given;
+2. among the schedules that give nobody more than B, minimize the total cost.
+
+The model is the assignment model plus one row per professor,
+`sum(cost[k] * x[k] for k of professor p) <= B`. It is built once, as arrays,
+and handed to a BoundedModel (see backends.py). Between solves only the upper
+bounds of those P rows change; HiGHS keeps the model loaded. The rows break the
+total unimodularity of the assignment matrix, so every solve is a MIP.
+
+B is found by bisection on the integer range [lower, upper]:
+
+- `upper` is the worst professor cost of the unbounded optimum (the first solve);
+- `lower` is the largest cost of any professor's `load` cheapest eligible courses.
+
+Each solve minimizes the total cost under its bound. A feasible answer moves
+`upper` down to the worst cost it actually gives, which may be below the bound;
+an infeasible one moves `lower` above the bound. The number of solves is at most
+2 + log2(upper - lower). The last feasible solve already minimizes the total cost
+under the final B, so the second stage needs no extra solve.
+"""
+import time
+
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+
+from backends import select_backend
+from eligibility import build_eligibility_index
+from instrumentation import SolveStats
+from matrixModel import build_matrix_model, problem_to_arrays
+from solution import (STATUS_FEASIBLE, STATUS_INFEASIBLE, STATUS_NOT_SOLVED, STATUS_OPTIMAL,
+                      SolvedModel, build_assignment_vars)
+
+
+def professor_cost_rows(prof_idx, cost, num_profs):
+    """Returns the (P, pairs) CSR matrix whose row p sums the cost of professor p's assignments."""
+    return csr_matrix((np.asarray(cost, dtype=np.float64), (prof_idx, np.arange(len(cost)))),
+                      shape=(num_profs, len(cost)))
+
+
+def professor_costs(prof_idx, cost, x, num_profs):
+    """Returns the total cost each professor is given by the 0/1 solution `x`."""
+    return np.bincount(prof_idx, weights=cost * x, minlength=num_profs).astype(np.int64)
+
+
+def worst_cost_lower_bound(eligibility, load):
+    """
+    Returns a lower bound on the worst per-professor cost of any feasible schedule.
+
+    Every professor teaches exactly `load[p]` courses, so they cost at least the
+    sum of their `load[p]` cheapest eligible courses.
+    """
+    order = np.lexsort((eligibility.cost, eligibility.prof_idx))
+    profs = eligibility.prof_idx[order]
+    rank = np.arange(len(order)) - eligibility.prof_ptr[profs]
+    cheapest = np.where(rank < load[profs], eligibility.cost[order], 0)
+    totals = np.bincount(profs, weights=cheapest, minlength=len(load))
+    return int(totals.max()) if len(totals) else 0
+
+
+def build_and_solve_fair_model(professors, courses, preferences, course_demand, professor_load,
+                               eligibility=None, time_limit=None, stats=None, backend=None,
+                               threads=None, mip_gap=None, conflicts=None):
+    """
+    Builds the bounded model once and bisects on the worst per-professor cost.
+
+    This is a drop-in alternative to `build_and_solve_model`: the returned pair
+    can be passed straight to `display_results`. The model also carries
+    `max_professor_cost` (B), `fairness_lower_bound` (the bisection's final
+    lower end) and `fairness_solves`.
+
+    Args:
+        professors (list): A list of professor names.
+        courses (list): A list of course names.
+        preferences (dict): A nested dictionary of preferences.
+        course_demand (dict): A dictionary of course demand.
+        professor_load (dict): A dictionary of professor teaching loads.
+        eligibility (EligibilityIndex, optional): The eligible pairs. Built
+            from `preferences` when not given.
+        time_limit (float, optional): A time limit in seconds for building the
+            model and all solves together; each solve gets what is left. When
+            it runs out the best schedule found so far is returned with status
+            Feasible, since B may then not be the smallest possible.
+        stats (SolveStats, optional): Receives the build and solve timings,
+            the model size and the solver effort summed over all solves.
+        backend (str, optional): The MIP solver backend (see backends.py).
+        threads (int, optional): The number of solver threads.
+        mip_gap (float, optional): The relative gap at which each solve may stop.
+        conflicts (ConflictGroups, optional): Courses that meet at the same
+            time (see timeConflicts.py).
+
+    Returns:
+        tuple: A tuple containing the solved model and the assignment variables.
+               Its status is Optimal only when the bisection converged and the
+               last schedule was proven optimal under B, and Feasible otherwise.
+    """
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    if stats is None:
+        stats = SolveStats("fair")
+    if eligibility is None:
+        eligibility = build_eligibility_index(professors, courses, preferences)
+    num_profs = len(professors)
+    with stats.phase("build"):
+        demand, load = problem_to_arrays(professors, courses, course_demand, professor_load)
+        objective, matrix, rhs = build_matrix_model(
+            eligibility.prof_idx, eligibility.course_idx, eligibility.cost, demand, load
+        )
+        upper = rhs
+        if conflicts is not None:
+            from timeConflicts import add_conflict_rows
+            matrix, rhs, conflict_upper = add_conflict_rows(matrix, rhs, conflicts, eligibility)
+            upper = rhs if conflict_upper is None else conflict_upper
+        # The per-professor cost rows go last; they start unbounded.
+        bound_rows = np.arange(matrix.shape[0], matrix.shape[0] + num_profs)
+        matrix = vstack([matrix, professor_cost_rows(eligibility.prof_idx, eligibility.cost,
+                                                     num_profs)]).tocsr()
+        upper = np.concatenate([upper, np.full(num_profs, np.inf)])
+        rhs = np.concatenate([rhs, np.full(num_profs, -np.inf)])
+        solver = select_backend(backend)
+        bounded = solver.bounded_model(objective, matrix, rhs, upper, threads=threads,
+                                       time_limit=time_limit, mip_gap=mip_gap)
+    stats.num_variables, stats.num_constraints = matrix.shape[1], matrix.shape[0]
+    stats.nonzeros = matrix.nnz
+
+    print(f"Solving the fair assignment problem (bisection, {solver.name})...")
+    nodes = iterations = 0
+    solves = 0
+    best = None  # (objective value, x, status, gap)
+
+    def solve(bound):
+        nonlocal nodes, iterations, solves
+        remaining = None
+        if deadline is not None:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return None
+        bounded.set_upper(bound_rows, bound, time_limit=remaining)
+        stats.gap = None
+        status, objective_value, x = bounded.solve(stats=stats)
+        solves += 1
+        nodes += stats.nodes or 0
+        iterations += stats.iterations or 0
+        return status, objective_value, x, stats.gap
+
+    result = solve(np.inf)
+    lower = worst_cost_lower_bound(eligibility, load.astype(np.int64))
+    status = result[0] if result is not None else STATUS_NOT_SOLVED
+    if result is not None and result[2] is not None:
+        best = result[1], result[2], result[0], result[3]
+        high = int(professor_costs(eligibility.prof_idx, eligibility.cost, best[1], num_profs).max())
+        while lower < high:
+            bound = (lower + high) // 2
+            result = solve(bound)
+            if result is None:
+                break  # out of time: keep the best schedule so far
+            if result[2] is None:
+                if result[0] != STATUS_INFEASIBLE:
+                    break  # a limit stopped the solve before it could decide
+                lower = bound + 1
+                continue
+            best = result[1], result[2], result[0], result[3]
+            high = int(professor_costs(eligibility.prof_idx, eligibility.cost, best[1],
+                                       num_profs).max())
+    print(f"Solver finished after {solves} solves.")
+    stats.nodes, stats.iterations = nodes, iterations
+
+    assigned_pairs = []
+    if best is None:
+        solved = SolvedModel("Professor_Course_Assignment", status)
+        solved.max_professor_cost = None
+    else:
+        chosen = np.flatnonzero(best[1])
+        assigned_pairs = zip(eligibility.prof_idx[chosen], eligibility.course_idx[chosen])
+        # Stopped early, B is not proven to be the smallest; a limited last solve
+        # leaves the total under B unproven.
+        proven = lower >= high and best[2] == STATUS_OPTIMAL
+        solved = SolvedModel("Professor_Course_Assignment",
+                             STATUS_OPTIMAL if proven else STATUS_FEASIBLE, best[0])
+        solved.max_professor_cost = high
+        stats.gap = best[3] if lower >= high else None
+    solved.fairness_lower_bound = lower
+    solved.fairness_solves = solves
+    return solved, build_assignment_vars(professors, courses, assigned_pairs)
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Min-cost-flow solver engine for the professor-course assignment problem.
+
+The assignment model only has course-demand and professor-load equalities over
+binary variables. That is a bipartite transportation problem, whose constraint
+matrix is totally unimodular, so it does not need branch-and-bound at all. We
+model it as a flow network:
+
+    source --(load[p], 0)--> professor p --(1, cost[p, c])--> course c --(demand[c], 0)--> sink
+
+and find a minimum-cost flow of value sum(demand) with the primal-dual method:
+a Dijkstra pass on reduced costs updates the node potentials, then a maximum
+flow on the zero-reduced-cost ("admissible") arcs augments as much flow as
+possible at that cost level. Both steps run in SciPy's compiled `csgraph`
+routines, and because preference costs take only a handful of distinct values
+the number of phases stays small. Every max flow is integral, so the resulting
+assignment is integral too.
+"""
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra, maximum_flow
+
+from eligibility import build_eligibility_index
+from instrumentation import SolveStats
+from solution import (STATUS_INFEASIBLE, STATUS_OPTIMAL, SolvedModel,
+                      build_assignment_vars)
+
+
+def _build_network(num_profs, num_courses, prof_idx, course_idx, cost, demand, load):
+    """Returns the (tail, head, capacity, cost) arc arrays of the flow network."""
+    source = 0
+    sink = num_profs + num_courses + 1
+    prof_nodes = 1 + np.arange(num_profs)
+    course_nodes = 1 + num_profs + np.arange(num_courses)
+
+    tail = np.concatenate([
+        np.full(num_profs, source), 1 + prof_idx, course_nodes,
+    ])
+    head = np.concatenate([
+        prof_nodes, 1 + num_profs + course_idx, np.full(num_courses, sink),
+    ])
+    capacity = np.concatenate([
+        load, np.ones(len(prof_idx), dtype=np.int64), demand,
+    ]).astype(np.int64)
+    arc_cost = np.concatenate([
+        np.zeros(num_profs, dtype=np.int64), cost, np.zeros(num_courses, dtype=np.int64),
+    ]).astype(np.int64)
+    return tail, head, capacity, arc_cost
+
+
+def min_cost_assignment(num_profs, num_courses, prof_idx, course_idx, cost, demand, load,
+                        stats=None):
+    """
+    Solves the transportation problem as a minimum-cost flow.
+
+    Args:
+        num_profs (int): The number of professors.
+        num_courses (int): The number of courses.
+        prof_idx (np.ndarray): Professor index of each candidate pair.
+        course_idx (np.ndarray): Course index of each candidate pair.
+        cost (np.ndarray): Integer preference cost of each candidate pair.
+        demand (np.ndarray): A length-C vector of course demand.
+        load (np.ndarray): A length-P vector of professor teaching loads.
+        stats (SolveStats, optional): Receives the number of primal-dual phases
+            as `iterations`.
+
+    Returns:
+        tuple: The pulp-style status code, the total cost, a 0/1 array telling
+               which candidate pairs are assigned, and the final node potentials
+               (source, professors, courses, sink), which are optimal duals.
+    """
+    prof_idx = np.asarray(prof_idx, dtype=np.int64)
+    course_idx = np.asarray(course_idx, dtype=np.int64)
+    cost = np.asarray(cost, dtype=np.int64)
+    demand = np.asarray(demand, dtype=np.int64)
+    load = np.asarray(load, dtype=np.int64)
+
+    num_nodes = num_profs + num_courses + 2
+    source, sink = 0, num_nodes - 1
+    tail, head, capacity, arc_cost = _build_network(
+        num_profs, num_courses, prof_idx, course_idx, cost, demand, load
+    )
+    pair_arcs = slice(num_profs, num_profs + len(prof_idx))
+
+    required = int(demand.sum())
+    if required != int(load.sum()):
+        return STATUS_INFEASIBLE, None, None, None
+
+    flow = np.zeros(len(tail), dtype=np.int64)
+    potential = np.zeros(num_nodes, dtype=np.int64)
+    total_flow = 0
+    if stats is not None:
+        stats.iterations = 0
+
+    while total_flow < required:
+        if stats is not None:
+            stats.iterations += 1
+        # Residual arcs: forward where capacity remains, backward where flow can be undone.
+        forward = flow < capacity
+        backward = flow > 0
+        res_tail = np.concatenate([tail[forward], head[backward]])
+        res_head = np.concatenate([head[forward], tail[backward]])
+        res_cap = np.concatenate([capacity[forward] - flow[forward], flow[backward]])
+        res_cost = np.concatenate([arc_cost[forward], -arc_cost[backward]])
+        reduced = res_cost + potential[res_tail] - potential[res_head]
+
+        # Dijkstra on reduced costs (all non-negative) from the source.
+        graph = csr_matrix(
+            (reduced.astype(np.float64), (res_tail, res_head)), shape=(num_nodes, num_nodes)
+        )
+        dist = dijkstra(graph, directed=True, indices=source)
+        if not np.isfinite(dist[sink]):
+            return STATUS_INFEASIBLE, None, None, None
+        potential += np.minimum(dist, dist[sink]).astype(np.int64)
+
+        # Augment along every shortest path at once with a max flow on admissible arcs.
+        admissible = (res_cost + potential[res_tail] - potential[res_head]) == 0
+        admissible_graph = csr_matrix(
+            (res_cap[admissible].astype(np.int32),
+             (res_tail[admissible], res_head[admissible])),
+            shape=(num_nodes, num_nodes),
+        )
+        result = maximum_flow(admissible_graph, source, sink)
+        pushed = int(result.flow_value)
+        if pushed == 0:
+            return STATUS_INFEASIBLE, None, None, None
+        # The max flow is antisymmetric, so cancelled flow shows up as a negative value.
+        flow += np.asarray(result.flow[tail, head]).ravel().astype(np.int64)
+        total_flow += pushed
+
+    assigned = flow[pair_arcs].astype(np.int8)
+    objective = int(cost @ assigned)
+    # Potentials are node prices: the dual of each course row is potential[course]
+    # and the dual of each professor row is -potential[professor].
+    return STATUS_OPTIMAL, objective, assigned, potential
+
+
+def build_and_solve_flow_model(professors, courses, preferences, course_demand, professor_load,
+                               eligibility=None, stats=None):
+    """
+    Builds and solves the assignment problem with the min-cost-flow engine.
+
+    Args:
+        professors (list): A list of professor names.
+        courses (list): A list of course names.
+        preferences (dict): A nested dictionary of preferences.
+        course_demand (dict): A dictionary of course demand.
+        professor_load (dict): A dictionary of professor teaching loads.
+        eligibility (EligibilityIndex, optional): The eligible pairs. Built
+            from `preferences` when not given.
+        stats (SolveStats, optional): Receives the build and solve timings, the
+            network size and the number of primal-dual phases.
+
+    Returns:
+        tuple: A tuple containing the solved model and the assignment variables.
+    """
+    if stats is None:
+        stats = SolveStats("flow")
+    if eligibility is None:
+        eligibility = build_eligibility_index(professors, courses, preferences)
+    with stats.phase("build"):
+        demand = np.array([course_demand[c] for c in courses], dtype=np.int64)
+        load = np.array([professor_load[p] for p in professors], dtype=np.int64)
+    # Flow arcs are the variables and nodes the conservation constraints.
+    stats.num_variables = eligibility.num_pairs + len(professors) + len(courses)
+    stats.num_constraints = len(professors) + len(courses) + 2
+    stats.nonzeros = 2 * stats.num_variables
+
+    print("Solving the assignment problem (min-cost flow)...")
+    with stats.phase("solve"):
+        status, objective_value, assigned, _ = min_cost_assignment(
+            len(professors), len(courses), eligibility.prof_idx, eligibility.course_idx,
+            eligibility.cost, demand, load, stats=stats
+        )
+    stats.gap = 0.0 if status == STATUS_OPTIMAL else None
+    print("Solver finished.")
+
+    assigned_pairs = []
+    if assigned is not None:
+        chosen = np.flatnonzero(assigned)
+        assigned_pairs = zip(eligibility.prof_idx[chosen], eligibility.course_idx[chosen])
+    model = SolvedModel("Professor_Course_Assignment", status, objective_value)
+    return model, build_assignment_vars(professors, courses, assigned_pairs)
@@ -0,0 +1,512 @@
+# -*- coding: utf-8 -*-
+"""
+Anytime heuristic engine for the professor-course assignment problem.
+
+For interactive use on very large instances a near-optimal assignment in a
+fraction of a second is worth more than a proven optimum in minutes. This
+engine works within a time budget:
+
+1. Greedy construction: courses are staffed most-constrained first, each by
+   its cheapest eligible professors that still have load left. Courses that
+   come up short are repaired with augmenting paths (a professor takes the
+   course and drops one of theirs, which another professor takes, ... until
+   someone with spare load is reached), so the result is always feasible when
+   the instance is.
+2. Lower bound: a Lagrangian relaxation of the professor-load constraints,
+   improved by a few vectorized subgradient steps. With the load constraints
+   priced out, each course simply takes its `demand` cheapest eligible pairs.
+3. Local search: ejection chains. Professor p1 drops course c1 for a cheaper
+   course c2, a current teacher p2 of c2 drops it for c3, ..., and the last
+   professor takes c1. Pairwise swaps (chains of two) are searched first,
+   depth-first, keeping only moves whose partial gains stay positive (the
+   Lin-Kernighan rule). Once they are exhausted, chains of any length are found
+   as negative cycles of the residual graph with a vectorized Bellman-Ford. If
+   none is left the assignment is optimal. The search stops at the time limit or
+   as soon as the bound proves optimality.
+
+The result reports the objective, the lower bound and the gap between them. Its
+status is Optimal only when optimality was proven, and Feasible otherwise. The
+time limit is checked during the greedy construction too; if it runs out before
+a first assignment is complete, the status is Not Solved.
+It can also be handed to the PuLP engine as a starting incumbent, via
+`build_and_solve_model(..., initial_assignment=assignment_vars)`.
+"""
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from eligibility import build_eligibility_index
+from instrumentation import SolveStats
+from solution import (STATUS_FEASIBLE, STATUS_INFEASIBLE, STATUS_NOT_SOLVED, STATUS_OPTIMAL,
+                      SolvedModel, build_assignment_vars)
+
+# The default time budget of the heuristic, in seconds.
+DEFAULT_TIME_LIMIT = 0.2
+# Share of the budget spent improving the lower bound.
+BOUND_SHARE = 0.25
+# The longest chain tried by the first, depth-first phase of the local search
+# (2 = pairwise swaps). Longer chains are left to the negative-cycle phase,
+# which finds them much faster.
+MAX_CHAIN_DEPTH = 2
+
+
+def lagrangian_bound(prof_idx, course_idx, cost, demand, load, upper_bound=None,
+                     deadline=None, max_iterations=50, course_order=None):
+    """
+    Computes a lower bound on the optimal cost by relaxing the professor loads.
+
+    For multipliers u, L(u) = sum over courses of their `demand` cheapest
+    reduced costs (cost - u[p]) plus u @ load is a lower bound; subgradient
+    steps on u raise it towards the optimum.
+
+    Args:
+        prof_idx (np.ndarray): Professor index of each eligible pair.
+        course_idx (np.ndarray): Course index of each eligible pair.
+        cost (np.ndarray): Integer preference cost of each eligible pair.
+        demand (np.ndarray): A length-C vector of course demand.
+        load (np.ndarray): A length-P vector of professor teaching loads.
+        upper_bound (float, optional): A known objective value, used as the step target.
+        deadline (float, optional): A `time.perf_counter()` value to stop at.
+            At least one step is always taken.
+        max_iterations (int): The maximum number of subgradient steps.
+        course_order (np.ndarray, optional): Pair positions sorted by course.
+
+    Returns:
+        int: The lower bound, rounded up since costs are integers.
+    """
+    if course_order is None:
+        course_order = np.argsort(course_idx, kind="stable")
+    # Work on the pairs grouped by course; each step then only orders costs within a course.
+    prof_idx, course_idx = prof_idx[course_order], course_idx[course_order]
+    cost = cost[course_order].astype(np.float64)
+    course_start = np.asarray(_starts(course_idx, len(demand)))
+    multipliers = np.zeros(len(load))
+    best, scale, stalls = -math.inf, 1.0, 0
+
+    for _ in range(max_iterations):
+        reduced = cost - multipliers[prof_idx]
+        # One float sort key: the course id plus the reduced cost scaled into [0, 1).
+        span = float(reduced.max() - reduced.min()) + 1.0 if len(reduced) else 1.0
+        order = np.argsort(course_idx + (reduced - reduced.min()) / span)
+        ranked_course = course_idx[order]
+        rank = np.arange(len(order)) - course_start[ranked_course]
+        chosen = order[rank < demand[ranked_course]]
+        value = reduced[chosen].sum() + multipliers @ load
+        if value > best + 1e-9:
+            best, stalls = value, 0
+        else:
+            stalls += 1
+            if stalls >= 3:
+                scale, stalls = scale / 2, 0
+
+        subgradient = load - np.bincount(prof_idx[chosen], minlength=len(load))
+        norm = float(subgradient @ subgradient)
+        if norm == 0:
+            break  # The relaxed solution meets every load, so it is optimal.
+        if upper_bound is not None and math.ceil(best - 1e-9) >= upper_bound:
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        target = upper_bound if upper_bound is not None else value + 1
+        multipliers += scale * max(target - value, 1e-3) / norm * subgradient
+    return math.ceil(best - 1e-9)
+
+
+class _LocalSearch:
+    """The mutable state of the greedy construction and the ejection-chain search."""
+
+    def __init__(self, num_profs, num_courses, prof_idx, course_idx, cost, demand, load,
+                 course_order=None):
+        # Single integer sort keys: pairs already grouped by professor (or by
+        # course, through `course_order`) sort almost for free.
+        levels = int(cost.max()) + 1 if len(cost) else 1
+        if course_order is None:
+            course_order = np.argsort(course_idx, kind="stable")
+        order = course_order[np.argsort(course_idx[course_order] * levels + cost[course_order],
+                                        kind="stable")]
+        # Eligible professors of each course, cheapest first.
+        self.course_profs = prof_idx[order]
+        self.course_start = _starts(course_idx, num_courses)
+        order = np.argsort(prof_idx * levels + cost, kind="stable")
+        # Eligible courses of each professor, cheapest first.
+        self.prof_courses = course_idx[order]
+        self.prof_costs = cost[order]
+        self.prof_start = _starts(prof_idx, num_profs)
+        # Sorted (professor, course) keys for cost lookups of arbitrary pairs.
+        self.num_courses = num_courses
+        keys = prof_idx * num_courses + course_idx
+        order = np.argsort(keys, kind="stable")
+        self.pair_keys = keys[order]
+        self.pair_costs = cost[order]
+
+        self.demand = demand.tolist()
+        self.load = load.tolist()
+        self.spare = list(self.load)
+        self.missing = list(self.demand)
+        # teaches[p] maps each course p teaches to its cost.
+        self.teaches = [{} for _ in range(num_profs)]
+        self.taught_by = [set() for _ in range(num_courses)]
+        self.objective = 0
+        self.moves = 0
+
+    def cost(self, p, c):
+        """Returns the cost of pair (p, c), or None if p may not teach c."""
+        key = p * self.num_courses + c
+        pos = int(self.pair_keys.searchsorted(key))
+        if pos < len(self.pair_keys) and self.pair_keys[pos] == key:
+            return int(self.pair_costs[pos])
+        return None
+
+    def _assign(self, p, c, cost):
+        self.teaches[p][c] = cost
+        self.taught_by[c].add(p)
+        self.spare[p] -= 1
+        self.missing[c] -= 1
+        self.objective += cost
+
+    def _unassign(self, p, c):
+        self.objective -= self.teaches[p].pop(c)
+        self.taught_by[c].discard(p)
+        self.spare[p] += 1
+        self.missing[c] += 1
+
+    def construct(self, deadline=None):
+        """
+        Greedy construction plus augmenting-path repair.
+
+        Returns:
+            bool: True if feasible, False if infeasible, None if `deadline` passed first.
+        """
+        slack = [self.course_start[c + 1] - self.course_start[c] - self.demand[c]
+                 for c in range(len(self.demand))]
+        for c in sorted(range(len(self.demand)), key=slack.__getitem__):
+            if deadline is not None and time.perf_counter() >= deadline:
+                return None
+            for k in range(self.course_start[c], self.course_start[c + 1]):
+                if self.missing[c] == 0:
+                    break
+                p = int(self.course_profs[k])
+                if self.spare[p] > 0:
+                    self._assign(p, c, self.cost(p, c))
+
+        for c in range(len(self.demand)):
+            while self.missing[c] > 0:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return None
+                if not self._repair(c):
+                    return False
+        return all(spare == 0 for spare in self.spare)
+
+    def _repair(self, start):
+        """Staffs one more section of course `start` along a breadth-first augmenting path."""
+        course_parent = {start: None}
+        prof_parent = {}
+        queue = deque([start])
+        while queue:
+            c = queue.popleft()
+            for p in self.course_profs[self.course_start[c]:self.course_start[c + 1]].tolist():
+                if p in prof_parent or c in self.teaches[p]:
+                    continue
+                prof_parent[p] = c
+                if self.spare[p] > 0:
+                    # p takes c; the professor who dropped c takes the course before it; ...
+                    while p is not None:
+                        c = prof_parent[p]
+                        dropped_by = course_parent[c]
+                        if dropped_by is not None:
+                            self._unassign(dropped_by, c)
+                        self._assign(p, c, self.cost(p, c))
+                        p = dropped_by
+                    return True
+                for dropped in self.teaches[p]:
+                    if dropped not in course_parent:
+                        course_parent[dropped] = p
+                        queue.append(dropped)
+        return False
+
+    def _chain(self, p, closing, gain, depth, used_profs, used_courses, moves):
+        """
+        Extends an ejection chain in which `p` has just dropped a course.
+
+        `gain` is the saving so far, `closing` the course dropped by the first
+        professor. Returns the list of (professor, taken course) moves of an
+        improving chain, or None.
+        """
+        # Close the chain: p takes the course the first professor dropped.
+        if depth > 1 and closing not in self.teaches[p]:
+            closing_cost = self.cost(p, closing)
+            if closing_cost is not None and gain - closing_cost > 0:
+                return moves + [(p, closing)]
+        if depth >= MAX_CHAIN_DEPTH:
+            return None
+
+        courses, costs = self.prof_courses, self.prof_costs
+        for k in range(self.prof_start[p], self.prof_start[p + 1]):
+            take_cost = int(costs[k])
+            if gain - take_cost <= 0:
+                break  # Courses are sorted by cost: none further keeps the gain positive.
+            c = int(courses[k])
+            if c in used_courses or c in self.teaches[p]:
+                continue
+            for q in self.taught_by[c]:
+                if q in used_profs:
+                    continue
+                chain = self._chain(
+                    q, closing, gain - take_cost + self.teaches[q][c], depth + 1,
+                    used_profs | {q}, used_courses | {c}, moves + [(p, c)]
+                )
+                if chain is not None:
+                    return chain
+        return None
+
+    def improve(self, p, c):
+        """Tries to improve the assignment by an ejection chain starting with p dropping c."""
+        chain = self._chain(p, c, self.teaches[p][c], 1, {p}, {c}, [])
+        if chain is None:
+            return False
+        # The first professor drops c; every later one drops the course taken just before.
+        dropped = c
+        for q, taken in chain:
+            self._unassign(q, dropped)
+            self._assign(q, taken, self.cost(q, taken))
+            dropped = taken
+        self.moves += 1
+        return True
+
+    def search(self, deadline, lower_bound, on_improvement=None):
+        """Runs improving passes over all assignments until none improve or time runs out."""
+        improved = True
+        while improved and self.objective > lower_bound:
+            improved = False
+            for p in range(len(self.load)):
+                if time.perf_counter() >= deadline:
+                    return
+                # Most expensive assignments first.
+                teaches = self.teaches[p]
+                for c in sorted(teaches, key=teaches.get, reverse=True):
+                    if c in teaches and self.improve(p, c):
+                        improved = True
+                        if on_improvement is not None:
+                            on_improvement(self.objective, lower_bound)
+
+    def cancel_cycles(self, prof_idx, course_idx, cost, deadline, lower_bound, on_improvement=None):
+        """
+        Applies improving ejection chains of any length until none is left or time runs out.
+
+        In the residual graph, an unassigned pair is an arc professor -> course
+        (take it, +cost) and an assigned pair an arc course -> professor (drop
+        it, -cost). A negative cycle is an improving chain in which every
+        professor takes one course and drops another. Cycles are found with a
+        vectorized Bellman-Ford from a virtual source.
+
+        Returns:
+            bool: True if no negative cycle is left, i.e. the assignment is optimal.
+        """
+        num_profs = len(self.load)
+        num_nodes = num_profs + len(self.demand)
+        keys = prof_idx * self.num_courses + course_idx
+        key_order = np.argsort(keys)
+        assigned = np.zeros(len(keys), dtype=bool)
+        taught = np.array([p * self.num_courses + c for p, row in enumerate(self.teaches) for c in row],
+                          dtype=np.int64)
+        assigned[key_order[np.searchsorted(keys[key_order], taught)]] = True
+
+        while self.objective > lower_bound and time.perf_counter() < deadline:
+            tail = np.where(assigned, num_profs + course_idx, prof_idx)
+            head = np.where(assigned, prof_idx, num_profs + course_idx)
+            weight = np.where(assigned, -cost, cost)
+            dist = np.zeros(num_nodes, dtype=np.int64)
+            parent = np.full(num_nodes, -1, dtype=np.int64)
+            cycle = None
+            for _ in range(num_nodes):
+                candidate = dist[tail] + weight
+                best = dist.copy()
+                np.minimum.at(best, head, candidate)
+                better = best < dist
+                if not better.any():
+                    return True  # No negative cycle: the assignment is optimal.
+                arcs = np.flatnonzero(better[head] & (candidate == best[head]))
+                parent[head[arcs]] = arcs
+                dist = best
+                cycle = self._find_cycle(parent, tail, np.flatnonzero(better))
+                if cycle is not None or time.perf_counter() >= deadline:
+                    break
+            if cycle is None:
+                return False
+
+            # Apply the chain: drops first, so loads and demands never go out of range.
+            for k in sorted(cycle, key=lambda k: not assigned[k]):
+                p, c = int(prof_idx[k]), int(course_idx[k])
+                if assigned[k]:
+                    self._unassign(p, c)
+                else:
+                    self._assign(p, c, int(cost[k]))
+                assigned[k] = not assigned[k]
+            self.moves += 1
+            if on_improvement is not None:
+                on_improvement(self.objective, lower_bound)
+        return False
+
+    @staticmethod
+    def _find_cycle(parent, tail, starts):
+        """Returns the arcs of a cycle in the Bellman-Ford parent graph, or None."""
+        seen = {}
+        for start in starts.tolist():
+            node, path = start, []
+            while node not in seen and parent[node] >= 0:
+                seen[node] = start
+                arc = int(parent[node])
+                path.append((node, arc))
+                node = int(tail[arc])
+            if seen.get(node) == start and parent[node] >= 0:
+                # The walk came back to a node of this walk: cut out the loop.
+                nodes = [n for n, _ in path]
+                return [arc for _, arc in path[nodes.index(node):]]
+        return None
+
+
+def _starts(group_idx, num_groups):
+    """Returns the start offset of each group in an array sorted by `group_idx`."""
+    starts = np.zeros(num_groups + 1, dtype=np.int64)
+    np.cumsum(np.bincount(group_idx, minlength=num_groups), out=starts[1:])
+    return starts.tolist()
+
+
+def heuristic_assignment(num_profs, num_courses, prof_idx, course_idx, cost, demand, load,
+                         time_limit=DEFAULT_TIME_LIMIT, on_improvement=None, stats=None,
+                         course_order=None):
+    """
+    Finds a good assignment within a time budget (see the module docstring).
+
+    Args:
+        num_profs (int): The number of professors.
+        num_courses (int): The number of courses.
+        prof_idx (np.ndarray): Professor index of each eligible pair.
+        course_idx (np.ndarray): Course index of each eligible pair.
+        cost (np.ndarray): Integer preference cost of each eligible pair.
+        demand (np.ndarray): A length-C vector of course demand.
+        load (np.ndarray): A length-P vector of professor teaching loads.
+        time_limit (float): The time budget in seconds, checked during the
+            greedy construction as well.
+        on_improvement (callable, optional): Called as `on_improvement(objective,
+            lower_bound)` every time the incumbent improves.
+        stats (SolveStats, optional): Receives the phase timings, the number of
+            improving moves as `iterations` and the gap.
+        course_order (np.ndarray, optional): Pair positions sorted by course,
+            e.g. `EligibilityIndex.course_order`; computed when not given.
+
+    Returns:
+        tuple: The pulp-style status code (STATUS_OPTIMAL only if proven,
+               STATUS_FEASIBLE otherwise, STATUS_NOT_SOLVED if the time ran out
+               before a first assignment), the objective of the best assignment,
+               a 0/1 array telling which pairs are assigned, and the lower bound.
+    """
+    if stats is None:
+        stats = SolveStats("heuristic")
+    deadline = time.perf_counter() + time_limit
+    prof_idx = np.asarray(prof_idx, dtype=np.int64)
+    course_idx = np.asarray(course_idx, dtype=np.int64)
+    cost = np.asarray(cost, dtype=np.int64)
+    demand = np.asarray(demand, dtype=np.int64)
+    load = np.asarray(load, dtype=np.int64)
+    if int(demand.sum()) != int(load.sum()):
+        return STATUS_INFEASIBLE, None, None, None
+
+    with stats.phase("greedy"):
+        state = _LocalSearch(num_profs, num_courses, prof_idx, course_idx, cost, demand, load,
+                             course_order)
+        feasible = state.construct(deadline)
+    if feasible is None:
+        return STATUS_NOT_SOLVED, None, None, None
+    if not feasible:
+        return STATUS_INFEASIBLE, None, None, None
+    if on_improvement is not None:
+        on_improvement(state.objective, None)
+
+    with stats.phase("bound"):
+        remaining = max(deadline - time.perf_counter(), 0.0)
+        lower_bound = lagrangian_bound(
+            prof_idx, course_idx, cost, demand, load, upper_bound=state.objective,
+            deadline=time.perf_counter() + BOUND_SHARE * remaining, course_order=course_order
+        )
+    with stats.phase("local_search"):
+        state.search(deadline, lower_bound, on_improvement)
+        if state.objective > lower_bound and state.cancel_cycles(
+                prof_idx, course_idx, cost, deadline, lower_bound, on_improvement):
+            # No improving chain of any length is left, which proves optimality.
+            lower_bound = state.objective
+
+    # Map the assigned (professor, course) pairs back to pair positions.
+    keys = prof_idx * num_courses + course_idx
+    order = np.argsort(keys)
+    assigned_keys = np.array(
+        [p * num_courses + c for p, courses in enumerate(state.teaches) for c in courses],
+        dtype=np.int64,
+    )
+    assigned = np.zeros(len(keys), dtype=np.int8)
+    assigned[order[np.searchsorted(keys[order], assigned_keys)]] = 1
+
+    stats.iterations = state.moves
+    stats.gap = (state.objective - lower_bound) / state.objective if state.objective else 0.0
+    status = STATUS_OPTIMAL if state.objective <= lower_bound else STATUS_FEASIBLE
+    return status, state.objective, assigned, lower_bound
+
+
+def build_and_solve_heuristic_model(professors, courses, preferences, course_demand, professor_load,
+                                    eligibility=None, time_limit=None, stats=None):
+    """
+    Finds a near-optimal assignment with the anytime heuristic.
+
+    The returned model reports status Optimal only when the assignment is
+    proven optimal, and Feasible otherwise; `model.lower_bound` and
+    `model.gap` tell how far from optimal it can be at most.
+
+    Args:
+        professors (list): A list of professor names.
+        courses (list): A list of course names.
+        preferences (dict): A nested dictionary of preferences.
+        course_demand (dict): A dictionary of course demand.
+        professor_load (dict): A dictionary of professor teaching loads.
+        eligibility (EligibilityIndex, optional): The eligible pairs. Built
+            from `preferences` when not given.
+        time_limit (float, optional): The time budget in seconds; defaults to
+            DEFAULT_TIME_LIMIT.
+        stats (SolveStats, optional): Receives the timings and search statistics.
+
+    Returns:
+        tuple: A tuple containing the solved model and the assignment variables.
+    """
+    if stats is None:
+        stats = SolveStats("heuristic")
+    if eligibility is None:
+        eligibility = build_eligibility_index(professors, courses, preferences)
+    demand = np.array([course_demand[c] for c in courses], dtype=np.int64)
+    load = np.array([professor_load[p] for p in professors], dtype=np.int64)
+    stats.num_variables = eligibility.num_pairs
+    stats.num_constraints = len(professors) + len(courses)
+    stats.nonzeros = 2 * eligibility.num_pairs
+
+    print("Solving the assignment problem (anytime heuristic)...")
+    status, objective_value, assigned, lower_bound = heuristic_assignment(
+        len(professors), len(courses), eligibility.prof_idx, eligibility.course_idx,
+        eligibility.cost, demand, load,
+        time_limit=DEFAULT_TIME_LIMIT if time_limit is None else time_limit, stats=stats,
+        course_order=eligibility.course_order
+    )
+    print("Solver finished.")
+    if status == STATUS_NOT_SOLVED:
+        print("The time limit ran out before a first assignment was built.")
+    elif status in (STATUS_OPTIMAL, STATUS_FEASIBLE):
+        print(f"Heuristic objective {objective_value}, lower bound {lower_bound} "
+              f"(gap {stats.gap:.2%}).")
+
+    assigned_pairs = []
+    if assigned is not None:
+        chosen = np.flatnonzero(assigned)
+        assigned_pairs = zip(eligibility.prof_idx[chosen], eligibility.course_idx[chosen])
+    model = SolvedModel("Professor_Course_Assignment", status, objective_value)
+    model.lower_bound = lower_bound
+    model.gap = stats.gap if status in (STATUS_OPTIMAL, STATUS_FEASIBLE) else None
+    return model, build_assignment_vars(professors, courses, assigned_pairs)
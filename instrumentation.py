@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Phase timings and solver statistics for `build_and_solve_model`.
+
+Every call to `build_and_solve_model` fills in a SolveStats record. It holds
+the wall time of each phase (eligibility index, variable creation, objective,
+constraints, solver handoff, solve) and the size and effort of the solve
+(variables, constraints, nonzeros, branch-and-bound nodes, iterations, gap).
+The record is attached to the returned model as `model.stats`. It is also
+published to:
+
+- every hook registered with `add_stats_hook`, e.g. to feed a metrics system
+  or to alert when solves slow down as the catalog grows;
+- the `on_stats` callback of that call;
+- one JSON line on stderr (or any stream) when `log_stats` is set.
+
+Usage:
+    add_stats_hook(lambda stats: metrics.gauge("solve_s", stats.timings["solve"]))
+    model, assignment_vars = build_and_solve_model(..., log_stats=True)
+    print(model.stats.timings)
+"""
+import contextlib
+import json
+import re
+import sys
+import time
+
+_HOOKS = []
+
+
+class SolveStats:
+    """
+    Timings and solver statistics of one `build_and_solve_model` call.
+
+    Counts that an engine cannot report are left as None.
+
+    Attributes:
+        engine (str): The engine that solved the model.
+        timings (dict): Seconds spent in each phase, in execution order.
+        num_variables (int): The number of decision variables (eligible pairs).
+        num_constraints (int): The number of constraints (or flow network nodes).
+        nonzeros (int): The number of nonzero constraint coefficients.
+        nodes (int): Branch-and-bound nodes explored.
+        iterations (int): Simplex iterations, or augmentation phases for the flow engine.
+        gap (float): The relative optimality gap of the returned solution.
+        status (int): The `pulp.LpStatus` code of the solve.
+        objective (float): The objective value, or None.
+        cache_hit (bool): True when the answer came from a SolutionCache.
+    """
+    __slots__ = ("engine", "timings", "num_variables", "num_constraints", "nonzeros",
+                 "nodes", "iterations", "gap", "status", "objective", "cache_hit")
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.timings = {}
+        self.num_variables = None
+        self.num_constraints = None
+        self.nonzeros = None
+        self.nodes = None
+        self.iterations = None
+        self.gap = None
+        self.status = None
+        self.objective = None
+        self.cache_hit = False
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Times the enclosed block and adds it to `timings[name]`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    @property
+    def total_time(self):
+        """The total seconds over all phases."""
+        return sum(self.timings.values())
+
+    def as_dict(self):
+        """Returns the statistics as a plain dictionary."""
+        record = {name: getattr(self, name) for name in self.__slots__}
+        record["timings"] = dict(self.timings)
+        record["total_time"] = self.total_time
+        return record
+
+    def to_json(self):
+        """Returns the statistics as one line of JSON."""
+        return json.dumps(self.as_dict(), default=float)
+
+    def __repr__(self):
+        phases = ", ".join(f"{name}={seconds:.3f}s" for name, seconds in self.timings.items())
+        return f"SolveStats({self.engine!r}, {phases})"
+
+
+def add_stats_hook(hook):
+    """Registers `hook(stats)` to be called after every solve."""
+    _HOOKS.append(hook)
+
+
+def remove_stats_hook(hook):
+    """Unregisters a hook added with `add_stats_hook`."""
+    _HOOKS.remove(hook)
+
+
+def publish(stats, callback=None, log_stats=False):
+    """
+    Hands a finished SolveStats to the registered hooks, the callback and the log.
+
+    Args:
+        stats (SolveStats): The statistics of the solve.
+        callback (callable, optional): Called with `stats` after the hooks.
+        log_stats (bool or file, optional): True writes one JSON line to stderr;
+            a file-like object receives the line instead.
+    """
+    for hook in list(_HOOKS):
+        hook(stats)
+    if callback is not None:
+        callback(stats)
+    if log_stats:
+        stream = sys.stderr if log_stats is True else log_stats
+        stream.write(stats.to_json() + "\n")
+        stream.flush()
+
+
+# Summary lines that CBC prints at the end of a solve.
+_CBC_PATTERNS = {
+    "nodes": re.compile(r"^Enumerated nodes:\s+(\d+)", re.MULTILINE),
+    "iterations": re.compile(r"^Total iterations:\s+(\d+)", re.MULTILINE),
+    "gap": re.compile(r"^Gap:\s+([-\d.eE+]+)", re.MULTILINE),
+    "wallclock": re.compile(r"^Time \(Wallclock seconds\):\s+([\d.]+)", re.MULTILINE),
+}
+
+
+def parse_cbc_log(text):
+    """
+    Extracts nodes, iterations, gap and solve wall time from a CBC log.
+
+    Returns:
+        dict: The values found; keys whose line is missing are omitted.
+    """
+    values = {}
+    for key, pattern in _CBC_PATTERNS.items():
+        match = pattern.search(text)
+        if match:
+            values[key] = float(match.group(1)) if key in ("gap", "wallclock") else int(match.group(1))
+    return values
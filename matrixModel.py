@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized, matrix-based builder for the professor-course assignment model.
+
+`build_and_solve_model` creates one PuLP variable per professor-course pair and
+assembles the objective and every constraint from Python-level `lpSum` lists.
+That is easy to read, but on large catalogs building the model takes longer than
+solving it. This module builds exactly the same model with NumPy instead:
+
+- the objective is a flat cost vector with one entry per eligible (professor,
+  course) pair;
+- the course-demand and professor-load equalities are the rows of one sparse
+  CSR matrix.
+
+The arrays are handed in memory to a solver backend (HiGHS via `highspy` by
+default, or SciPy's `milp`; see backends.py), so no per-variable Python objects
+are ever created.
+"""
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from backends import select_backend
+from eligibility import build_eligibility_index
+from instrumentation import SolveStats
+from solution import SolvedModel, build_assignment_vars
+
+
+def problem_to_arrays(professors, courses, course_demand, professor_load):
+    """
+    Converts the demand and load dictionaries into NumPy vectors.
+
+    Args:
+        professors (list): A list of professor names.
+        courses (list): A list of course names.
+        course_demand (dict): A dictionary of course demand.
+        professor_load (dict): A dictionary of professor teaching loads.
+
+    Returns:
+        tuple: The demand vector (C,) and the load vector (P,).
+    """
+    demand = np.array([course_demand[c] for c in courses], dtype=np.float64)
+    load = np.array([professor_load[p] for p in professors], dtype=np.float64)
+    return demand, load
+
+
+def build_matrix_model(prof_idx, course_idx, cost, demand, load):
+    """
+    Builds the objective vector and constraint matrix of the assignment model.
+
+    Variable k is the binary decision "assign professor prof_idx[k] to course
+    course_idx[k]"; only eligible pairs get a variable. Rows 0..C-1 of the
+    matrix are the course-demand constraints and rows C..C+P-1 are the
+    professor-load constraints.
+
+    Args:
+        prof_idx (np.ndarray): Professor id of each eligible pair.
+        course_idx (np.ndarray): Course id of each eligible pair.
+        cost (np.ndarray): Preference cost of each eligible pair.
+        demand (np.ndarray): A length-C vector of course demand.
+        load (np.ndarray): A length-P vector of professor teaching loads.
+
+    Returns:
+        tuple: The objective vector, the CSR constraint matrix and the
+               right-hand side vector (all constraints are equalities).
+    """
+    num_courses, num_profs = len(demand), len(load)
+    num_vars = len(cost)
+    columns = np.arange(num_vars)
+
+    # Each variable appears once in its course row and once in its professor row.
+    matrix = csr_matrix(
+        (np.ones(2 * num_vars), (np.concatenate([course_idx, num_courses + prof_idx]),
+                                 np.concatenate([columns, columns]))),
+        shape=(num_courses + num_profs, num_vars),
+    )
+    objective = np.asarray(cost, dtype=np.float64)
+    rhs = np.concatenate([demand, load]).astype(np.float64)
+    return objective, matrix, rhs
+
+
+def build_and_solve_matrix_model(professors, courses, preferences, course_demand, professor_load,
+                                 eligibility=None, time_limit=None, stats=None, backend=None,
+                                 threads=None, mip_gap=None, conflicts=None, initial_assignment=None):
+    """
+    Builds and solves the assignment model using the vectorized matrix builder.
+
+    This is a drop-in alternative to `build_and_solve_model`: the returned pair
+    can be passed straight to `display_results`.
+
+    Args:
+        professors (list): A list of professor names.
+        courses (list): A list of course names.
+        preferences (dict): A nested dictionary of preferences.
+        course_demand (dict): A dictionary of course demand.
+        professor_load (dict): A dictionary of professor teaching loads.
+        eligibility (EligibilityIndex, optional): The eligible pairs. Built
+            from `preferences` when not given.
+        time_limit (float, optional): A time limit for the solver in seconds.
+        stats (SolveStats, optional): Receives the build and solve timings and
+            the model size.
+        backend (str, optional): The solver backend (see backends.py).
+        threads (int, optional): The number of solver threads.
+        mip_gap (float, optional): The relative gap at which to stop.
+        conflicts (ConflictGroups, optional): Courses that meet at the same
+            time; each professor teaches at most one course of every group
+            (see timeConflicts.py).
+        initial_assignment (dict, optional): The assignment_vars of an earlier
+            solve, handed to the solver as a starting incumbent.
+
+    Returns:
+        tuple: A tuple containing the solved model and the assignment variables.
+    """
+    if stats is None:
+        stats = SolveStats("matrix")
+    if eligibility is None:
+        eligibility = build_eligibility_index(professors, courses, preferences)
+    with stats.phase("build"):
+        demand, load = problem_to_arrays(professors, courses, course_demand, professor_load)
+        objective, matrix, rhs = build_matrix_model(
+            eligibility.prof_idx, eligibility.course_idx, eligibility.cost, demand, load
+        )
+        upper = None
+        if conflicts is not None:
+            from timeConflicts import add_conflict_rows
+            matrix, rhs, upper = add_conflict_rows(matrix, rhs, conflicts, eligibility)
+        initial = None
+        if initial_assignment is not None:
+            initial = np.array([
+                initial_assignment[professors[i]][courses[j]].varValue == 1
+                for i, j in zip(eligibility.prof_idx.tolist(), eligibility.course_idx.tolist())
+            ], dtype=np.float64)
+    stats.num_variables, stats.num_constraints = matrix.shape[1], matrix.shape[0]
+    stats.nonzeros = matrix.nnz
+
+    solver = select_backend(backend)
+    print(f"Solving the assignment problem (matrix model, {solver.name})...")
+    # Without conflict rows the matrix is totally unimodular (see backends.py).
+    status, objective_value, x = solver.solve(objective, matrix, rhs, threads=threads,
+                                              time_limit=time_limit, mip_gap=mip_gap,
+                                              initial=initial, stats=stats,
+                                              totally_unimodular=upper is None, upper=upper)
+    print("Solver finished.")
+
+    assigned_pairs = []
+    if x is not None:
+        chosen = np.flatnonzero(x)
+        assigned_pairs = zip(eligibility.prof_idx[chosen], eligibility.course_idx[chosen])
+    model = SolvedModel("Professor_Course_Assignment", status, objective_value)
+    return model, build_assignment_vars(professors, courses, assigned_pairs)
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+A compact, array-backed problem instance.
+
+The loaders used to return a loose five-tuple of lists and nested dicts:
+professors, courses, preferences, course_demand and professor_load. The
+preference dict of dicts costs 100+ bytes per pair. That caps the instance
+size a worker can hold, and it is slow to pickle to another process. A
+ProblemInstance keeps the same data as:
+
+- the professor and course name tables, whose positions are the dense ids
+  (the name -> id maps are built on first use);
+- an EligibilityIndex with the listed pairs as contiguous int64 arrays (8 bytes
+  per pair for each of prof_idx, course_idx and cost, plus the course order);
+- `demand` and `load` arrays aligned with the name tables;
+- optionally the groups of courses that meet at the same time (see
+  timeConflicts.py), which `build_and_solve_model` then enforces.
+
+An instance unpacks like the old tuple, so existing code keeps working:
+
+    professors, courses, preferences, course_demand, professor_load = get_data_from_csvs()
+
+Here `preferences` is the EligibilityIndex and the two amount dicts are built
+on the fly. `build_and_solve_model`, `extract_assignment` and `display_results`
+also take the instance itself.
+
+An instance can be saved to a folder of .npy files and opened again with the
+arrays memory-mapped. Nothing is read until it is used, and processes that open
+the same folder share its pages through the OS page cache. Pickling a
+memory-mapped instance sends only its folder, so handing it to a process pool
+copies no arrays. An in-memory instance pickles as its name tables and raw
+arrays, without any per-pair Python objects.
+
+Usage:
+    instance = get_data_from_database("university.db")
+    instance.save("fall_instance")
+    instance = ProblemInstance.open("fall_instance")       # memory-mapped
+    model, assignment_vars = build_and_solve_model(instance, engine="flow")
+    display_results(model, assignment_vars, instance)
+"""
+import json
+import os
+
+import numpy as np
+
+from eligibility import INDEX_ARRAYS, EligibilityIndex, build_eligibility_index
+
+NAMES_FILE = "names.json"
+AMOUNT_ARRAYS = ("demand", "load")
+CONFLICT_ARRAYS = ("group_ptr", "group_courses")
+
+
+class ProblemInstance:
+    """
+    The professors, courses, listed pairs, demand and load of one problem.
+
+    Attributes:
+        preferences (EligibilityIndex): The listed pairs and their costs; it
+            also holds the professor and course name tables.
+        demand (np.ndarray): The demand of each course, by course id.
+        load (np.ndarray): The teaching load of each professor, by professor id.
+        conflicts (ConflictGroups): The courses that meet at the same time, or None.
+        path (str): The folder the instance was opened from, or None.
+    """
+    __slots__ = ("preferences", "demand", "load", "conflicts", "path")
+
+    def __init__(self, preferences, demand, load, conflicts=None, path=None):
+        self.preferences = preferences
+        self.demand = demand
+        self.load = load
+        self.conflicts = conflicts
+        self.path = path
+
+    @classmethod
+    def from_data(cls, professors, courses, preferences, course_demand, professor_load,
+                  forbidden_cost=None):
+        """
+        Builds an instance from the loader five-tuple.
+
+        Args:
+            professors (list): A list of professor names.
+            courses (list): A list of course names.
+            preferences (dict): A nested dictionary of preferences, or an EligibilityIndex.
+            course_demand (dict): A dictionary of course demand.
+            professor_load (dict): A dictionary of professor teaching loads.
+            forbidden_cost (int, optional): Drop pairs at or above this cost.
+                None keeps every listed pair, so that the threshold can still
+                be chosen when solving.
+
+        Returns:
+            ProblemInstance: The instance.
+        """
+        professors, courses = list(professors), list(courses)
+        index = build_eligibility_index(professors, courses, preferences, forbidden_cost)
+        demand = np.array([course_demand[c] for c in courses], dtype=np.int64)
+        load = np.array([professor_load[p] for p in professors], dtype=np.int64)
+        return cls(index, demand, load)
+
+    @property
+    def professors(self):
+        """The professor names; positions are professor ids."""
+        return self.preferences.professors
+
+    @property
+    def courses(self):
+        """The course names; positions are course ids."""
+        return self.preferences.courses
+
+    @property
+    def course_demand(self):
+        """The course demand as a dictionary keyed by course name."""
+        return dict(zip(self.courses, self.demand.tolist()))
+
+    @property
+    def professor_load(self):
+        """The professor loads as a dictionary keyed by professor name."""
+        return dict(zip(self.professors, self.load.tolist()))
+
+    def eligibility(self, forbidden_cost):
+        """Returns the index of the pairs whose cost is below `forbidden_cost`."""
+        return self.preferences.restrict(forbidden_cost)
+
+    def __iter__(self):
+        """Unpacks as (professors, courses, preferences, course_demand, professor_load)."""
+        return iter((self.professors, self.courses, self.preferences,
+                     self.course_demand, self.professor_load))
+
+    @property
+    def nbytes(self):
+        """The size of the instance's arrays in bytes (the name tables excluded)."""
+        return (sum(array.nbytes for array in self.preferences.arrays().values())
+                + self.demand.nbytes + self.load.nbytes)
+
+    def save(self, path):
+        """
+        Writes the instance to a folder: one .npy file per array plus the name tables.
+
+        Args:
+            path (str): The folder; it is created if missing.
+        """
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, NAMES_FILE), "w") as f:
+            json.dump({"professors": list(self.professors), "courses": list(self.courses)}, f)
+        arrays = self.preferences.arrays()
+        arrays.update(demand=self.demand, load=self.load)
+        if self.conflicts is not None:
+            arrays.update(group_ptr=self.conflicts.group_ptr,
+                          group_courses=self.conflicts.group_courses)
+        else:
+            for name in CONFLICT_ARRAYS:  # from an earlier save to the same folder
+                if os.path.exists(os.path.join(path, name + ".npy")):
+                    os.remove(os.path.join(path, name + ".npy"))
+        for name, array in arrays.items():
+            np.save(os.path.join(path, name + ".npy"), np.ascontiguousarray(array))
+
+    @classmethod
+    def open(cls, path, mmap=True):
+        """
+        Opens an instance written by `save`.
+
+        Args:
+            path (str): The folder.
+            mmap (bool): Memory-map the arrays read-only instead of reading them.
+
+        Returns:
+            ProblemInstance: The instance.
+        """
+        with open(os.path.join(path, NAMES_FILE)) as f:
+            names = json.load(f)
+        mode = "r" if mmap else None
+        arrays = {name: np.load(os.path.join(path, name + ".npy"), mmap_mode=mode)
+                  for name in INDEX_ARRAYS + AMOUNT_ARRAYS}
+        index = EligibilityIndex.from_arrays(names["professors"], names["courses"], arrays)
+        conflicts = None
+        if os.path.exists(os.path.join(path, CONFLICT_ARRAYS[0] + ".npy")):
+            from timeConflicts import ConflictGroups
+            conflicts = ConflictGroups(names["courses"], *(
+                np.load(os.path.join(path, name + ".npy")) for name in CONFLICT_ARRAYS))
+        return cls(index, arrays["demand"], arrays["load"], conflicts, path=path if mmap else None)
+
+    def __getstate__(self):
+        if self.path is not None:
+            return {"path": self.path}
+        return {"professors": self.professors, "courses": self.courses,
+                "arrays": self.preferences.arrays(), "demand": self.demand, "load": self.load,
+                "conflicts": self.conflicts}
+
+    def __setstate__(self, state):
+        if "path" in state:
+            other = ProblemInstance.open(state["path"])
+        else:
+            index = EligibilityIndex.from_arrays(state["professors"], state["courses"],
+                                                 state["arrays"])
+            other = ProblemInstance(index, state["demand"], state["load"], state["conflicts"])
+        for name in self.__slots__:
+            setattr(self, name, getattr(other, name))
+
+    def __repr__(self):
+        where = f", mapped from '{self.path}'" if self.path is not None else ""
+        groups = f", {len(self.conflicts)} conflict groups" if self.conflicts is not None else ""
+        return (f"ProblemInstance({len(self.professors)} professors, {len(self.courses)} courses, "
+                f"{self.preferences.num_pairs} pairs{groups}{where})")
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+The k lowest-cost distinct assignments, ranked with Murty's partitioning method.
+
+Department chairs want to see a few alternative schedules, not only the single
+optimum. Adding a no-good cut and re-solving the MIP from scratch for every
+alternative gets slower with each cut. Murty's method instead splits the
+solutions that remain into disjoint subproblems. Let e_1..e_m be the assigned
+pairs of a subproblem's optimum that are not already forced. Child i forces
+e_1..e_{i-1} and forbids e_i. Every other solution of the parent lies in exactly
+one child, since it has the same number of assignments and so must drop at least
+one of them. The best solution not yet reported is the cheapest child optimum
+still in the queue.
+
+Each child is solved from its parent's optimum rather than from scratch. The
+parent's flow is optimal with node prices that leave every residual arc a
+non-negative reduced cost. Dropping e_i leaves professor p_i one course short
+and course c_i one section short. A single Dijkstra search on reduced costs
+from p_i to c_i finds the cheapest way to re-route that unit: a chain of
+professors giving up a course and taking another. Forced pairs cannot be undone
+and forbidden pairs cannot be used. The search usually settles only a handful
+of nodes before it reaches c_i.
+
+Children are also solved lazily. Dropping e_i costs at least its reduced cost
+plus the cheapest reduced-cost arc that leaves p_i and that enters c_i. Each
+child first enters the queue with that bound, computed for all children at once
+with NumPy. It is only searched when the bound reaches the front of the queue.
+Real schedules have many ties, so the next solution is usually found after a
+few searches rather than one per assigned pair. A searched child is kept as its
+path and price changes, and is expanded into full arrays only when it is popped
+again.
+
+Usage:
+    for model, assignment_vars in k_best_assignments(professors, courses, preferences,
+                                                      course_demand, professor_load, k=5):
+        display_results(model, assignment_vars, preferences, professors, courses)
+"""
+import heapq
+from itertools import count
+
+import numpy as np
+
+from eligibility import FORBIDDEN_COST, build_eligibility_index
+from flowSolver import min_cost_assignment
+from solution import STATUS_OPTIMAL, SolvedModel, build_assignment_vars
+
+
+class _Subproblem:
+    """
+    A solved subproblem: its optimal flow and prices and the pairs it forces or forbids.
+
+    `rank[k]` is the position of pair k in the partition order: 0..m-1 for the
+    free assigned pairs, -1 for forced pairs and m for unassigned ones.
+    """
+    __slots__ = ("objective", "flow", "potential", "forced_in", "forced_out", "rank", "free")
+
+    def __init__(self, objective, flow, potential, forced_in, forced_out):
+        self.objective = objective
+        self.flow = flow
+        self.potential = potential
+        self.forced_in = forced_in
+        self.forced_out = forced_out
+        self.free = np.flatnonzero(flow.astype(bool) & ~forced_in)
+        self.rank = np.full(len(flow), len(self.free), dtype=np.int64)
+        self.rank[forced_in] = -1
+        self.rank[self.free] = np.arange(len(self.free))
+
+
+class _Ranking:
+    """Murty's ranking over the eligible pairs of one problem."""
+
+    def __init__(self, num_profs, eligibility):
+        self.num_profs = num_profs
+        self.prof_idx = eligibility.prof_idx
+        self.course_idx = eligibility.course_idx
+        self.cost = eligibility.cost
+        self.prof_ptr = eligibility.prof_ptr
+        self.course_order = eligibility.course_order
+        self.course_ptr = eligibility.course_ptr
+
+    def bounds(self, node):
+        """
+        Returns a lower bound on the objective of every child of `node`.
+
+        Returns:
+            np.ndarray: One bound per free assigned pair (child), inf where the
+                        child is infeasible because p_i or c_i has no arc left.
+        """
+        num_profs, potential = self.num_profs, node.potential
+        reduced = self.cost + potential[self.prof_idx] - potential[num_profs + self.course_idx]
+        # The cheapest forward arc (an unassigned, allowed pair) out of each
+        # professor and into each course.
+        usable = (node.flow == 0) & ~node.forced_out
+        out_min = np.full(num_profs, np.inf)
+        np.minimum.at(out_min, self.prof_idx[usable], reduced[usable])
+        in_min = np.full(len(self.course_ptr) - 1, np.inf)
+        np.minimum.at(in_min, self.course_idx[usable], reduced[usable])
+        free = node.free
+        # Undoing e_i costs -reduced[e_i] >= 0 and the path back at least one arc at each end.
+        detour = np.maximum(out_min[self.prof_idx[free]], in_min[self.course_idx[free]])
+        return node.objective - reduced[free] + detour
+
+    def solve_child(self, node, i):
+        """
+        Solves child i of `node` by re-routing the unit freed by dropping its pair.
+
+        Returns:
+            tuple: The child's objective and the (i, path arcs, settled nodes,
+                   their distances) needed by `expand`, or None if it is infeasible.
+        """
+        k = node.free[i]
+        start, target = int(self.prof_idx[k]), self.num_profs + int(self.course_idx[k])
+        found = self._reroute(node, i, start, target)
+        if found is None:
+            return None
+        path, settled, dist = found
+        path_cost = dist[-1] - node.potential[start] + node.potential[target]
+        return int(node.objective - self.cost[k] + path_cost), (i, path, settled, dist)
+
+    def _reroute(self, node, i, start, target):
+        """
+        Finds the cheapest residual path from professor `start` to course `target`
+        in child i of `node`, by Dijkstra on reduced costs.
+
+        Returns:
+            tuple: The arcs of the path, the settled nodes and their distances
+                   (the target last), or None if the target cannot be reached.
+        """
+        num_profs, potential = self.num_profs, node.potential
+        flow, rank, forced_out = node.flow, node.rank, node.forced_out
+        best = {start: 0}
+        parent = {start: None}
+        done = set()
+        settled, settled_dist = [], []
+        heap = [(0, start)]
+
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in done:
+                continue
+            done.add(u)
+            settled.append(u)
+            settled_dist.append(d)
+            if u == target:
+                break
+            if u < num_profs:
+                # Forward arcs: unassigned pairs of this professor that are not forbidden.
+                start_arc, end_arc = self.prof_ptr[u], self.prof_ptr[u + 1]
+                arcs = start_arc + np.flatnonzero((flow[start_arc:end_arc] == 0)
+                                                  & ~forced_out[start_arc:end_arc])
+                heads = num_profs + self.course_idx[arcs]
+                new_dist = d + self.cost[arcs] + potential[u] - potential[heads]
+            else:
+                # Backward arcs: assignments of this course that child i may still undo.
+                arcs = self.course_order[self.course_ptr[u - num_profs]:self.course_ptr[u - num_profs + 1]]
+                arcs = arcs[(flow[arcs] == 1) & (rank[arcs] > i)]
+                heads = self.prof_idx[arcs]
+                new_dist = d - self.cost[arcs] + potential[u] - potential[heads]
+            for k, v, nd in zip(arcs.tolist(), heads.tolist(), new_dist.tolist()):
+                if v not in done and nd < best.get(v, nd + 1):
+                    best[v], parent[v] = nd, k
+                    heapq.heappush(heap, (nd, v))
+        else:
+            return None
+
+        path, v = [], target
+        while parent[v] is not None:
+            k = parent[v]
+            path.append(k)
+            v = int(self.prof_idx[k]) if v >= num_profs else num_profs + int(self.course_idx[k])
+        return path, np.array(settled, dtype=np.int64), np.array(settled_dist, dtype=np.int64)
+
+    def expand(self, node, objective, i, path, settled, dist):
+        """Builds the solved child i of `node` from its re-routing path."""
+        k = node.free[i]
+        flow = node.flow.copy()
+        flow[k] = 0
+        flow[path] ^= 1
+        potential = node.potential.copy()
+        # Shift the prices of settled nodes so that every residual arc of the
+        # child keeps a non-negative reduced cost.
+        potential[settled] += dist - dist[-1]
+        forced_in = node.forced_in.copy()
+        forced_in[node.free[:i]] = True
+        forced_out = node.forced_out.copy()
+        forced_out[k] = True
+        return _Subproblem(objective, flow, potential, forced_in, forced_out)
+
+
+def k_best_assignments(professors, courses, preferences, course_demand, professor_load, k=None,
+                       eligibility=None, forbidden_cost=FORBIDDEN_COST):
+    """
+    Yields the distinct assignments in order of increasing total cost.
+
+    The generator is lazy: each solution is computed only when it is requested,
+    so callers can stop at any point. Solutions with equal cost come out in an
+    arbitrary but fixed order.
+
+    Args:
+        professors (list): A list of professor names.
+        courses (list): A list of course names.
+        preferences (dict): A nested dictionary of preferences.
+        course_demand (dict): A dictionary of course demand.
+        professor_load (dict): A dictionary of professor teaching loads.
+        k (int, optional): The number of assignments to produce. None keeps
+            going until every feasible assignment has been listed.
+        eligibility (EligibilityIndex, optional): The eligible pairs. Built
+            from `preferences` when not given.
+        forbidden_cost (int, optional): The "cannot teach" cost threshold.
+
+    Yields:
+        tuple: The solved model and the assignment variables, as returned by
+               `build_and_solve_model`. `model.rank` is 1 for the optimum, 2
+               for the runner-up, and so on.
+    """
+    if eligibility is None:
+        eligibility = build_eligibility_index(professors, courses, preferences, forbidden_cost)
+    demand = np.array([course_demand[c] for c in courses], dtype=np.int64)
+    load = np.array([professor_load[p] for p in professors], dtype=np.int64)
+    status, objective, assigned, potential = min_cost_assignment(
+        len(professors), len(courses), eligibility.prof_idx, eligibility.course_idx,
+        eligibility.cost, demand, load
+    )
+    if status != STATUS_OPTIMAL:
+        return
+
+    ranking = _Ranking(len(professors), eligibility)
+    no_pairs = np.zeros(eligibility.num_pairs, dtype=bool)
+    # Drop the source and sink prices; the professor and course prices remain valid.
+    root = _Subproblem(objective, assigned.astype(np.int8), potential[1:-1].copy(),
+                       no_pairs, no_pairs.copy())
+    # Entries are (objective or bound, 0 if solved else 1, tie breaker, node, payload).
+    # The payload is None for a node that is fully built, an int i for child i
+    # of `node` that was bounded but not yet searched, or the searched child's
+    # path for `expand`. At equal keys solved entries come first.
+    tie = count()
+    queue = [(objective, 0, next(tie), root, None)]
+    rank = 0
+    while queue:
+        key, unsolved, _, node, payload = heapq.heappop(queue)
+        if unsolved:
+            solved = ranking.solve_child(node, payload)
+            if solved is not None:
+                heapq.heappush(queue, (solved[0], 0, next(tie), node, solved[1]))
+            continue
+        if payload is not None:
+            node = ranking.expand(node, key, *payload)
+        rank += 1
+        chosen = np.flatnonzero(node.flow)
+        model = SolvedModel("Professor_Course_Assignment", STATUS_OPTIMAL, key)
+        model.rank = rank
+        yield model, build_assignment_vars(
+            professors, courses, zip(eligibility.prof_idx[chosen], eligibility.course_idx[chosen])
+        )
+        if k is not None and rank >= k:
+            return
+        for i, bound in enumerate(ranking.bounds(node).tolist()):
+            if bound < np.inf:
+                heapq.heappush(queue, (bound, 1, next(tie), node, i))
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Compact extraction of a solved assignment and bulk writers for it.
+
+`display_results` used to walk every professor x course cell, check
+`varValue == 1` and print one line per assignment. On large catalogs that is
+O(P x C) Python work plus terminal I/O. Here the solution is extracted once
+into an AssignmentResult: three parallel arrays of assigned (professor id,
+course id, cost) triples, sorted by professor and course. Only the variables
+that exist are read (eligible pairs for PuLP, assigned pairs for the other
+engines).
+
+The triples can then be streamed to a sink:
+
+- "csv":    a CSV file with the ProfessorName, CourseName, Preference columns;
+- "jsonl":  one JSON object per assignment;
+- "sqlite": the `Assignments` table of a database such as university.db,
+            replaced in a single transaction.
+
+The writers accept any result object with `rows()` and the COLUMNS, TABLE and
+SQL_COLUMNS class attributes, such as the SensitivityReport of sensitivity.py.
+
+Usage:
+    result = extract_assignment(model, assignment_vars, instance)
+    write_results(result, "sqlite", "university.db")
+"""
+import csv
+import json
+import sqlite3
+from itertools import islice
+
+import numpy as np
+
+from eligibility import EligibilityIndex
+from problemInstance import ProblemInstance
+from solution import SOLUTION_STATUSES
+
+# Rows handed to a writer at a time.
+WRITE_BATCH_SIZE = 100_000
+
+
+class AssignmentResult:
+    """
+    The assigned (professor, course, cost) triples of a solved model.
+
+    Attributes:
+        professors (list): The professor names; positions are professor ids.
+        courses (list): The course names; positions are course ids.
+        prof_idx (np.ndarray): Professor id of each assignment.
+        course_idx (np.ndarray): Course id of each assignment.
+        cost (np.ndarray): Preference cost of each assignment.
+        status (int): The `pulp.LpStatus` code of the solve.
+        objective (float): The objective value, or None.
+    """
+    __slots__ = ("professors", "courses", "prof_idx", "course_idx", "cost", "status", "objective")
+
+    COLUMNS = ("ProfessorName", "CourseName", "Preference")
+    TABLE = "Assignments"
+    SQL_COLUMNS = ("ProfessorName TEXT NOT NULL, CourseName TEXT NOT NULL,"
+                   " Preference INTEGER NOT NULL, PRIMARY KEY (ProfessorName, CourseName)")
+
+    def __init__(self, professors, courses, prof_idx, course_idx, cost, status, objective):
+        order = np.lexsort((course_idx, prof_idx))
+        self.professors = professors
+        self.courses = courses
+        self.prof_idx = np.asarray(prof_idx, dtype=np.int64)[order]
+        self.course_idx = np.asarray(course_idx, dtype=np.int64)[order]
+        self.cost = np.asarray(cost, dtype=np.int64)[order]
+        self.status = status
+        self.objective = objective
+
+    def __len__(self):
+        return len(self.cost)
+
+    def rows(self):
+        """Yields (professor name, course name, cost) for every assignment."""
+        professors, courses = self.professors, self.courses
+        for i, j, cost in zip(self.prof_idx.tolist(), self.course_idx.tolist(), self.cost.tolist()):
+            yield professors[i], courses[j], cost
+
+    def summary(self):
+        """
+        Returns the headline numbers of the solution.
+
+        Returns:
+            dict: The status, objective, number of assignments, average cost,
+                  the number of assignments at each cost, and the number of
+                  professors left without a course.
+        """
+        values, counts = np.unique(self.cost, return_counts=True)
+        teaching = np.zeros(len(self.professors), dtype=bool)
+        teaching[self.prof_idx] = True
+        return {
+            "status": self.status,
+            "objective": self.objective,
+            "assignments": len(self),
+            "average_cost": float(self.cost.mean()) if len(self) else None,
+            "cost_counts": dict(zip(values.tolist(), counts.tolist())),
+            "idle_professors": int((~teaching).sum()),
+        }
+
+    def __repr__(self):
+        return f"AssignmentResult({len(self)} assignments, objective={self.objective})"
+
+
+def extract_assignment(model, assignment_vars, professors, courses=None, preferences=None):
+    """
+    Extracts the assigned pairs of a solved model into an AssignmentResult.
+
+    Works with any engine's (model, assignment_vars) pair. Only the variables
+    present in `assignment_vars` are read, so pruned pairs cost nothing.
+
+    Args:
+        model: The solved model (`pulp.LpProblem` or SolvedModel).
+        assignment_vars (dict): The nested assignment variables.
+        professors (list): A list of professor names, or a ProblemInstance, in
+            which case `courses` and `preferences` are left out.
+        courses (list): A list of course names.
+        preferences (dict): A nested dictionary of preferences, or an EligibilityIndex.
+
+    Returns:
+        AssignmentResult: The assignments; empty unless the solve found one.
+    """
+    if isinstance(professors, ProblemInstance):
+        professors, courses, preferences = professors.professors, professors.courses, professors.preferences
+    objective = model.objective
+    if hasattr(objective, "value"):  # a PuLP expression
+        objective = objective.value()
+
+    prof_ids, course_ids, costs = [], [], []
+    if model.status in SOLUTION_STATUSES:
+        course_pos = (preferences.course_ids if isinstance(preferences, EligibilityIndex)
+                      else {c: j for j, c in enumerate(courses)})
+        for i, p in enumerate(professors):
+            row = preferences[p]
+            for c, var in assignment_vars[p].items():
+                if var.varValue is not None and round(var.varValue) == 1:
+                    prof_ids.append(i)
+                    course_ids.append(course_pos[c])
+                    costs.append(row[c])
+    return AssignmentResult(professors, courses, prof_ids, course_ids, costs, model.status, objective)
+
+
+def _batches(rows, size=WRITE_BATCH_SIZE):
+    """Splits an iterator of rows into lists of at most `size` rows."""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def write_csv(result, path):
+    """Writes the assignments to a CSV file with a header row."""
+    with open(path, "w", newline="") as out:
+        writer = csv.writer(out)
+        writer.writerow(result.COLUMNS)
+        for batch in _batches(result.rows()):
+            writer.writerows(batch)
+
+
+def write_jsonl(result, path):
+    """Writes the assignments as JSON Lines, one object per assignment."""
+    columns = result.COLUMNS
+    with open(path, "w") as out:
+        for batch in _batches(result.rows()):
+            out.writelines(json.dumps(dict(zip(columns, row))) + "\n" for row in batch)
+
+
+def write_sqlite(result, path, table=None):
+    """
+    Replaces the contents of an assignments table (`result.TABLE` by default) in a SQLite database.
+
+    The table is created if needed and the old rows are deleted and the new
+    ones inserted with `executemany` inside one transaction, so readers never
+    see a half-written assignment.
+    """
+    table = table or result.TABLE
+    placeholders = ", ".join("?" * len(result.COLUMNS))
+    conn = sqlite3.connect(path)
+    try:
+        with conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({result.SQL_COLUMNS})")
+            conn.execute(f"DELETE FROM {table}")
+            for batch in _batches(result.rows()):
+                conn.executemany(f"INSERT INTO {table} VALUES ({placeholders})", batch)
+    finally:
+        conn.close()
+
+
+SINKS = {
+    "csv": write_csv,
+    "jsonl": write_jsonl,
+    "sqlite": write_sqlite,
+}
+
+
+def write_results(result, sink, target):
+    """
+    Streams an AssignmentResult to one of the SINKS.
+
+    Args:
+        result (AssignmentResult): The extracted assignments, or another result
+            with the same writer interface (see above).
+        sink (str): "csv", "jsonl" or "sqlite".
+        target (str): The output file, or the database file for "sqlite".
+    """
+    if sink not in SINKS:
+        raise ValueError(f"Unknown sink '{sink}'. Expected one of {tuple(SINKS)}.")
+    SINKS[sink](result, target)
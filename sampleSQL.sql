@@ -5,6 +5,7 @@
 -- Drop tables if they already exist to ensure a clean setup
 DROP TABLE IF EXISTS Professors;
 DROP TABLE IF EXISTS Courses;
+DROP TABLE IF EXISTS CourseDemand;
 DROP TABLE IF EXISTS ProfessorLoad;
 DROP TABLE IF EXISTS Preferences;
 
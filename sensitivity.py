@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Sensitivity analysis of a solved assignment: dual prices, reduced costs and cost ranges.
+
+Chairs ask questions such as "how much would Prof_C's Databases preference have
+to change to alter the schedule?". Editing `preferences` and re-solving once per
+pair takes effort quadratic in the problem size. LP duality answers every such
+question from a single solve:
+
+- Each course-demand row has a dual price u[c] and each professor-load row a
+  dual price v[p]: the marginal cost of one more section of c, or one more
+  course for p.
+- The reduced cost of a pair is rc = cost - u[c] - v[p]. It is >= 0 for every
+  unassigned pair and <= 0 for every assigned one.
+- The assignment stays optimal while a pair's cost stays on the right side of
+  the threshold u[c] + v[p]. An unassigned pair must not drop below it, and an
+  assigned pair must not rise above it. At the threshold an alternative
+  schedule becomes just as good.
+
+The duals come from the optimal assignment itself, whichever engine produced it,
+so CBC's MIP answer (which carries no duals) is covered too. The model is a
+transportation problem, so node prices that leave every residual arc a
+non-negative reduced cost are optimal LP duals. Those prices are the
+shortest-path distances in the residual graph from a virtual source, found with
+a vectorized Bellman-Ford. Reduced costs and ranges are then one NumPy
+expression over all eligible pairs.
+
+All of this relies on the demand and load rows being the only constraints. The
+fair model's cost bounds and the time-conflict rows (see fairness.py and
+timeConflicts.py) add constraints with duals of their own, so
+`build_and_solve_model` refuses `sensitivity=True` together with either.
+
+The duals of a degenerate problem are not unique, so the ranges are the ones
+certified by this particular set of prices. Inside them the schedule is
+guaranteed to stay optimal; it may stay optimal somewhat beyond them as well.
+
+Usage:
+    model, assignment_vars = build_and_solve_model(..., sensitivity=True)
+    write_results(model.sensitivity, "csv", "sensitivity.csv")
+"""
+import numpy as np
+
+from solution import STATUS_OPTIMAL
+
+
+class SensitivityReport:
+    """
+    Dual prices of a solved assignment and the reduced cost and cost range of every eligible pair.
+
+    It can be written with `results.write_results` like an AssignmentResult,
+    one row per eligible pair; unbounded range ends are written as empty values.
+
+    Attributes:
+        professors (list): The professor names; positions are professor ids.
+        courses (list): The course names; positions are course ids.
+        course_duals (np.ndarray): The dual price of each course-demand constraint.
+        professor_duals (np.ndarray): The dual price of each professor-load constraint.
+        prof_idx (np.ndarray): Professor id of each eligible pair.
+        course_idx (np.ndarray): Course id of each eligible pair.
+        cost (np.ndarray): Preference cost of each eligible pair.
+        assigned (np.ndarray): 1 for the assigned pairs, else 0.
+        reduced_cost (np.ndarray): The reduced cost of each pair.
+        cost_lower (np.ndarray): The lowest cost keeping the schedule optimal (-inf if none).
+        cost_upper (np.ndarray): The highest cost keeping the schedule optimal (inf if none).
+    """
+    __slots__ = ("professors", "courses", "course_duals", "professor_duals", "prof_idx",
+                 "course_idx", "cost", "assigned", "reduced_cost", "cost_lower", "cost_upper")
+
+    COLUMNS = ("ProfessorName", "CourseName", "Preference", "Assigned", "ReducedCost",
+               "CostLower", "CostUpper")
+    TABLE = "Sensitivity"
+    SQL_COLUMNS = ("ProfessorName TEXT NOT NULL, CourseName TEXT NOT NULL, "
+                   "Preference INTEGER NOT NULL, Assigned INTEGER NOT NULL, ReducedCost REAL NOT NULL, "
+                   "CostLower REAL, CostUpper REAL, PRIMARY KEY (ProfessorName, CourseName)")
+
+    def __init__(self, eligibility, assigned, course_duals, professor_duals):
+        self.professors = eligibility.professors
+        self.courses = eligibility.courses
+        self.course_duals = course_duals
+        self.professor_duals = professor_duals
+        self.prof_idx = eligibility.prof_idx
+        self.course_idx = eligibility.course_idx
+        self.cost = eligibility.cost
+        self.assigned = np.asarray(assigned, dtype=np.int8)
+
+        threshold = course_duals[self.course_idx] + professor_duals[self.prof_idx]
+        self.reduced_cost = self.cost - threshold
+        taken = self.assigned.astype(bool)
+        self.cost_lower = np.where(taken, -np.inf, threshold)
+        self.cost_upper = np.where(taken, threshold, np.inf)
+
+    def __len__(self):
+        return len(self.cost)
+
+    def rows(self):
+        """Yields one tuple of COLUMNS per eligible pair; infinite range ends are None."""
+        professors, courses = self.professors, self.courses
+        lower = np.where(np.isfinite(self.cost_lower), self.cost_lower, np.nan).tolist()
+        upper = np.where(np.isfinite(self.cost_upper), self.cost_upper, np.nan).tolist()
+        for i, j, cost, taken, reduced, low, high in zip(
+                self.prof_idx.tolist(), self.course_idx.tolist(), self.cost.tolist(),
+                self.assigned.tolist(), self.reduced_cost.tolist(), lower, upper):
+            yield (professors[i], courses[j], cost, taken, reduced,
+                   None if low != low else low, None if high != high else high)
+
+    def stability(self, professor, course):
+        """
+        Returns the cost range of one pair inside which the schedule stays optimal.
+
+        Returns:
+            tuple: (lowest cost, highest cost); an unbounded end is -inf or inf.
+        """
+        i = self.professors.index(professor)
+        j = self.courses.index(course)
+        k = np.flatnonzero((self.prof_idx == i) & (self.course_idx == j))
+        if not len(k):
+            raise KeyError((professor, course))
+        return float(self.cost_lower[k[0]]), float(self.cost_upper[k[0]])
+
+    def __repr__(self):
+        ties = int(((self.reduced_cost == 0) & (self.assigned == 0)).sum())
+        return f"SensitivityReport({len(self)} pairs, {ties} unassigned pairs at zero reduced cost)"
+
+
+def dual_prices(num_profs, num_courses, prof_idx, course_idx, cost, assigned):
+    """
+    Recovers optimal dual prices from an optimal assignment.
+
+    In the residual graph an unassigned pair is an arc professor -> course with
+    weight +cost and an assigned pair an arc course -> professor with weight
+    -cost. Shortest distances d from a virtual source (0 to every node) satisfy
+    cost + d[p] - d[c] >= 0 on the first kind and <= 0 on the second, so
+    u[c] = d[c] and v[p] = -d[p] are optimal duals.
+
+    Args:
+        num_profs (int): The number of professors.
+        num_courses (int): The number of courses.
+        prof_idx (np.ndarray): Professor id of each eligible pair.
+        course_idx (np.ndarray): Course id of each eligible pair.
+        cost (np.ndarray): Preference cost of each eligible pair.
+        assigned (np.ndarray): 1 for the assigned pairs, else 0.
+
+    Returns:
+        tuple: The course duals (C,) and the professor duals (P,).
+
+    Raises:
+        ValueError: If the assignment is not optimal (the residual graph has a
+            negative cycle).
+    """
+    taken = np.asarray(assigned).astype(bool)
+    tail = np.where(taken, num_profs + course_idx, prof_idx)
+    head = np.where(taken, prof_idx, num_profs + course_idx)
+    weight = np.where(taken, -cost, cost).astype(np.int64)
+    dist = np.zeros(num_profs + num_courses, dtype=np.int64)
+    for _ in range(num_profs + num_courses):
+        best = dist.copy()
+        np.minimum.at(best, head, dist[tail] + weight)
+        if (best == dist).all():
+            break
+        dist = best
+    else:
+        raise ValueError("The assignment is not optimal: its residual graph has a negative cycle.")
+    return dist[num_profs:].astype(np.float64), -dist[:num_profs].astype(np.float64)
+
+
+def assigned_pairs(assignment_vars, eligibility):
+    """Returns a 0/1 array telling which eligible pairs are assigned in `assignment_vars`."""
+    professors, courses = eligibility.professors, eligibility.courses
+    return np.array([
+        round(assignment_vars[professors[i]][courses[j]].varValue or 0)
+        for i, j in zip(eligibility.prof_idx.tolist(), eligibility.course_idx.tolist())
+    ], dtype=np.int8)
+
+
+def analyze_sensitivity(model, assignment_vars, eligibility):
+    """
+    Computes dual prices, reduced costs and cost ranges for a solved model.
+
+    Args:
+        model: The solved model (`pulp.LpProblem` or SolvedModel).
+        assignment_vars (dict): The nested assignment variables.
+        eligibility (EligibilityIndex): The eligible pairs of the model.
+
+    Returns:
+        SensitivityReport: The analysis, or None unless the solve was optimal.
+    """
+    if model.status != STATUS_OPTIMAL:
+        return None
+    assigned = assigned_pairs(assignment_vars, eligibility)
+    course_duals, professor_duals = dual_prices(
+        len(eligibility.professors), len(eligibility.courses), eligibility.prof_idx,
+        eligibility.course_idx, eligibility.cost, assigned
+    )
+    return SensitivityReport(eligibility, assigned, course_duals, professor_duals)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Lightweight solution containers shared by the alternative solver engines.
+
+`display_results` in ProfessorAssignmentModular.py was written against a solved
+PuLP model: it reads `model.status`, passes `model.objective` to `pulp.value()`
+and checks `assignment_vars[p][c].varValue == 1`. The classes here mimic just
+that surface so that engines which never build a PuLP model (the sparse matrix
+builder, the flow solver, ...) can hand their answers to the same reporting code.
+"""
+
+# These mirror the integer codes used by `pulp.LpStatus`, so a SolvedModel's
+# status can be looked up in that table without importing pulp here.
+STATUS_NOT_SOLVED = 0
+STATUS_OPTIMAL = 1
+STATUS_INFEASIBLE = -1
+STATUS_UNBOUNDED = -2
+STATUS_UNDEFINED = -3
+# An assignment that is feasible but not proven optimal, e.g. from the anytime
+# heuristic. PuLP has no such LpStatus; the code is pulp.LpSolutionIntegerFeasible.
+STATUS_FEASIBLE = 2
+
+# The same names as `pulp.LpStatus`, for reporting without importing pulp.
+STATUS_NAMES = {
+    STATUS_NOT_SOLVED: "Not Solved",
+    STATUS_OPTIMAL: "Optimal",
+    STATUS_FEASIBLE: "Feasible",
+    STATUS_INFEASIBLE: "Infeasible",
+    STATUS_UNBOUNDED: "Unbounded",
+    STATUS_UNDEFINED: "Undefined",
+}
+
+# The statuses that come with an assignment.
+SOLUTION_STATUSES = (STATUS_OPTIMAL, STATUS_FEASIBLE)
+
+
+class AssignmentValue:
+    """Stands in for a solved `pulp.LpVariable`; only `varValue` is provided."""
+    __slots__ = ("varValue",)
+
+    def __init__(self, value):
+        self.varValue = value
+
+
+# A single shared instance is returned for every pair that was not assigned,
+# so unassigned pairs cost no memory at all.
+UNASSIGNED = AssignmentValue(0)
+ASSIGNED = AssignmentValue(1)
+
+
+class AssignmentRow(dict):
+    """One professor's row of assignment values; missing courses read as 0."""
+
+    def __missing__(self, course):
+        return UNASSIGNED
+
+
+class SolvedModel:
+    """
+    The minimal part of a solved `pulp.LpProblem` that `display_results` uses.
+
+    Attributes:
+        name (str): A descriptive name for the model.
+        status (int): A `pulp.LpStatus` code (see the STATUS_* constants).
+        objective (float): The objective value, or None if no solution exists.
+        stats (SolveStats): Timings and solver statistics, set by `build_and_solve_model`.
+    """
+
+    def __init__(self, name, status, objective=None):
+        self.name = name
+        self.status = status
+        self.objective = objective
+        self.stats = None
+
+    def __repr__(self):
+        return f"SolvedModel({self.name!r}, status={self.status}, objective={self.objective})"
+
+
+def build_assignment_vars(professors, courses, assigned_pairs):
+    """
+    Builds the nested `assignment_vars[p][c]` structure from assigned pairs.
+
+    Args:
+        professors (list): A list of professor names.
+        courses (list): A list of course names.
+        assigned_pairs (iterable): (professor_index, course_index) pairs that
+            received an assignment.
+
+    Returns:
+        dict: A dictionary keyed by professor whose rows return an object with a
+              `varValue` attribute for every course.
+    """
+    assignment_vars = {p: AssignmentRow() for p in professors}
+    for p_idx, c_idx in assigned_pairs:
+        assignment_vars[professors[p_idx]][courses[c_idx]] = ASSIGNED
+    return assignment_vars
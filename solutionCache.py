@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed cache of solved assignment problems.
+
+Dashboards and cron jobs rerun the optimizer for the same term many times a day,
+usually on unchanged inputs. The cache computes a canonical hash of the problem
+(professors, courses, eligible preferences, course demand, professor load and
+the solver options) and, on a hit, returns the stored assignment and objective
+without building or solving a model.
+
+Only proven answers are stored: optimal solutions (a time-limited run only if
+it closed the gap) and infeasible problems. Heuristic and time-limited results
+are returned but never cached. A warm start (`initial_assignment`) does not
+change the optimum, so it is not part of the key. The model attributes that
+some engines add (the heuristic's bound, the fair model's B, ...) are stored
+with the solution and restored on a hit.
+
+Two levels are used:
+- an in-process LRU memo for repeated calls from the same process;
+- an on-disk SQLite store shared between processes, evicted least recently used
+  first once it holds more than `max_entries` solutions or `max_bytes` of data.
+
+Usage:
+    cache = SolutionCache("solution_cache.db")
+    model, assignment_vars = build_and_solve_model(..., cache=cache)
+"""
+import contextlib
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from eligibility import FORBIDDEN_COST, build_eligibility_index
+from instrumentation import SolveStats, publish
+from solution import STATUS_INFEASIBLE, STATUS_OPTIMAL, SolvedModel, build_assignment_vars
+
+# Bump when the stored format or the hashed content changes.
+CACHE_VERSION = 2
+# Options that do not change the answer, left out of the key.
+UNKEYED_OPTIONS = ("max_workers", "initial_assignment")
+# Model attributes stored with a solution and restored on a hit.
+MODEL_ATTRIBUTES = ("lower_bound", "gap", "max_professor_cost", "fairness_lower_bound",
+                    "fairness_solves")
+
+
+def problem_hash(professors, courses, eligibility, course_demand, professor_load, options=None):
+    """
+    Computes a canonical SHA-256 hash of a problem instance and solver options.
+
+    The hash does not depend on the order in which professors, courses or
+    preference rows were listed: names are ranked alphabetically and pairs are
+    sorted by those ranks before hashing.
+
+    Args:
+        professors (list): A list of professor names.
+        courses (list): A list of course names.
+        eligibility (EligibilityIndex): The eligible pairs and their costs.
+        course_demand (dict): A dictionary of course demand.
+        professor_load (dict): A dictionary of professor teaching loads.
+        options (dict, optional): Solver options that can change the result.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    prof_order = sorted(range(len(professors)), key=professors.__getitem__)
+    course_order = sorted(range(len(courses)), key=courses.__getitem__)
+    prof_rank = np.empty(len(professors), dtype=np.int64)
+    prof_rank[prof_order] = np.arange(len(professors))
+    course_rank = np.empty(len(courses), dtype=np.int64)
+    course_rank[course_order] = np.arange(len(courses))
+
+    pair_prof = prof_rank[eligibility.prof_idx]
+    pair_course = course_rank[eligibility.course_idx]
+    order = np.lexsort((pair_course, pair_prof))
+
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_VERSION}".encode())
+    digest.update("\0".join(professors[i] for i in prof_order).encode())
+    digest.update(b"\1")
+    digest.update("\0".join(courses[j] for j in course_order).encode())
+    digest.update(np.ascontiguousarray(pair_prof[order]).tobytes())
+    digest.update(np.ascontiguousarray(pair_course[order]).tobytes())
+    digest.update(np.ascontiguousarray(eligibility.cost[order], dtype=np.int64).tobytes())
+    digest.update(np.array([course_demand[courses[j]] for j in course_order], dtype=np.int64).tobytes())
+    digest.update(np.array([professor_load[professors[i]] for i in prof_order], dtype=np.int64).tobytes())
+    digest.update(json.dumps(options or {}, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class SolutionCache:
+    """
+    A two-level (memory + SQLite) cache of solved problems keyed by `problem_hash`.
+
+    Attributes:
+        path (str): The SQLite file of the on-disk store, or None for memory only.
+        max_entries (int): The maximum number of solutions kept on disk.
+        max_bytes (int): The maximum total size of the stored solutions.
+        memo_size (int): The number of solutions kept in the in-process memo.
+        hits (int): The number of lookups answered from the cache.
+        misses (int): The number of lookups that had to solve.
+    """
+
+    def __init__(self, path="solution_cache.db", max_entries=1000, max_bytes=256 * 2**20,
+                 memo_size=32):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memo_size = memo_size
+        self.hits = 0
+        self.misses = 0
+        self._memo = OrderedDict()
+        if path is not None:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS Solutions ("
+                    " ProblemKey TEXT PRIMARY KEY, Status INTEGER NOT NULL, Objective REAL,"
+                    " Assignment BLOB NOT NULL, Size INTEGER NOT NULL, LastUsed REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_solutions_last_used ON Solutions(LastUsed)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Yields a connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        """
+        Looks up a solution.
+
+        Returns:
+            tuple: (status, objective, assigned name pairs, model attributes),
+                   or None on a miss.
+        """
+        if key in self._memo:
+            self._memo.move_to_end(key)
+            return self._memo[key]
+        if self.path is None:
+            return None
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT Status, Objective, Assignment FROM Solutions WHERE ProblemKey = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE Solutions SET LastUsed = ? WHERE ProblemKey = ?", (time.time(), key))
+        payload = json.loads(zlib.decompress(row[2]))
+        entry = (row[0], row[1], [tuple(pair) for pair in payload["assigned"]], payload["attributes"])
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key, status, objective, assigned, attributes=None):
+        """Stores a solution and evicts the least recently used ones if over the limits."""
+        entry = (status, objective, list(assigned), dict(attributes or {}))
+        self._remember(key, entry)
+        if self.path is None:
+            return
+        # NumPy scalars are stored as the equivalent Python numbers.
+        blob = zlib.compress(json.dumps({"assigned": entry[2], "attributes": entry[3]},
+                                        default=lambda value: value.item()).encode())
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO Solutions VALUES (?, ?, ?, ?, ?, ?)",
+                (key, status, objective, blob, len(blob), time.time()),
+            )
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(Size), 0) FROM Solutions").fetchone()
+            if count > self.max_entries or total > self.max_bytes:
+                self._evict(conn, count, total)
+
+    def _evict(self, conn, count, total):
+        """Deletes least recently used rows until both limits hold again."""
+        doomed = []
+        for key, size in conn.execute("SELECT ProblemKey, Size FROM Solutions ORDER BY LastUsed"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM Solutions WHERE ProblemKey = ?", doomed)
+
+    def _remember(self, key, entry):
+        self._memo[key] = entry
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+
+    def clear(self):
+        """Empties both the memo and the on-disk store."""
+        self._memo.clear()
+        if self.path is not None:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM Solutions")
+
+    def solve(self, professors, courses, preferences, course_demand, professor_load,
+              eligibility=None, forbidden_cost=FORBIDDEN_COST, on_stats=None, log_stats=False,
+              **options):
+        """
+        Returns the cached solution of a problem, solving and storing it on a miss.
+
+        Takes the same arguments as `build_and_solve_model` and returns the same
+        (model, assignment_vars) pair; on a hit the model is a SolvedModel whose
+        statistics have `cache_hit` set. Only proven results are stored (see
+        the module docstring).
+        """
+        # Imported here to avoid a circular import with the main module.
+        from ProfessorAssignmentModular import build_and_solve_model
+
+        stats = SolveStats(options.get("engine", "pulp"))
+        if eligibility is None:
+            with stats.phase("eligibility"):
+                eligibility = build_eligibility_index(professors, courses, preferences, forbidden_cost)
+        key_options = {k: v for k, v in options.items() if k not in UNKEYED_OPTIONS}
+        if key_options.get("conflicts") is not None:
+            key_options["conflicts"] = key_options["conflicts"].digest()
+        with stats.phase("cache"):
+            key = problem_hash(professors, courses, eligibility, course_demand, professor_load,
+                               key_options)
+            entry = self.get(key)
+
+        if entry is not None:
+            self.hits += 1
+            status, objective, assigned, attributes = entry
+            print("Solution found in cache.")
+            positions = {p: i for i, p in enumerate(professors)}
+            course_positions = {c: j for j, c in enumerate(courses)}
+            pairs = [(positions[p], course_positions[c]) for p, c in assigned]
+            model = SolvedModel("Professor_Course_Assignment", status, objective)
+            for name, value in attributes.items():
+                setattr(model, name, value)
+            if status == STATUS_INFEASIBLE and options.get("precheck", True):
+                # The explanation is cheap to rebuild, so it is not stored.
+                from feasibility import check_feasibility
+                report = check_feasibility(professors, courses, course_demand, professor_load,
+                                           eligibility)
+                if not report:
+                    model.feasibility = report
+            stats.status, stats.objective, stats.cache_hit = status, objective, True
+            model.stats = stats
+            publish(stats, on_stats, log_stats)
+            return model, build_assignment_vars(professors, courses, pairs)
+
+        self.misses += 1
+        model, assignment_vars = build_and_solve_model(
+            professors, courses, preferences, course_demand, professor_load,
+            eligibility=eligibility, on_stats=on_stats, log_stats=log_stats, **options
+        )
+        assigned = []
+        if model.status == STATUS_OPTIMAL:
+            assigned = [
+                (professors[i], courses[j])
+                for i, j in zip(eligibility.prof_idx.tolist(), eligibility.course_idx.tolist())
+                if round(assignment_vars[professors[i]][courses[j]].varValue or 0) == 1
+            ]
+        if not _is_proven(model, options):
+            return model, assignment_vars
+        attributes = {name: getattr(model, name) for name in MODEL_ATTRIBUTES if hasattr(model, name)}
+        self.put(key, model.status, model.stats.objective, assigned, attributes)
+        return model, assignment_vars
+
+
+def _is_proven(model, options):
+    """Tells whether a result is final: infeasible, or optimal without a limit cutting it short."""
+    if model.status == STATUS_INFEASIBLE:
+        return True
+    if model.status != STATUS_OPTIMAL:
+        return False  # e.g. a heuristic result that is only feasible, or no solution in time
+    if options.get("time_limit") is None or options.get("engine") == "heuristic":
+        return True  # the heuristic reports Optimal only when its bound proves it
+    gap = model.stats.gap if model.stats is not None else None
+    return gap is not None and gap <= (options.get("mip_gap") or 0.0)
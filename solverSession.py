@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent solver session for what-if edits to an assignment problem.
+
+Schedulers typically change one professor's preference or bump one course's
+demand and then want the new optimum right away. Rebuilding the model and
+solving it cold repeats all the work for a change that only touches a few
+variables. An `AssignmentSession` solves the problem once with the min-cost-flow
+engine and then keeps the optimal flow together with its node potentials (the
+optimal duals). Every edit is applied as a local repair:
+
+- an edit that leaves every arc with a non-negative reduced cost keeps the
+  current assignment optimal and costs nothing;
+- otherwise the offending arc is saturated or emptied, which leaves a unit of
+  surplus at one endpoint and a unit of shortage at the other, and a Dijkstra
+  search on reduced costs (which stops at the first node with a shortage)
+  routes it back with a single augmenting path.
+
+Single edits on large instances therefore take milliseconds instead of a full
+solve.
+
+Usage:
+    session = AssignmentSession(professors, courses, preferences, course_demand, professor_load)
+    session.set_preference("Prof_C", "Databases", 3)
+    model, assignment_vars = session.solve()
+"""
+import heapq
+
+import numpy as np
+
+from eligibility import FORBIDDEN_COST, build_eligibility_index
+from flowSolver import min_cost_assignment
+from solution import (STATUS_INFEASIBLE, STATUS_OPTIMAL, SolvedModel,
+                      build_assignment_vars)
+
+
+class AssignmentSession:
+    """
+    An assignment problem kept solved across incremental edits.
+
+    Nodes 0..P-1 are professors and P..P+C-1 are courses. Professors supply
+    their load and courses consume their demand; each eligible pair is an arc
+    of capacity 1. `excess[v]` is how much node v still has to send (positive)
+    or receive (negative); the session is optimal when every excess is zero.
+    """
+
+    def __init__(self, professors, courses, preferences, course_demand, professor_load,
+                 eligibility=None, forbidden_cost=FORBIDDEN_COST):
+        """
+        Builds the session and solves the initial problem.
+
+        Args:
+            professors (list): A list of professor names.
+            courses (list): A list of course names.
+            preferences (dict): A nested dictionary of preferences.
+            course_demand (dict): A dictionary of course demand.
+            professor_load (dict): A dictionary of professor teaching loads.
+            eligibility (EligibilityIndex, optional): The eligible pairs. Built
+                from `preferences` when not given.
+            forbidden_cost (int, optional): The "cannot teach" cost threshold.
+        """
+        if eligibility is None:
+            eligibility = build_eligibility_index(professors, courses, preferences, forbidden_cost)
+        self.professors = list(professors)
+        self.courses = list(courses)
+        self.preferences = {p: dict(preferences.get(p, {})) for p in professors}
+        self.course_demand = dict(course_demand)
+        self.professor_load = dict(professor_load)
+        self.forbidden_cost = forbidden_cost
+        self._prof_pos = {p: i for i, p in enumerate(self.professors)}
+        self._course_pos = {c: j for j, c in enumerate(self.courses)}
+        num_profs = len(self.professors)
+
+        # Per-pair state. The pairs of professor i are prof_ptr[i]:prof_ptr[i + 1]
+        # (sorted by course), plus any pairs added later in `_extra_pairs[i]`.
+        self._pair_prof = eligibility.prof_idx.copy()
+        self._pair_course = eligibility.course_idx.copy()
+        self._cost = eligibility.cost.copy()
+        self._capacity = np.ones(eligibility.num_pairs, dtype=np.int8)
+        self._lower = np.zeros(eligibility.num_pairs, dtype=np.int8)
+        self._prof_ptr = eligibility.prof_ptr
+        self._extra_pairs = {}
+        self._forbidden = set()   # arcs closed by `forbid`, whatever their cost
+
+        demand = np.array([self.course_demand[c] for c in self.courses], dtype=np.int64)
+        load = np.array([self.professor_load[p] for p in self.professors], dtype=np.int64)
+        status, _, assigned, potential = min_cost_assignment(
+            num_profs, len(self.courses), eligibility.prof_idx, eligibility.course_idx,
+            eligibility.cost, demand, load
+        )
+        if status == STATUS_OPTIMAL:
+            self._flow = assigned.astype(np.int8)
+            # Drop the source and sink; what is left are valid professor/course prices.
+            self._potential = potential[1:-1].copy()
+        else:
+            # Start from the empty flow; with non-negative costs zero prices are valid.
+            self._flow = np.zeros(eligibility.num_pairs, dtype=np.int8)
+            self._potential = np.zeros(num_profs + len(self.courses), dtype=np.int64)
+
+        used = np.flatnonzero(self._flow)
+        self._assigned_by_course = [set() for _ in self.courses]
+        for k, j in zip(used.tolist(), self._pair_course[used].tolist()):
+            self._assigned_by_course[j].add(k)
+        self._excess = np.concatenate([
+            load - np.bincount(self._pair_prof[used], minlength=num_profs),
+            np.bincount(self._pair_course[used], minlength=len(self.courses)) - demand,
+        ])
+        self._objective = int(self._cost[used].sum())
+        self._reoptimize()
+
+    # --- Edits ---
+
+    def set_preference(self, professor, course, cost):
+        """
+        Changes the preference cost of one pair (a cost at the threshold forbids it).
+
+        A pair closed with `forbid` stays forbidden at any cost until `allow` or
+        `release` opens it again.
+        """
+        self.preferences[professor][course] = cost
+        if self.forbidden_cost is not None and cost >= self.forbidden_cost:
+            # Record the cost too, so that a later `release` keeps the pair forbidden.
+            k = self._find_pair(self._prof_pos[professor], self._course_pos[course])
+            if k is not None:
+                self._objective += (cost - int(self._cost[k])) * int(self._flow[k])
+                self._cost[k] = cost
+                self._close(k)
+                self._reoptimize()
+            return
+        k = self._pair(professor, course)
+        if self._capacity[k] == 0 and k not in self._forbidden:
+            self._capacity[k] = 1   # a pair forbidden by its cost becomes eligible
+        self._objective += (cost - int(self._cost[k])) * int(self._flow[k])
+        self._cost[k] = cost
+        self._restore_optimality(k)
+        self._reoptimize()
+
+    def set_demand(self, course, demand):
+        """Changes the number of sections of one course."""
+        j = self._course_pos[course]
+        self._excess[len(self.professors) + j] -= demand - self.course_demand[course]
+        self.course_demand[course] = demand
+        self._reoptimize()
+
+    def set_load(self, professor, load):
+        """Changes the teaching load of one professor."""
+        i = self._prof_pos[professor]
+        self._excess[i] += load - self.professor_load[professor]
+        self.professor_load[professor] = load
+        self._reoptimize()
+
+    def forbid(self, professor, course):
+        """Forbids a pair: the professor will not be assigned to the course."""
+        k = self._pair(professor, course)
+        self._forbidden.add(k)
+        self._close(k)
+        self._reoptimize()
+
+    def allow(self, professor, course):
+        """Undoes `forbid` on a pair; it is eligible again unless its cost forbids it."""
+        k = self._pair(professor, course)
+        if k not in self._forbidden:
+            return
+        self._forbidden.discard(k)
+        self._capacity[k] = int(self.forbidden_cost is None or self._cost[k] < self.forbidden_cost)
+        self._restore_optimality(k)
+        self._reoptimize()
+
+    def force(self, professor, course):
+        """Forces a pair: the professor will be assigned to the course."""
+        k = self._pair(professor, course)
+        self._forbidden.discard(k)
+        self._capacity[k] = 1
+        self._lower[k] = 1
+        self._set_flow(k, 1)
+        self._reoptimize()
+
+    def release(self, professor, course):
+        """Undoes `force` or `forbid` on a pair, making it an ordinary pair again."""
+        k = self._pair(professor, course)
+        self._forbidden.discard(k)
+        eligible = self.forbidden_cost is None or self._cost[k] < self.forbidden_cost
+        self._capacity[k] = int(eligible)
+        self._lower[k] = 0
+        if not eligible:
+            self._set_flow(k, 0)
+        self._restore_optimality(k)
+        self._reoptimize()
+
+    # --- Results ---
+
+    @property
+    def status(self):
+        """The pulp-style status of the current solution."""
+        return STATUS_OPTIMAL if not self._excess.any() else STATUS_INFEASIBLE
+
+    @property
+    def objective(self):
+        """The total preference cost of the current assignment, or None if infeasible."""
+        return self._objective if self.status == STATUS_OPTIMAL else None
+
+    def solve(self):
+        """
+        Returns the current optimum in the same form as `build_and_solve_model`.
+
+        Returns:
+            tuple: A tuple containing the solved model and the assignment variables.
+        """
+        assigned_pairs = []
+        if self.status == STATUS_OPTIMAL:
+            used = np.flatnonzero(self._flow)
+            assigned_pairs = zip(self._pair_prof[used].tolist(), self._pair_course[used].tolist())
+        model = SolvedModel("Professor_Course_Assignment", self.status, self.objective)
+        return model, build_assignment_vars(self.professors, self.courses, assigned_pairs)
+
+    # --- Internals ---
+
+    def _find_pair(self, i, j):
+        """Returns the arc of pair (professor i, course j), or None if there is none."""
+        start, end = self._prof_ptr[i], self._prof_ptr[i + 1]
+        pos = start + np.searchsorted(self._pair_course[start:end], j)
+        if pos < end and self._pair_course[pos] == j:
+            return int(pos)
+        return self._extra_pairs.get(i, {}).get(j)
+
+    def _pair(self, professor, course):
+        """Returns the arc of a pair, adding it (forbidden) if it did not exist."""
+        i, j = self._prof_pos[professor], self._course_pos[course]
+        k = self._find_pair(i, j)
+        if k is None:
+            k = len(self._cost)
+            cost = self.preferences[professor].get(course, FORBIDDEN_COST)
+            self._pair_prof = np.append(self._pair_prof, i)
+            self._pair_course = np.append(self._pair_course, j)
+            self._cost = np.append(self._cost, cost)
+            self._capacity = np.append(self._capacity, np.int8(0))
+            self._lower = np.append(self._lower, np.int8(0))
+            self._flow = np.append(self._flow, np.int8(0))
+            self._extra_pairs.setdefault(i, {})[j] = k
+        return k
+
+    def _close(self, k):
+        """Closes arc k, dropping any `force` and any flow on it."""
+        self._capacity[k] = 0
+        self._lower[k] = 0
+        self._set_flow(k, 0)
+
+    def _reduced_cost(self, k):
+        course_node = len(self.professors) + self._pair_course[k]
+        return self._cost[k] + self._potential[self._pair_prof[k]] - self._potential[course_node]
+
+    def _set_flow(self, k, value):
+        """Sets the flow of one pair, updating excesses, objective and indexes."""
+        delta = value - int(self._flow[k])
+        if not delta:
+            return
+        j = int(self._pair_course[k])
+        self._flow[k] = value
+        self._excess[self._pair_prof[k]] -= delta
+        self._excess[len(self.professors) + j] += delta
+        self._objective += delta * int(self._cost[k])
+        if value:
+            self._assigned_by_course[j].add(k)
+        else:
+            self._assigned_by_course[j].discard(k)
+
+    def _restore_optimality(self, k):
+        """Saturates or empties arc k if its reduced cost has the wrong sign."""
+        reduced = self._reduced_cost(k)
+        if reduced < 0 and self._flow[k] < self._capacity[k]:
+            self._set_flow(k, 1)
+        elif reduced > 0 and self._flow[k] > self._lower[k]:
+            self._set_flow(k, 0)
+
+    def _reoptimize(self):
+        """Routes surpluses to shortages along shortest paths until none is reachable."""
+        while (self._excess > 0).any() and (self._excess < 0).any():
+            if not self._augment():
+                break
+
+    def _augment(self):
+        """
+        Runs one Dijkstra search from every surplus node to the nearest shortage
+        node on reduced costs, pushes one unit along the path and updates prices.
+
+        Returns:
+            bool: False if no shortage node is reachable.
+        """
+        num_profs = len(self.professors)
+        excess, potential = self._excess, self._potential
+        best = np.full(len(excess), np.inf)     # tentative distances
+        done = np.zeros(len(excess), dtype=bool)
+        parent = {}                             # arc used to reach each node
+        settled, settled_dist = [], []
+        heap = [(0, v) for v in np.flatnonzero(excess > 0).tolist()]
+        for _, v in heap:
+            best[v], parent[v] = 0, None
+        heapq.heapify(heap)
+        target = None
+
+        while heap:
+            d, u = heapq.heappop(heap)
+            if done[u]:
+                continue
+            done[u] = True
+            settled.append(u)
+            settled_dist.append(d)
+            if excess[u] < 0:
+                target = u
+                break
+            if u < num_profs:
+                # Forward arcs: unused, allowed pairs of this professor (vectorized).
+                start, end = self._prof_ptr[u], self._prof_ptr[u + 1]
+                arcs = start + np.flatnonzero(self._flow[start:end] < self._capacity[start:end])
+                extra = [k for k in self._extra_pairs.get(u, {}).values()
+                         if self._flow[k] < self._capacity[k]]
+                if extra:
+                    arcs = np.concatenate([arcs, extra])
+                heads = num_profs + self._pair_course[arcs]
+                new_dist = d + self._cost[arcs] + potential[u] - potential[heads]
+            else:
+                # Backward arcs: undo an assignment of this course that is not forced.
+                arcs = np.array([k for k in self._assigned_by_course[u - num_profs]
+                                 if self._lower[k] == 0], dtype=np.int64)
+                heads = self._pair_prof[arcs]
+                new_dist = d - self._cost[arcs] + potential[u] - potential[heads]
+            improved = (new_dist < best[heads]) & ~done[heads]
+            for k, v, nd in zip(arcs[improved].tolist(), heads[improved].tolist(),
+                                new_dist[improved].tolist()):
+                if nd < best[v]:        # the same node can appear twice in `heads`
+                    best[v], parent[v] = nd, k
+                    heapq.heappush(heap, (nd, v))
+
+        if target is None:
+            return False
+
+        # Shift the prices of settled nodes so that every residual arc keeps a
+        # non-negative reduced cost and the arcs on the path get reduced cost 0.
+        potential[settled] += np.array(settled_dist, dtype=np.int64) - settled_dist[-1]
+
+        # Push one unit along the path, walking back from the target.
+        v = target
+        while parent[v] is not None:
+            k = parent[v]
+            if v >= num_profs:          # reached course v through a forward arc
+                self._set_flow(k, 1)
+                v = int(self._pair_prof[k])
+            else:                       # reached professor v by undoing an assignment
+                self._set_flow(k, 0)
+                v = num_profs + int(self._pair_course[k])
+        return True
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+Shared pytest setup: puts the repository's flat modules on the import path and
+silences the solvers' progress output.
+"""
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def quiet():
+    """Returns a context manager that swallows what the engines print."""
+    return lambda: contextlib.redirect_stdout(io.StringIO())
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Reference answers for the tests: small random instances, brute-force
+enumeration and a direct MILP built from the nested dicts.
+
+Nothing here reuses the engines' model builders, so a bug in a builder cannot
+hide in the oracle as well.
+"""
+import itertools
+
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+FORBIDDEN = 999
+
+
+def random_instance(num_profs, num_courses, seed=0, eligible_share=0.4, max_cost=9, max_load=2):
+    """
+    Returns a random feasible instance as the loader five-tuple.
+
+    Each professor's load is planted on distinct courses first, those pairs are
+    made eligible and course demand counts the planted sections, so a feasible
+    assignment always exists. Ineligible pairs are listed with cost 999.
+    """
+    rng = np.random.default_rng(seed)
+    professors = [f"Prof_{i}" for i in range(num_profs)]
+    courses = [f"Course_{j}" for j in range(num_courses)]
+    course_demand = {c: 0 for c in courses}
+    professor_load = {}
+    preferences = {}
+    for p in professors:
+        load = int(rng.integers(1, max_load + 1))
+        planted = rng.choice(num_courses, size=load, replace=False)
+        eligible = rng.random(num_courses) < eligible_share
+        eligible[planted] = True
+        professor_load[p] = load
+        for j in planted.tolist():
+            course_demand[courses[j]] += 1
+        preferences[p] = {c: int(rng.integers(1, max_cost + 1)) if eligible[j] else FORBIDDEN
+                          for j, c in enumerate(courses)}
+    return professors, courses, preferences, course_demand, professor_load
+
+
+def eligible_pairs(professors, courses, preferences):
+    """Returns the (professor, course, cost) triples below the forbidden cost."""
+    return [(p, c, preferences[p][c]) for p in professors for c in courses
+            if preferences[p].get(c, FORBIDDEN) < FORBIDDEN]
+
+
+def enumerate_assignments(professors, courses, preferences, course_demand, professor_load,
+                          accept=None):
+    """
+    Lists every feasible assignment by brute force, cheapest first.
+
+    Args:
+        accept (callable, optional): Called with each feasible assignment (a
+            frozenset of (professor, course) pairs); only those it accepts are kept.
+
+    Returns:
+        list: (total cost, frozenset of pairs) tuples, sorted by cost.
+    """
+    options = []
+    for p in professors:
+        eligible = [c for c in courses if preferences[p].get(c, FORBIDDEN) < FORBIDDEN]
+        options.append([tuple((p, c) for c in chosen)
+                        for chosen in itertools.combinations(eligible, professor_load[p])])
+    found = []
+    for choice in itertools.product(*options):
+        pairs = [pair for chosen in choice for pair in chosen]
+        taught = {c: 0 for c in courses}
+        for _, c in pairs:
+            taught[c] += 1
+        if taught != course_demand:
+            continue
+        pairs = frozenset(pairs)
+        if accept is not None and not accept(pairs):
+            continue
+        found.append((sum(preferences[p][c] for p, c in pairs), pairs))
+    found.sort(key=lambda item: item[0])
+    return found
+
+
+def milp_optimum(professors, courses, preferences, course_demand, professor_load,
+                 pairwise_conflicts=(), max_professor_cost=None, forced=()):
+    """
+    Solves the assignment with SciPy's milp, one explicit constraint per rule.
+
+    Args:
+        pairwise_conflicts (iterable): (course a, course b) pairs that no
+            professor may teach together.
+        max_professor_cost (int, optional): A bound on every professor's total cost.
+        forced (iterable): (professor, course) pairs that must be assigned.
+
+    Returns:
+        tuple: The optimal cost and the frozenset of assigned pairs, or (None, None).
+    """
+    pairs = eligible_pairs(professors, courses, preferences)
+    column = {(p, c): k for k, (p, c, _) in enumerate(pairs)}
+    rows, lower, upper = [], [], []
+
+    def add(weights, low, high):
+        row = np.zeros(len(pairs))
+        for pair, weight in weights.items():
+            row[column[pair]] = weight
+        rows.append(row)
+        lower.append(low)
+        upper.append(high)
+
+    for c in courses:
+        add({(p, c): 1 for p in professors if (p, c) in column}, course_demand[c], course_demand[c])
+    for p in professors:
+        add({(p, c): 1 for c in courses if (p, c) in column}, professor_load[p], professor_load[p])
+    for a, b in pairwise_conflicts:
+        for p in professors:
+            if (p, a) in column and (p, b) in column:
+                add({(p, a): 1, (p, b): 1}, -np.inf, 1)
+    for pair in forced:
+        if pair not in column:
+            return None, None
+        add({pair: 1}, 1, 1)
+    if max_professor_cost is not None:
+        for p in professors:
+            costs = {(p, c): preferences[p][c] for c in courses if (p, c) in column}
+            if costs:
+                add(costs, -np.inf, max_professor_cost)
+
+    cost = np.array([cost for _, _, cost in pairs], dtype=np.float64)
+    result = milp(cost, constraints=[LinearConstraint(np.array(rows), lower, upper)],
+                  integrality=np.ones(len(pairs)), bounds=Bounds(0, 1))
+    if result.status != 0:
+        return None, None
+    chosen = frozenset((p, c) for (p, c, _), x in zip(pairs, result.x) if round(x) == 1)
+    return round(result.fun), chosen
+
+
+def assigned_set(assignment_vars):
+    """Returns the assigned (professor, course) pairs of an assignment_vars structure."""
+    return frozenset((p, c) for p, row in assignment_vars.items() for c, var in row.items()
+                     if var.varValue is not None and round(var.varValue) == 1)
+
+
+def is_feasible(pairs, courses, course_demand, professor_load, preferences):
+    """Tells whether a set of pairs meets every demand and load with eligible pairs only."""
+    taught = {c: 0 for c in courses}
+    teaching = {p: 0 for p in professor_load}
+    for p, c in pairs:
+        if preferences[p].get(c, FORBIDDEN) >= FORBIDDEN:
+            return False
+        taught[c] += 1
+        teaching[p] += 1
+    return taught == dict(course_demand) and teaching == dict(professor_load)
+
+
+def total_cost(pairs, preferences):
+    """The total preference cost of a set of pairs."""
+    return sum(preferences[p][c] for p, c in pairs)
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Solver backends: the same optimum everywhere, and Optimal only for proven answers."""
+import numpy as np
+import pytest
+from scipy.sparse import vstack
+
+from backends import BACKENDS, incumbent_status, select_backend
+from eligibility import build_eligibility_index
+from fairness import professor_cost_rows
+from instrumentation import SolveStats
+from matrixModel import build_matrix_model, problem_to_arrays
+from oracle import FORBIDDEN, milp_optimum, random_instance
+from solution import STATUS_FEASIBLE, STATUS_NOT_SOLVED, STATUS_OPTIMAL
+
+
+def fair_layout(data):
+    """The assignment model plus one unbounded cost row per professor, as fairness.py builds it."""
+    professors, courses, preferences, course_demand, professor_load = data
+    eligibility = build_eligibility_index(professors, courses, preferences, FORBIDDEN)
+    demand, load = problem_to_arrays(professors, courses, course_demand, professor_load)
+    objective, matrix, rhs = build_matrix_model(eligibility.prof_idx, eligibility.course_idx,
+                                                eligibility.cost, demand, load)
+    matrix = vstack([matrix, professor_cost_rows(eligibility.prof_idx, eligibility.cost,
+                                                 len(professors))]).tocsr()
+    upper = np.concatenate([rhs, np.full(len(professors), np.inf)])
+    rhs = np.concatenate([rhs, np.full(len(professors), -np.inf)])
+    return objective, matrix, rhs, upper
+
+
+def test_incumbent_status():
+    assert incumbent_status(0.0) == STATUS_OPTIMAL
+    assert incumbent_status(0.01) == STATUS_FEASIBLE
+    assert incumbent_status(0.01, mip_gap=0.05) == STATUS_OPTIMAL
+    assert incumbent_status(None, mip_gap=0.05) == STATUS_FEASIBLE
+
+
+@pytest.mark.parametrize("name", list(BACKENDS))
+@pytest.mark.parametrize("totally_unimodular", [True, False])
+def test_backends_reach_the_optimum(name, totally_unimodular, quiet):
+    data = random_instance(10, 14, seed=3, max_load=3)
+    objective, matrix, rhs, _ = fair_layout(data)
+    matrix, rhs = matrix[:len(data[0]) + len(data[1])], rhs[:len(data[0]) + len(data[1])]
+    with quiet():
+        status, value, x = select_backend(name).solve(objective, matrix, rhs,
+                                                      totally_unimodular=totally_unimodular)
+    assert status == STATUS_OPTIMAL
+    assert round(value) == objective @ x == milp_optimum(*data)[0]
+
+
+@pytest.mark.parametrize("name", list(BACKENDS))
+def test_time_limited_incumbents_are_not_optimal(name, quiet):
+    data = random_instance(150, 300, seed=0, eligible_share=0.3, max_load=5)
+    objective, matrix, rhs, upper = fair_layout(data)
+    stats = SolveStats(name)
+    with quiet():
+        status, _, x = select_backend(name).solve(objective, matrix, rhs, time_limit=0.2,
+                                                  stats=stats, upper=upper)
+    if x is None:
+        assert status == STATUS_NOT_SOLVED
+    elif stats.gap is None or stats.gap > 0:
+        assert status == STATUS_FEASIBLE
+    else:
+        assert status == STATUS_OPTIMAL
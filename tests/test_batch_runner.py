@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Batch scenarios on a process pool against direct solves of the same edited problems."""
+import json
+import os
+
+import pytest
+
+from batchRunner import load_manifest, run_batch
+from codeGen import generate_synthetic_instance
+from oracle import FORBIDDEN
+from ProfessorAssignmentModular import (build_and_solve_model, get_data_from_csvs,
+                                        get_data_hardcoded)
+
+
+def as_dicts(instance):
+    """The plain lists and dicts of a loaded instance, as `build_and_solve_model` also takes them."""
+    professors, courses, index = instance.professors, instance.courses, instance.preferences
+    preferences = {p: {c: FORBIDDEN for c in courses} for p in professors}
+    for i, j, cost in zip(index.prof_idx.tolist(), index.course_idx.tolist(), index.cost.tolist()):
+        preferences[professors[i]][courses[j]] = cost
+    return (professors, courses, preferences, dict(instance.course_demand),
+            dict(instance.professor_load))
+
+
+def edited(data, scenario):
+    """Applies a scenario's overrides to the plain data, the way the manifest documents them."""
+    professors, courses, preferences, course_demand, professor_load = data
+    preferences = {p: dict(row, **scenario.get("preferences", {}).get(p, {}))
+                   for p, row in preferences.items()}
+    return (professors, courses, preferences, dict(course_demand, **scenario.get("course_demand", {})),
+            dict(professor_load, **scenario.get("professor_load", {})))
+
+
+def test_scenarios_match_direct_solves(tmp_path, quiet):
+    folder = str(tmp_path / "csv")
+    os.makedirs(folder)
+    with quiet():
+        generate_synthetic_instance(8, 12, density=0.5, load_range=(1, 3), seed=1, folder=folder,
+                                    db_file=None)
+        bases = {"hardcoded": as_dicts(get_data_hardcoded()),
+                 "csv": as_dicts(get_data_from_csvs(folder))}
+    csv_source = {"type": "csv", "path": folder}
+    manifest = {
+        "defaults": {"engine": "flow"},
+        "scenarios": [
+            {"name": "sample", "source": "hardcoded"},
+            {"name": "sabbatical", "source": "hardcoded", "engine": "matrix",
+             "professor_load": {"Prof_A": 4}, "course_demand": {"Databases": 2},
+             "preferences": {"Prof_B": {"Databases": FORBIDDEN}, "Prof_C": {"Intro_to_AI": 1}}},
+            {"name": "cheaper", "source": "hardcoded", "engine": "heuristic",
+             "preferences": {"Prof_E": {"Machine_Learning": 1, "Cybersecurity": 1}}},
+            {"name": "campus", "source": csv_source},
+            {"name": "campus-pulp", "source": csv_source, "engine": "pulp", "backend": "cbc"},
+        ],
+    }
+    path = str(tmp_path / "scenarios.json")
+    with open(path, "w") as manifest_file:
+        json.dump(manifest, manifest_file)
+    scenarios = load_manifest(path)
+
+    records = {record["name"]: record for record in run_batch(scenarios, max_workers=2)}
+    assert set(records) == {scenario["name"] for scenario in scenarios}
+    assert os.getpid() not in {record["worker"] for record in records.values()}
+    for scenario in scenarios:
+        record = records[scenario["name"]]
+        assert "error" not in record, record["error"]
+        source = "hardcoded" if scenario["source"] == "hardcoded" else "csv"
+        options = {key: scenario[key] for key in ("engine", "backend") if key in scenario}
+        with quiet():
+            model, _ = build_and_solve_model(*edited(bases[source], scenario), **options)
+        assert record["objective"] == pytest.approx(model.stats.objective)
+    assert records["sabbatical"]["objective"] != records["sample"]["objective"]
+
+
+def test_bad_scenarios_are_reported_not_raised(tmp_path):
+    scenarios = [{"name": "typo", "source": "hardcoded", "professor_load": {"Prof_Z": 1}},
+                 {"name": "sample", "source": "hardcoded", "engine": "flow"}]
+    records = {record["name"]: record for record in run_batch(scenarios, max_workers=2)}
+    assert "Prof_Z" in records["typo"]["error"]
+    assert records["sample"]["status"] == "Optimal"
+
+    path = str(tmp_path / "scenarios.jsonl")
+    with open(path, "w") as manifest_file:
+        manifest_file.write(json.dumps({"source": "hardcoded", "engin": "flow"}) + "\n")
+    with pytest.raises(ValueError):
+        load_manifest(path)
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""The command line: option checking, and the imports the fast engines avoid."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from ProfessorAssignmentModular import parse_args
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_flow_engine_on_the_sample_data_skips_pulp_and_pandas():
+    script = ("import sys; from ProfessorAssignmentModular import main; "
+              "main(['--engine', 'flow']); "
+              "print('loaded:', [m for m in ('pulp', 'pandas') if m in sys.modules])")
+    run = subprocess.run([sys.executable, "-c", script], cwd=REPO, capture_output=True, text=True,
+                         check=True)
+    assert "Optimal" in run.stdout
+    assert run.stdout.strip().splitlines()[-1] == "loaded: []"
+
+
+def test_unknown_backend_is_a_usage_error(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        parse_args(["--engine", "matrix", "--backend", "higs"])
+    assert exit_info.value.code == 2
+    assert "invalid choice: 'higs'" in capsys.readouterr().err
+    assert parse_args(["--backend", "auto"]).backend == "auto"
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Every engine and backend, with and without decomposition, against the reference MILP."""
+import pytest
+
+from oracle import (assigned_set, enumerate_assignments, is_feasible, milp_optimum,
+                    random_instance, total_cost)
+from ProfessorAssignmentModular import build_and_solve_model, get_data_hardcoded
+from solution import STATUS_INFEASIBLE, STATUS_OPTIMAL
+
+ENGINE_CASES = [
+    {"engine": "pulp", "backend": "cbc"},
+    {"engine": "pulp", "backend": "highs"},
+    {"engine": "matrix", "backend": "highs"},
+    {"engine": "matrix", "backend": "scipy"},
+    {"engine": "matrix", "backend": "cbc"},
+    {"engine": "flow"},
+    {"engine": "flow", "decompose": True, "max_workers": 1},
+    {"engine": "matrix", "decompose": True, "max_workers": 1},
+]
+SEEDS = range(4)
+
+
+def case_id(case):
+    return "-".join(str(value) for key, value in case.items() if key != "max_workers")
+
+
+def test_oracle_matches_brute_force():
+    for seed in SEEDS:
+        data = random_instance(4, 5, seed=seed)
+        best = enumerate_assignments(*data)[0][0]
+        assert milp_optimum(*data)[0] == best
+
+
+@pytest.mark.parametrize("case", ENGINE_CASES, ids=case_id)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_engine_reaches_the_optimum(case, seed, quiet):
+    data = random_instance(8, 12, seed=seed)
+    professors, courses, preferences, course_demand, professor_load = data
+    expected, _ = milp_optimum(*data)
+    with quiet():
+        model, assignment_vars = build_and_solve_model(*data, **case)
+    assert model.status == STATUS_OPTIMAL
+    pairs = assigned_set(assignment_vars)
+    assert is_feasible(pairs, courses, course_demand, professor_load, preferences)
+    assert total_cost(pairs, preferences) == expected
+    assert model.stats.objective == expected
+
+
+@pytest.mark.parametrize("case", ENGINE_CASES, ids=case_id)
+def test_engine_on_the_sample_data(case, quiet):
+    with quiet():
+        model, _ = build_and_solve_model(get_data_hardcoded(), **case)
+    assert model.status == STATUS_OPTIMAL
+    assert model.stats.objective == 47
+
+
+@pytest.mark.parametrize("case", ENGINE_CASES, ids=case_id)
+def test_engine_reports_infeasible(case, quiet):
+    professors, courses, preferences, course_demand, professor_load = random_instance(6, 8, seed=1)
+    # Move sections onto the first course until it needs more professors than
+    # exist; totals still balance, so only the solver can tell.
+    course_demand = dict(course_demand)
+    for c in courses[1:]:
+        while course_demand[c] and course_demand[courses[0]] <= len(professors):
+            course_demand[c] -= 1
+            course_demand[courses[0]] += 1
+    assert course_demand[courses[0]] > len(professors)
+    assert milp_optimum(professors, courses, preferences, course_demand, professor_load)[0] is None
+    with quiet():
+        model, _ = build_and_solve_model(
+            professors, courses, preferences, course_demand, professor_load, precheck=False,
+            **case
+        )
+    assert model.status != STATUS_OPTIMAL
+
+
+def test_precheck_short_circuits_infeasible_instances(quiet):
+    professors, courses, preferences, course_demand, professor_load = random_instance(6, 8, seed=2)
+    course_demand = dict(course_demand, **{courses[0]: len(professors) + 1})
+    with quiet():
+        model, _ = build_and_solve_model(professors, courses, preferences, course_demand,
+                                         professor_load, engine="flow")
+    assert model.status == STATUS_INFEASIBLE
+    assert model.feasibility is not None and not model.feasibility
+
+
+def test_decomposed_components_follow_the_precheck_option(monkeypatch, quiet):
+    import decomposition
+    seen = []
+    solve_component = decomposition._solve_component
+    monkeypatch.setattr(decomposition, "_solve_component",
+                        lambda task: seen.append(task[-1]["precheck"]) or solve_component(task))
+    data = random_instance(8, 12, seed=0)
+    with quiet():
+        model, _ = build_and_solve_model(*data, engine="flow", decompose=True, max_workers=1,
+                                         precheck=False)
+    assert seen and not any(seen)
+    assert model.stats.objective == milp_optimum(*data)[0]
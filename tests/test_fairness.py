@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""The min-max fair objective against brute-force enumeration and the bounded reference MILP."""
+import itertools
+import types
+
+import pytest
+
+import fairness
+
+from oracle import (assigned_set, enumerate_assignments, is_feasible, milp_optimum,
+                    random_instance, total_cost)
+from ProfessorAssignmentModular import build_and_solve_model
+from solution import STATUS_FEASIBLE, STATUS_OPTIMAL
+
+BACKENDS = [("matrix", "highs"), ("matrix", "scipy"), ("matrix", "cbc"), ("pulp", "cbc")]
+
+
+def worst_professor_cost(pairs, preferences):
+    costs = {}
+    for p, c in pairs:
+        costs[p] = costs.get(p, 0) + preferences[p][c]
+    return max(costs.values())
+
+
+@pytest.mark.parametrize("engine, backend", BACKENDS)
+@pytest.mark.parametrize("seed", range(4))
+def test_fair_model_matches_enumeration(engine, backend, seed, quiet):
+    data = random_instance(5, 6, seed=seed, eligible_share=0.6, max_load=2)
+    professors, courses, preferences, course_demand, professor_load = data
+    schedules = enumerate_assignments(*data)
+    best_worst = min(worst_professor_cost(pairs, preferences) for _, pairs in schedules)
+    best_total = min(cost for cost, pairs in schedules
+                     if worst_professor_cost(pairs, preferences) == best_worst)
+
+    with quiet():
+        model, assignment_vars = build_and_solve_model(*data, engine=engine, backend=backend,
+                                                       fairness=True)
+    pairs = assigned_set(assignment_vars)
+    assert model.status == STATUS_OPTIMAL
+    assert is_feasible(pairs, courses, course_demand, professor_load, preferences)
+    assert model.max_professor_cost == worst_professor_cost(pairs, preferences) == best_worst
+    assert model.fairness_lower_bound <= best_worst
+    assert total_cost(pairs, preferences) == model.stats.objective == best_total
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_fair_model_on_larger_instances(seed, quiet):
+    data = random_instance(10, 14, seed=seed, max_load=3)
+    professors, courses, preferences, course_demand, professor_load = data
+    with quiet():
+        model, assignment_vars = build_and_solve_model(*data, engine="matrix", fairness=True)
+    bound = model.max_professor_cost
+    # Nothing fits under a smaller bound, and the total is the cheapest under this one.
+    assert milp_optimum(*data, max_professor_cost=bound - 1)[0] is None
+    assert model.stats.objective == milp_optimum(*data, max_professor_cost=bound)[0]
+    assert model.fairness_solves >= 1
+
+
+@pytest.mark.parametrize("backend", ["highs", "scipy", "cbc"])
+def test_time_limit_during_the_bisection_is_not_optimal(backend, monkeypatch, quiet):
+    data = random_instance(10, 14, seed=0, max_load=3)
+    professors, courses, preferences, course_demand, professor_load = data
+    # A clock that runs out right after the first solve: B comes from the
+    # unbounded schedule, above what the bisection would have proven.
+    ticks = itertools.chain([0.0, 0.0], itertools.repeat(100.0))
+    monkeypatch.setattr(fairness, "time", types.SimpleNamespace(perf_counter=lambda: next(ticks)))
+    with quiet():
+        model, assignment_vars = build_and_solve_model(*data, engine="matrix", backend=backend,
+                                                       fairness=True, time_limit=50)
+    pairs = assigned_set(assignment_vars)
+    assert model.fairness_solves == 1
+    assert model.fairness_lower_bound < model.max_professor_cost
+    assert model.status == STATUS_FEASIBLE
+    assert model.stats.gap is None
+    assert is_feasible(pairs, courses, course_demand, professor_load, preferences)
+    assert model.max_professor_cost == worst_professor_cost(pairs, preferences)
+
+
+def test_fairness_needs_a_mip_engine():
+    data = random_instance(4, 5)
+    for options in ({"engine": "flow"}, {"engine": "heuristic"},
+                    {"engine": "matrix", "decompose": True}):
+        with pytest.raises(ValueError):
+            build_and_solve_model(*data, fairness=True, **options)
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""check_feasibility against the reference MILP, and its explanations as certificates."""
+import random
+
+import pytest
+
+from eligibility import build_eligibility_index
+from feasibility import check_feasibility
+from oracle import FORBIDDEN, milp_optimum, random_instance
+
+
+def perturbed_instance(seed):
+    """A random instance with some pairs forbidden and some sections moved, often infeasible."""
+    professors, courses, preferences, course_demand, professor_load = random_instance(
+        7, 9, seed=seed, eligible_share=0.3)
+    rng = random.Random(seed)
+    for _ in range(rng.randint(0, 6)):
+        preferences[rng.choice(professors)][rng.choice(courses)] = FORBIDDEN
+    for _ in range(rng.randint(0, 2)):
+        source, target = rng.choice(courses), rng.choice(courses)
+        if course_demand[source]:
+            course_demand[source] -= 1
+            course_demand[target] += 1
+    if rng.random() < 0.2:
+        professor_load[rng.choice(professors)] += 1
+    return professors, courses, preferences, course_demand, professor_load
+
+
+def eligible_courses(preferences, professor):
+    return {c for c, cost in preferences[professor].items() if cost < FORBIDDEN}
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_verdict_matches_the_milp(seed):
+    professors, courses, preferences, course_demand, professor_load = perturbed_instance(seed)
+    eligibility = build_eligibility_index(professors, courses, preferences, FORBIDDEN)
+    report = check_feasibility(professors, courses, course_demand, professor_load, eligibility)
+    expected, _ = milp_optimum(professors, courses, preferences, course_demand, professor_load)
+    assert bool(report) == (expected is not None)
+    assert bool(report) == (not report.reasons)
+    if not report:
+        assert report.explain().startswith("The problem is infeasible")
+
+    # Every reported group must be a genuine Hall violation.
+    for course in report.short_courses:
+        eligible = [p for p in professors if course in eligible_courses(preferences, p)]
+        assert len(eligible) < course_demand[course]
+    for professor in report.overloaded_professors:
+        assert len(eligible_courses(preferences, professor)) < professor_load[professor]
+    for names, need, supply in report.course_groups:
+        group = set(names)
+        assert need == sum(course_demand[c] for c in group)
+        reachable = sum(min(professor_load[p], len(eligible_courses(preferences, p) & group))
+                        for p in professors)
+        assert supply == reachable < need
+    for names, need, supply in report.professor_groups:
+        assert need == sum(professor_load[p] for p in names)
+        capacity = sum(min(course_demand[c],
+                           sum(c in eligible_courses(preferences, p) for p in names))
+                       for c in courses)
+        assert supply == capacity < need
+
+
+def test_the_perturbations_cover_both_verdicts():
+    verdicts = set()
+    for seed in range(40):
+        professors, courses, preferences, course_demand, professor_load = perturbed_instance(seed)
+        verdicts.add(milp_optimum(professors, courses, preferences, course_demand,
+                                  professor_load)[0] is None)
+    assert verdicts == {True, False}
+
+
+def test_total_mismatch_is_explained():
+    professors, courses, preferences, course_demand, professor_load = random_instance(5, 6)
+    professor_load[professors[0]] += 1
+    eligibility = build_eligibility_index(professors, courses, preferences, FORBIDDEN)
+    report = check_feasibility(professors, courses, course_demand, professor_load, eligibility)
+    assert not report
+    assert report.total_load == report.total_demand + 1
+    assert "does not match" in report.reasons[0]
+
+
+def test_hall_groups_without_local_shortages():
+    # Y and Z each have an eligible professor, but it is the same one with load 1;
+    # A and B each have an eligible course, but it is the same one with demand 1.
+    professors, courses = ["A", "B", "C"], ["X", "Y", "Z"]
+    preferences = {"A": {"X": 1, "Y": FORBIDDEN, "Z": FORBIDDEN},
+                   "B": {"X": 1, "Y": FORBIDDEN, "Z": FORBIDDEN},
+                   "C": {"X": FORBIDDEN, "Y": 1, "Z": 1}}
+    course_demand = {"X": 1, "Y": 1, "Z": 1}
+    professor_load = {"A": 1, "B": 1, "C": 1}
+    eligibility = build_eligibility_index(professors, courses, preferences, FORBIDDEN)
+    report = check_feasibility(professors, courses, course_demand, professor_load, eligibility)
+    assert not report
+    assert report.max_flow == 2
+    assert not report.short_courses and not report.overloaded_professors
+    assert report.course_groups == [(["Y", "Z"], 2, 1)]
+    assert report.professor_groups == [(["A", "B"], 2, 1)]
+
+
+def test_overloaded_professor():
+    professors, courses = ["A", "B"], ["X", "Y"]
+    preferences = {"A": {"X": 1, "Y": FORBIDDEN}, "B": {"X": 1, "Y": 1}}
+    eligibility = build_eligibility_index(professors, courses, preferences, FORBIDDEN)
+    report = check_feasibility(professors, courses, {"X": 2, "Y": 1}, {"A": 2, "B": 1},
+                               eligibility)
+    assert not report
+    assert report.overloaded_professors == ["A"]
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""The anytime heuristic against the reference MILP: feasible, bounded and honest about proofs."""
+import numpy as np
+import pytest
+
+from eligibility import build_eligibility_index
+import heuristic
+from heuristic import lagrangian_bound
+from oracle import (FORBIDDEN, assigned_set, is_feasible, milp_optimum, random_instance,
+                    total_cost)
+from ProfessorAssignmentModular import build_and_solve_model
+from solution import STATUS_FEASIBLE, STATUS_INFEASIBLE, STATUS_NOT_SOLVED, STATUS_OPTIMAL
+
+SIZES = [(8, 12), (15, 25), (30, 40)]
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("seed", range(5))
+def test_heuristic_is_feasible_and_bounded(size, seed, quiet):
+    data = random_instance(*size, seed=seed, max_load=3)
+    professors, courses, preferences, course_demand, professor_load = data
+    optimum, _ = milp_optimum(*data)
+    with quiet():
+        model, assignment_vars = build_and_solve_model(*data, engine="heuristic", time_limit=5)
+    assert model.status in (STATUS_OPTIMAL, STATUS_FEASIBLE)
+    pairs = assigned_set(assignment_vars)
+    assert is_feasible(pairs, courses, course_demand, professor_load, preferences)
+    assert model.stats.objective == total_cost(pairs, preferences) >= optimum
+    assert model.lower_bound <= optimum
+    if model.status == STATUS_OPTIMAL:
+        assert model.stats.objective == optimum
+        assert model.gap == 0
+    else:
+        assert model.gap == pytest.approx((model.stats.objective - model.lower_bound)
+                                          / model.stats.objective)
+
+
+def test_unproven_results_are_reported_as_feasible(monkeypatch, quiet):
+    # Without the cycle-cancelling proof, only the Lagrangian bound can certify optimality.
+    monkeypatch.setattr(heuristic._LocalSearch, "cancel_cycles", lambda self, *args: False)
+    statuses = set()
+    for seed in range(5):
+        data = random_instance(30, 40, seed=seed, max_load=3)
+        optimum, _ = milp_optimum(*data)
+        with quiet():
+            model, _ = build_and_solve_model(*data, engine="heuristic", time_limit=5)
+        statuses.add(model.status)
+        assert model.lower_bound <= optimum <= model.stats.objective
+        proven = model.stats.objective <= model.lower_bound
+        assert model.status == (STATUS_OPTIMAL if proven else STATUS_FEASIBLE)
+    assert STATUS_FEASIBLE in statuses
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_lagrangian_bound_is_a_lower_bound(seed):
+    data = random_instance(20, 30, seed=seed, max_load=3)
+    professors, courses, preferences, course_demand, professor_load = data
+    eligibility = build_eligibility_index(professors, courses, preferences, FORBIDDEN)
+    demand = np.array([course_demand[c] for c in courses])
+    load = np.array([professor_load[p] for p in professors])
+    bound = lagrangian_bound(eligibility.prof_idx, eligibility.course_idx, eligibility.cost,
+                             demand, load)
+    assert bound <= milp_optimum(*data)[0]
+
+
+def test_heuristic_without_time_reports_not_solved(quiet):
+    with quiet():
+        model, assignment_vars = build_and_solve_model(*random_instance(8, 12), engine="heuristic",
+                                                       time_limit=0)
+    assert model.status == STATUS_NOT_SOLVED
+    assert model.gap is None
+    assert not assigned_set(assignment_vars)
+
+
+def test_heuristic_detects_infeasibility(quiet):
+    professors, courses, preferences, course_demand, professor_load = random_instance(6, 8)
+    # Nobody may teach a course that has sections.
+    course = next(c for c in courses if course_demand[c])
+    preferences = {p: dict(row, **{course: FORBIDDEN}) for p, row in preferences.items()}
+    with quiet():
+        model, _ = build_and_solve_model(professors, courses, preferences, course_demand,
+                                         professor_load, engine="heuristic", precheck=False)
+    assert model.status == STATUS_INFEASIBLE
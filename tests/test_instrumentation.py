@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""SolveStats filled in and published by build_and_solve_model."""
+import io
+import json
+
+import pytest
+
+from instrumentation import add_stats_hook, parse_cbc_log, remove_stats_hook
+from oracle import eligible_pairs, milp_optimum, random_instance
+from ProfessorAssignmentModular import build_and_solve_model
+from solution import STATUS_OPTIMAL
+
+
+@pytest.mark.parametrize("engine", ["pulp", "matrix", "flow"])
+def test_stats_describe_the_solve(engine, quiet):
+    data = random_instance(8, 12, seed=5)
+    professors, courses, preferences = data[:3]
+    seen, log = [], io.StringIO()
+    add_stats_hook(seen.append)
+    try:
+        with quiet():
+            model, _ = build_and_solve_model(*data, engine=engine, on_stats=seen.append,
+                                             log_stats=log)
+    finally:
+        remove_stats_hook(seen.append)
+
+    stats = model.stats
+    assert seen == [stats, stats]
+    assert json.loads(log.getvalue()) == json.loads(stats.to_json())
+    assert stats.engine == engine
+    assert stats.status == STATUS_OPTIMAL
+    assert stats.objective == milp_optimum(*data)[0]
+    assert {"eligibility", "precheck"} <= set(stats.timings)
+    assert all(seconds >= 0 for seconds in stats.timings.values())
+    assert stats.total_time == pytest.approx(sum(stats.timings.values()))
+    if engine != "flow":
+        assert stats.num_variables == len(eligible_pairs(professors, courses, preferences))
+        assert stats.num_constraints == len(professors) + len(courses)
+        assert stats.nonzeros == 2 * stats.num_variables
+
+
+def test_parse_cbc_log():
+    text = ("Result - Optimal solution found\n\n"
+            "Objective value:                47.00000000\n"
+            "Enumerated nodes:               3\n"
+            "Total iterations:               58\n"
+            "Time (CPU seconds):             0.01\n"
+            "Time (Wallclock seconds):       0.02\n")
+    parsed = parse_cbc_log(text)
+    assert parsed["nodes"] == 3
+    assert parsed["iterations"] == 58
+    assert parsed["wallclock"] == 0.02
+    assert "gap" not in parsed
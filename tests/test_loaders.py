@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""The CSV and SQLite loaders against the raw generated files."""
+import csv
+import os
+import sqlite3
+
+import pytest
+
+from codeGen import generate_synthetic_instance, get_data
+from oracle import FORBIDDEN, milp_optimum
+from ProfessorAssignmentModular import (build_and_solve_model, get_data_from_csvs,
+                                        get_data_from_database, get_data_hardcoded)
+from problemInstance import ProblemInstance
+from solution import STATUS_OPTIMAL
+
+
+def read_raw(folder):
+    """Reads the five generated CSV files with the csv module, as nested dicts."""
+    def rows(name):
+        with open(os.path.join(folder, name), newline="") as f:
+            return list(csv.DictReader(f))
+
+    professors = [row["ProfessorName"] for row in rows("professors.csv")]
+    courses = [row["CourseName"] for row in rows("courses.csv")]
+    course_demand = {row["CourseName"]: int(row["Demand"]) for row in rows("course_demand.csv")}
+    professor_load = {row["ProfessorName"]: int(row["Load"]) for row in rows("professor_load.csv")}
+    preferences = {p: {} for p in professors}
+    for row in rows("preferences.csv"):
+        preferences[row["ProfessorName"]][row["CourseName"]] = int(row["Preference"])
+    return professors, courses, preferences, course_demand, professor_load
+
+
+def as_dicts(instance):
+    """Returns a loaded instance as the loader five-tuple of plain lists and dicts."""
+    professors, courses, preferences, course_demand, professor_load = instance
+    return (list(professors), list(courses), {p: dict(preferences[p]) for p in professors},
+            dict(course_demand), dict(professor_load))
+
+
+def eligible_only(preferences):
+    return {p: {c: cost for c, cost in row.items() if cost < FORBIDDEN}
+            for p, row in preferences.items()}
+
+
+@pytest.fixture(scope="module")
+def generated(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("generated")
+    db_file = str(folder / "university.db")
+    generate_synthetic_instance(12, 20, density=0.3, num_departments=2, cross_density=0.05,
+                                load_range=(1, 3), seed=7, folder=str(folder), db_file=db_file,
+                                batch_rows=50)
+    return str(folder), db_file, read_raw(str(folder))
+
+
+@pytest.mark.parametrize("source", ["csv", "sqlite"])
+def test_loader_matches_the_raw_files(generated, source, quiet):
+    folder, db_file, raw = generated
+    with quiet():
+        instance = (get_data_from_csvs(folder, chunksize=37) if source == "csv"
+                    else get_data_from_database(db_file, batch_size=13))
+    professors, courses, preferences, course_demand, professor_load = as_dicts(instance)
+    assert professors == raw[0]
+    assert courses == raw[1]
+    assert preferences == eligible_only(raw[2])
+    assert course_demand == raw[3]
+    assert professor_load == raw[4]
+
+
+def test_loaded_instance_solves_to_the_raw_optimum(generated, quiet):
+    folder, db_file, raw = generated
+    expected, _ = milp_optimum(*raw)
+    for load in (lambda: get_data_from_csvs(folder), lambda: get_data_from_database(db_file)):
+        with quiet():
+            model, _ = build_and_solve_model(load(), engine="flow")
+        assert model.status == STATUS_OPTIMAL
+        assert model.stats.objective == expected
+
+
+def test_database_with_demand_on_the_courses_table(tmp_path, quiet):
+    professors_df, courses_df, demand_df, load_df, prefs_df = get_data()
+    db_file = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_file)
+    with conn:
+        conn.execute("CREATE TABLE Professors (ProfessorName TEXT PRIMARY KEY)")
+        conn.execute("CREATE TABLE Courses (CourseName TEXT PRIMARY KEY, Demand INTEGER)")
+        conn.execute("CREATE TABLE ProfessorLoad (ProfessorName TEXT PRIMARY KEY, Load INTEGER)")
+        conn.execute("CREATE TABLE Preferences (ProfessorName TEXT, CourseName TEXT, "
+                     "Preference INTEGER)")
+        conn.executemany("INSERT INTO Professors VALUES (?)",
+                         professors_df[["ProfessorName"]].itertuples(index=False))
+        conn.executemany("INSERT INTO Courses VALUES (?, ?)",
+                         demand_df[["CourseName", "Demand"]].itertuples(index=False))
+        conn.executemany("INSERT INTO ProfessorLoad VALUES (?, ?)",
+                         load_df[["ProfessorName", "Load"]].itertuples(index=False))
+        conn.executemany("INSERT INTO Preferences VALUES (?, ?, ?)",
+                         prefs_df[["ProfessorName", "CourseName", "Preference"]]
+                         .itertuples(index=False))
+    conn.close()
+
+    with quiet():
+        loaded = as_dicts(get_data_from_database(db_file))
+        professors, courses, preferences, course_demand, professor_load = get_data_hardcoded()
+    assert sorted(loaded[0]) == sorted(professors)
+    assert sorted(loaded[1]) == sorted(courses)
+    assert loaded[2] == eligible_only(preferences)
+    assert loaded[3] == course_demand
+    assert loaded[4] == professor_load
+
+
+def test_database_filter_on_a_missing_column(generated, quiet):
+    with quiet(), pytest.raises(ValueError):
+        get_data_from_database(generated[1], department="Math")
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_saved_instance_round_trips(generated, tmp_path, mmap, quiet):
+    with quiet():
+        instance = get_data_from_csvs(generated[0])
+    instance.save(str(tmp_path / "instance"))
+    assert as_dicts(ProblemInstance.open(str(tmp_path / "instance"), mmap=mmap)) == as_dicts(instance)
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""k-best ranking against brute-force enumeration of every feasible assignment."""
+import itertools
+
+import pytest
+
+from oracle import FORBIDDEN, assigned_set, enumerate_assignments, random_instance, total_cost
+from rankedAssignments import k_best_assignments
+
+CASES = [(4, 5, seed) for seed in range(6)] + [(5, 6, seed) for seed in range(4)]
+
+
+@pytest.mark.parametrize("num_profs, num_courses, seed", CASES)
+def test_full_ranking_lists_every_assignment_in_order(num_profs, num_courses, seed):
+    data = random_instance(num_profs, num_courses, seed=seed, eligible_share=0.6)
+    preferences = data[2]
+    expected = enumerate_assignments(*data)
+    ranked = list(k_best_assignments(*data))
+
+    assert [model.rank for model, _ in ranked] == list(range(1, len(ranked) + 1))
+    assert [model.objective for model, _ in ranked] == [cost for cost, _ in expected]
+    found = [assigned_set(assignment_vars) for _, assignment_vars in ranked]
+    assert len(set(found)) == len(found)
+    assert set(found) == {pairs for _, pairs in expected}
+    for (model, _), pairs in zip(ranked, found):
+        assert total_cost(pairs, preferences) == model.objective
+
+
+def test_k_stops_early():
+    data = random_instance(5, 6, seed=1, eligible_share=0.6)
+    expected = enumerate_assignments(*data)
+    assert len(expected) > 3
+    ranked = list(k_best_assignments(*data, k=3))
+    assert [model.objective for model, _ in ranked] == [cost for cost, _ in expected[:3]]
+
+
+def test_generator_is_lazy():
+    data = random_instance(5, 6, seed=2, eligible_share=0.6)
+    first_two = list(itertools.islice(k_best_assignments(*data), 2))
+    assert [model.rank for model, _ in first_two] == [1, 2]
+
+
+def test_infeasible_instance_yields_nothing():
+    professors, courses, preferences, course_demand, professor_load = random_instance(4, 5)
+    course = next(c for c in courses if course_demand[c])
+    preferences = {p: dict(row, **{course: FORBIDDEN}) for p, row in preferences.items()}
+    assert list(k_best_assignments(professors, courses, preferences, course_demand,
+                                   professor_load)) == []
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Extracted assignments written to every sink and read back."""
+import csv
+import json
+import sqlite3
+
+import pytest
+
+from oracle import assigned_set, milp_optimum, random_instance
+from ProfessorAssignmentModular import build_and_solve_model
+from problemInstance import ProblemInstance
+from results import SINKS, extract_assignment, write_results
+
+
+def read_csv(path):
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["ProfessorName", "CourseName", "Preference"]
+    return [(p, c, int(cost)) for p, c, cost in rows[1:]]
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [(row["ProfessorName"], row["CourseName"], row["Preference"])
+                for row in map(json.loads, f)]
+
+
+def read_sqlite(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT ProfessorName, CourseName, Preference FROM Assignments").fetchall()
+    finally:
+        conn.close()
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl, "sqlite": read_sqlite}
+EXTENSIONS = {"csv": "csv", "jsonl": "jsonl", "sqlite": "db"}
+
+
+@pytest.mark.parametrize("sink", list(SINKS))
+@pytest.mark.parametrize("engine", ["flow", "pulp"])
+def test_sinks_round_trip_the_assignment(sink, engine, tmp_path, quiet):
+    data = random_instance(8, 12, seed=0)
+    preferences = data[2]
+    with quiet():
+        model, assignment_vars = build_and_solve_model(*data, engine=engine)
+    result = extract_assignment(model, assignment_vars, ProblemInstance.from_data(*data))
+    assert result.objective == model.stats.objective == milp_optimum(*data)[0]
+
+    path = str(tmp_path / f"assignments.{EXTENSIONS[sink]}")
+    write_results(result, sink, path)
+    rows = READERS[sink](path)
+    assert len(rows) == len(result)
+    assert {(p, c) for p, c, _ in rows} == assigned_set(assignment_vars)
+    assert all(cost == preferences[p][c] for p, c, cost in rows)
+    assert sum(cost for _, _, cost in rows) == result.objective
+
+
+def test_sqlite_sink_replaces_the_previous_assignment(tmp_path, quiet):
+    path = str(tmp_path / "university.db")
+    for seed in (1, 2):
+        data = random_instance(6, 9, seed=seed)
+        with quiet():
+            model, assignment_vars = build_and_solve_model(*data, engine="flow")
+        write_results(extract_assignment(model, assignment_vars, *data[:3]), "sqlite", path)
+    rows = read_sqlite(path)
+    assert {(p, c) for p, c, _ in rows} == assigned_set(assignment_vars)
+    assert sum(cost for _, _, cost in rows) == model.stats.objective
+
+
+def test_unknown_sink(tmp_path, quiet):
+    data = random_instance(4, 5)
+    with quiet():
+        model, assignment_vars = build_and_solve_model(*data, engine="flow")
+    result = extract_assignment(model, assignment_vars, *data[:3])
+    with pytest.raises(ValueError):
+        write_results(result, "parquet", str(tmp_path / "out.parquet"))
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Sensitivity reports checked with LP duality and by re-solving inside the reported ranges."""
+import random
+
+import numpy as np
+import pytest
+
+from oracle import assigned_set, milp_optimum, random_instance, total_cost
+from ProfessorAssignmentModular import build_and_solve_model
+from timeConflicts import find_conflict_groups
+
+ENGINES = [{"engine": "flow"}, {"engine": "matrix"}, {"engine": "pulp", "backend": "cbc"}]
+
+
+def solve_with_sensitivity(data, quiet, **options):
+    with quiet():
+        model, assignment_vars = build_and_solve_model(*data, sensitivity=True, **options)
+    return model, assigned_set(assignment_vars)
+
+
+@pytest.mark.parametrize("options", ENGINES, ids=lambda options: options["engine"])
+@pytest.mark.parametrize("seed", range(4))
+def test_duals_certify_the_optimum(options, seed, quiet):
+    data = random_instance(8, 12, seed=seed, max_load=3)
+    professors, courses, preferences, course_demand, professor_load = data
+    model, pairs = solve_with_sensitivity(data, quiet, **options)
+    report = model.sensitivity
+
+    taken = report.assigned.astype(bool)
+    assert {(professors[i], courses[j]) for i, j in
+            zip(report.prof_idx[taken].tolist(), report.course_idx[taken].tolist())} == pairs
+    assert (report.reduced_cost[taken] <= 1e-9).all()
+    assert (report.reduced_cost[~taken] >= -1e-9).all()
+    # Strong duality: the dual objective equals the optimal cost. The x <= 1
+    # bounds take the negative reduced costs of the assigned pairs as their duals.
+    dual_objective = (report.course_duals @ np.array([course_demand[c] for c in courses])
+                      + report.professor_duals @ np.array([professor_load[p] for p in professors])
+                      + np.minimum(report.reduced_cost, 0).sum())
+    assert dual_objective == pytest.approx(milp_optimum(*data)[0])
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_schedule_stays_optimal_inside_the_ranges(seed, quiet):
+    data = random_instance(7, 10, seed=seed, max_load=3)
+    professors, courses, preferences, course_demand, professor_load = data
+    model, pairs = solve_with_sensitivity(data, quiet, engine="flow")
+    rng = random.Random(seed)
+    eligible = [(p, c) for p in professors for c in courses if preferences[p][c] < 999]
+    for p, c in rng.sample(eligible, 8):
+        lower, upper = model.sensitivity.stability(p, c)
+        assert lower <= preferences[p][c] <= upper
+        # The finite end of the range is the furthest the cost can move.
+        new_cost = int(lower) if np.isfinite(lower) else int(upper)
+        edited = {q: dict(row) for q, row in preferences.items()}
+        edited[p][c] = new_cost
+        optimum, _ = milp_optimum(professors, courses, edited, course_demand, professor_load)
+        assert total_cost(pairs, edited) == optimum
+
+
+def test_stability_of_an_unknown_pair(quiet):
+    data = random_instance(5, 6, seed=0)
+    professors, courses, preferences = data[:3]
+    model, _ = solve_with_sensitivity(data, quiet, engine="flow")
+    p, c = next((p, c) for p in professors for c in courses if preferences[p][c] >= 999)
+    with pytest.raises(KeyError):
+        model.sensitivity.stability(p, c)
+
+
+def test_refused_with_fairness_or_conflicts():
+    data = random_instance(5, 6, seed=0)
+    courses = data[1]
+    conflicts = find_conflict_groups(courses, np.array([0, 1]), np.array(["Mon", "Mon"]),
+                                     np.array([540, 570]), np.array([600, 630]))
+    with pytest.raises(ValueError):
+        build_and_solve_model(*data, engine="matrix", sensitivity=True, fairness=True)
+    with pytest.raises(ValueError):
+        build_and_solve_model(*data, engine="matrix", sensitivity=True, conflicts=conflicts)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""SolutionCache hits must reproduce the solve they replace, and only proven answers are stored."""
+from oracle import FORBIDDEN, assigned_set, milp_optimum, random_instance
+from ProfessorAssignmentModular import build_and_solve_model
+from solution import STATUS_INFEASIBLE, STATUS_NOT_SOLVED
+from solutionCache import SolutionCache
+
+
+def solve(data, cache, quiet, **options):
+    with quiet():
+        model, assignment_vars = build_and_solve_model(*data, cache=cache, **options)
+    return model, assigned_set(assignment_vars)
+
+
+def test_hits_reproduce_the_solve_from_memory_and_disk(tmp_path, quiet):
+    data = random_instance(8, 12, seed=0)
+    path = str(tmp_path / "cache.db")
+    cache = SolutionCache(path)
+    model, pairs = solve(data, cache, quiet, engine="flow")
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    for fresh in (cache, SolutionCache(path)):
+        hit, hit_pairs = solve(data, fresh, quiet, engine="flow")
+        assert hit.stats.cache_hit
+        assert fresh.hits == 1
+        assert hit.status == model.status
+        assert hit.stats.objective == model.stats.objective == milp_optimum(*data)[0]
+        assert hit_pairs == pairs
+
+
+def test_edits_and_options_change_the_key(tmp_path, quiet):
+    data = random_instance(8, 12, seed=1)
+    cache = SolutionCache(str(tmp_path / "cache.db"))
+    model, pairs = solve(data, cache, quiet, engine="flow")
+
+    professors, courses, preferences, course_demand, professor_load = data
+    p, c = next(iter(pairs))
+    edited = {q: dict(row) for q, row in preferences.items()}
+    edited[p][c] += 1
+    solve((professors, courses, edited, course_demand, professor_load), cache, quiet,
+          engine="flow")
+    solve(data, cache, quiet, engine="matrix")
+    assert cache.misses == 3
+
+    # A warm start does not change the optimum, so it shares the entry.
+    with quiet():
+        _, assignment_vars = build_and_solve_model(*data, engine="flow")
+        hit, _ = build_and_solve_model(*data, engine="matrix", cache=cache,
+                                       initial_assignment=assignment_vars)
+    assert hit.stats.cache_hit
+
+
+def test_fair_model_attributes_survive_the_disk(tmp_path, quiet):
+    data = random_instance(6, 8, seed=2, eligible_share=0.6)
+    path = str(tmp_path / "cache.db")
+    model, _ = solve(data, SolutionCache(path), quiet, engine="matrix", fairness=True)
+    hit, _ = solve(data, SolutionCache(path), quiet, engine="matrix", fairness=True)
+    assert hit.stats.cache_hit
+    for name in ("max_professor_cost", "fairness_lower_bound", "fairness_solves"):
+        assert getattr(hit, name) == getattr(model, name)
+
+
+def test_unproven_results_are_not_stored(tmp_path, quiet):
+    data = random_instance(8, 12, seed=3)
+    cache = SolutionCache(str(tmp_path / "cache.db"))
+    for _ in range(2):
+        model, _ = solve(data, cache, quiet, engine="heuristic", time_limit=0)
+        assert model.status == STATUS_NOT_SOLVED
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_infeasible_hit_keeps_its_explanation(tmp_path, quiet):
+    professors, courses, preferences, course_demand, professor_load = random_instance(6, 8, seed=4)
+    course = next(c for c in courses if course_demand[c])
+    preferences = {p: dict(row, **{course: FORBIDDEN}) for p, row in preferences.items()}
+    data = professors, courses, preferences, course_demand, professor_load
+    cache = SolutionCache(str(tmp_path / "cache.db"))
+    solve(data, cache, quiet, engine="flow")
+    hit, pairs = solve(data, cache, quiet, engine="flow")
+    assert hit.stats.cache_hit
+    assert hit.status == STATUS_INFEASIBLE and not pairs
+    assert course in hit.feasibility.short_courses
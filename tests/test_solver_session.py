@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""AssignmentSession edits against a cold solve of the edited problem."""
+import random
+
+import pytest
+
+from oracle import FORBIDDEN, assigned_set, is_feasible, milp_optimum, random_instance, total_cost
+from ProfessorAssignmentModular import get_data_hardcoded
+from solution import STATUS_OPTIMAL
+from solverSession import AssignmentSession
+
+
+class Mirror:
+    """The session's problem kept as plain dicts, following the documented edit semantics."""
+
+    def __init__(self, professors, courses, preferences, course_demand, professor_load):
+        self.professors = professors
+        self.courses = courses
+        self.preferences = {p: dict(preferences[p]) for p in professors}
+        self.course_demand = dict(course_demand)
+        self.professor_load = dict(professor_load)
+        self.forbidden = set()
+        self.forced = set()
+
+    def effective_preferences(self):
+        return {p: {c: FORBIDDEN if (p, c) in self.forbidden else cost for c, cost in row.items()}
+                for p, row in self.preferences.items()}
+
+    def optimum(self):
+        return milp_optimum(self.professors, self.courses, self.effective_preferences(),
+                            self.course_demand, self.professor_load, forced=self.forced)[0]
+
+
+def check(session, mirror):
+    expected = mirror.optimum()
+    assert session.objective == expected
+    model, assignment_vars = session.solve()
+    if expected is None:
+        assert model.status != STATUS_OPTIMAL
+        return
+    pairs = assigned_set(assignment_vars)
+    assert mirror.forced <= pairs
+    assert is_feasible(pairs, mirror.courses, mirror.course_demand, mirror.professor_load,
+                       mirror.effective_preferences())
+    assert total_cost(pairs, mirror.preferences) == expected
+
+
+def test_initial_solve_is_optimal():
+    for seed in range(4):
+        data = random_instance(8, 12, seed=seed)
+        check(AssignmentSession(*data), Mirror(*data))
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_random_edit_sequences(seed):
+    data = random_instance(7, 9, seed=seed)
+    professors, courses = data[0], data[1]
+    session, mirror = AssignmentSession(*data), Mirror(*data)
+    rng = random.Random(seed)
+    for _ in range(40):
+        p, c = rng.choice(professors), rng.choice(courses)
+        edit = rng.choice(["cost", "cost", "forbid_cost", "forbid", "allow", "force", "release",
+                           "demand"])
+        if edit == "cost":
+            cost = rng.randint(1, 9)
+            session.set_preference(p, c, cost)
+            mirror.preferences[p][c] = cost
+        elif edit == "forbid_cost":
+            session.set_preference(p, c, FORBIDDEN)
+            mirror.preferences[p][c] = FORBIDDEN
+            mirror.forced.discard((p, c))
+        elif edit == "forbid":
+            session.forbid(p, c)
+            mirror.forbidden.add((p, c))
+            mirror.forced.discard((p, c))
+        elif edit == "allow":
+            session.allow(p, c)
+            mirror.forbidden.discard((p, c))
+        elif edit == "force":
+            if mirror.preferences[p][c] >= FORBIDDEN:
+                continue
+            session.force(p, c)
+            mirror.forced.add((p, c))
+            mirror.forbidden.discard((p, c))
+        elif edit == "release":
+            session.release(p, c)
+            mirror.forced.discard((p, c))
+            mirror.forbidden.discard((p, c))
+        else:
+            # Move one section between courses so that the totals stay balanced.
+            other = rng.choice(courses)
+            if other == c or mirror.course_demand[c] == 0:
+                continue
+            for course, change in ((c, -1), (other, 1)):
+                mirror.course_demand[course] += change
+                session.set_demand(course, mirror.course_demand[course])
+        check(session, mirror)
+
+
+def test_unbalanced_edits_are_infeasible_until_repaired():
+    data = random_instance(6, 8, seed=3)
+    professors, courses = data[0], data[1]
+    session, mirror = AssignmentSession(*data), Mirror(*data)
+    load = mirror.professor_load[professors[0]]
+    session.set_load(professors[0], load + 1)
+    assert session.status != STATUS_OPTIMAL and session.objective is None
+    session.set_load(professors[0], load)
+    check(session, mirror)
+
+
+def test_release_keeps_a_pair_forbidden_by_its_cost():
+    data = get_data_hardcoded()
+    model, assignment_vars = AssignmentSession(*data).solve()
+    for p, c in sorted(assigned_set(assignment_vars)):
+        session, mirror = AssignmentSession(*data), Mirror(*data)
+        session.set_preference(p, c, FORBIDDEN)
+        mirror.preferences[p][c] = FORBIDDEN
+        session.release(p, c)
+        check(session, mirror)
+
+
+def test_a_new_cost_does_not_lift_a_forbid():
+    data = get_data_hardcoded()
+    session, mirror = AssignmentSession(*data), Mirror(*data)
+    session.forbid("Prof_A", "Intro_to_AI")
+    mirror.forbidden.add(("Prof_A", "Intro_to_AI"))
+    check(session, mirror)
+    session.set_preference("Prof_A", "Intro_to_AI", 1)
+    mirror.preferences["Prof_A"]["Intro_to_AI"] = 1
+    check(session, mirror)
+    assert ("Prof_A", "Intro_to_AI") not in assigned_set(session.solve()[1])
+    session.allow("Prof_A", "Intro_to_AI")
+    mirror.forbidden.discard(("Prof_A", "Intro_to_AI"))
+    check(session, mirror)
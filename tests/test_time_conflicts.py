@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""Time conflicts: the sweep against pairwise overlap checks, the models against the reference MILP."""
+import itertools
+import os
+import random
+import sqlite3
+
+import numpy as np
+import pytest
+
+from codeGen import generate_synthetic_instance
+from oracle import assigned_set, is_feasible, milp_optimum, random_instance, total_cost
+from ProfessorAssignmentModular import (build_and_solve_model, get_data_from_csvs,
+                                        get_data_from_database)
+from problemInstance import ProblemInstance
+from solution import STATUS_OPTIMAL
+from timeConflicts import find_conflict_groups
+
+DAYS = ("Mon", "Tue", "Wed")
+CONFLICT_ENGINES = [
+    {"engine": "pulp", "backend": "cbc"},
+    {"engine": "matrix", "backend": "highs"},
+    {"engine": "matrix", "backend": "scipy"},
+    {"engine": "matrix", "backend": "cbc"},
+]
+
+
+def random_meetings(courses, seed, meetings_per_course=2):
+    """Random meetings on a half-hour grid, so that back-to-back meetings are common."""
+    rng = random.Random(seed)
+    meetings = []
+    for c in courses:
+        for day in rng.sample(DAYS, meetings_per_course):
+            start = 8 * 60 + 30 * rng.randrange(12)
+            meetings.append((c, day, start, start + 30 * rng.randint(1, 4)))
+    return meetings
+
+
+def overlapping_pairs(meetings):
+    """Every pair of distinct courses with two meetings that overlap, checked pair by pair."""
+    pairs = set()
+    for (a, day_a, start_a, end_a), (b, day_b, start_b, end_b) in itertools.combinations(meetings, 2):
+        if a != b and day_a == day_b and start_a < end_b and start_b < end_a:
+            pairs.add(frozenset((a, b)))
+    return pairs
+
+
+def conflict_groups(courses, meetings):
+    position = {c: j for j, c in enumerate(courses)}
+    columns = list(zip(*meetings))
+    return find_conflict_groups(courses, np.array([position[c] for c in columns[0]]),
+                                np.array(columns[1]), np.array(columns[2]), np.array(columns[3]))
+
+
+def pairs_of_groups(groups):
+    return {frozenset(pair) for group in groups for pair in itertools.combinations(group, 2)}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_sweep_finds_exactly_the_overlapping_pairs(seed):
+    courses = [f"Course_{j}" for j in range(12)]
+    meetings = random_meetings(courses, seed)
+    groups = [set(group) for group in conflict_groups(courses, meetings)]
+    assert pairs_of_groups(groups) == overlapping_pairs(meetings)
+    # The groups are maximal: none lies inside another.
+    assert not any(a < b for a, b in itertools.permutations(groups, 2))
+
+
+def test_back_to_back_and_other_days_do_not_conflict():
+    courses = ["A", "B", "C", "D"]
+    meetings = [("A", "Mon", "09:00", "10:00"), ("B", "Mon", "10:00", "11:00"),
+                ("C", "Tue", "09:00", "10:00"), ("D", "Mon", "09:30", "10:30")]
+    groups = sorted(sorted(group) for group in conflict_groups(courses, meetings))
+    assert groups == [["A", "D"], ["B", "D"]]
+
+
+def test_meeting_that_does_not_end_after_it_starts():
+    with pytest.raises(ValueError):
+        conflict_groups(["A"], [("A", "Mon", 600, 600)])
+
+
+@pytest.mark.parametrize("options", CONFLICT_ENGINES,
+                         ids=lambda options: f"{options['engine']}-{options['backend']}")
+@pytest.mark.parametrize("seed", range(5))
+def test_conflict_model_matches_the_pairwise_milp(options, seed, quiet):
+    data = random_instance(8, 12, seed=seed, eligible_share=0.6, max_load=3)
+    professors, courses, preferences, course_demand, professor_load = data
+    meetings = random_meetings(courses, seed, meetings_per_course=1)
+    conflicts = conflict_groups(courses, meetings)
+    overlaps = [tuple(pair) for pair in overlapping_pairs(meetings)]
+    expected, _ = milp_optimum(*data, pairwise_conflicts=overlaps)
+
+    with quiet():
+        model, assignment_vars = build_and_solve_model(*data, conflicts=conflicts, **options)
+    if expected is None:
+        assert model.status != STATUS_OPTIMAL
+        return
+    pairs = assigned_set(assignment_vars)
+    assert model.status == STATUS_OPTIMAL
+    assert is_feasible(pairs, courses, course_demand, professor_load, preferences)
+    assert not any(frozenset((c, d)) in set(map(frozenset, overlaps))
+                   for (p, c), (q, d) in itertools.combinations(pairs, 2) if p == q)
+    assert total_cost(pairs, preferences) == model.stats.objective == expected
+
+
+def test_conflicts_need_a_mip_engine_unless_ignored(quiet):
+    data = random_instance(8, 12, seed=1, eligible_share=0.6)
+    courses = data[1]
+    conflicts = conflict_groups(courses, random_meetings(courses, 1, meetings_per_course=1))
+    assert len(conflicts)
+    instance = ProblemInstance.from_data(*data)
+    instance.conflicts = conflicts
+    for options in ({"engine": "flow"}, {"engine": "heuristic"},
+                    {"engine": "matrix", "decompose": True}):
+        with pytest.raises(ValueError):
+            build_and_solve_model(instance, **options)
+    with quiet():
+        model, _ = build_and_solve_model(instance, engine="flow", conflicts=False)
+    assert model.stats.objective == milp_optimum(*data)[0]
+
+
+def test_loaders_read_meeting_times(tmp_path, quiet):
+    folder, db_file = str(tmp_path), str(tmp_path / "university.db")
+    with quiet():
+        generate_synthetic_instance(6, 10, density=0.5, load_range=(1, 2), seed=3,
+                                    folder=folder, db_file=db_file)
+    courses = [f"Course_{j}" for j in range(10)]
+    meetings = [(c, day, f"{start // 60:02d}:{start % 60:02d}", f"{end // 60:02d}:{end % 60:02d}")
+                for c, day, start, end in random_meetings(courses, 3)]
+    with open(os.path.join(folder, "course_times.csv"), "w") as f:
+        f.write("CourseName,Day,Start,End\n")
+        f.writelines(",".join(meeting) + "\n" for meeting in meetings)
+    conn = sqlite3.connect(db_file)
+    with conn:
+        conn.execute("CREATE TABLE CourseTimes (CourseName TEXT, Day TEXT, Start TEXT, End TEXT)")
+        conn.executemany("INSERT INTO CourseTimes VALUES (?, ?, ?, ?)", meetings)
+    conn.close()
+
+    expected = overlapping_pairs(random_meetings(courses, 3))
+    assert expected
+    with quiet():
+        for instance in (get_data_from_csvs(folder), get_data_from_database(db_file)):
+            assert pairs_of_groups(instance.conflicts) == expected
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Time-slot conflicts: no professor may teach two courses that meet at the same time.
+
+Meeting times come from a table next to Courses, one row per meeting:
+
+- course_times.csv: Columns "CourseName", "Day", "Start", "End"
+- CourseTimes(CourseName TEXT, Day TEXT, Start, End) in SQLite
+
+"Day" is any label ("Mon", "Tue", ...). "Start" and "End" are "HH:MM" strings
+or minutes since midnight. A course that meets on several days has one row per
+day. Every professor who teaches a course attends all of its meetings, so when
+the sections of one course meet at different times, list them as separate
+courses.
+
+Adding one constraint `x[p, a] + x[p, b] <= 1` for every professor and every
+overlapping pair (a, b) grows quadratically with the number of sections. Here
+the overlaps are found with one sweep over the sorted start and end times (per
+day). The set of meetings in progress when a run of starts gives way to an end
+is a maximal group of mutually overlapping meetings. Each distinct group G of
+courses then becomes one clique constraint per professor,
+`sum(x[p, c] for c in G) <= 1`, and only for professors eligible for at least
+two of its courses. The clique constraints imply every pairwise one and make
+the LP relaxation tighter.
+
+The extra rows break the total unimodularity of the assignment matrix, so a
+model with conflicts is solved as a MIP (the "pulp" and "matrix" engines).
+"""
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+
+
+class ConflictGroups:
+    """
+    Groups of courses whose meetings overlap pairwise, in CSR layout.
+
+    Attributes:
+        courses (list): The course names; positions are course ids.
+        group_ptr (np.ndarray): The courses of group g are
+            `group_courses[group_ptr[g]:group_ptr[g + 1]]`.
+        group_courses (np.ndarray): The course ids of every group, group by group.
+    """
+    __slots__ = ("courses", "group_ptr", "group_courses")
+
+    def __init__(self, courses, group_ptr, group_courses):
+        self.courses = courses
+        self.group_ptr = np.asarray(group_ptr, dtype=np.int64)
+        self.group_courses = np.asarray(group_courses, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.group_ptr) - 1
+
+    def __iter__(self):
+        """Yields each group as a list of course names."""
+        courses, ptr = self.courses, self.group_ptr.tolist()
+        members = self.group_courses.tolist()
+        for g in range(len(self)):
+            yield [courses[j] for j in members[ptr[g]:ptr[g + 1]]]
+
+    def digest(self):
+        """Returns a string that identifies the groups, for cache keys."""
+        return ";".join(",".join(sorted(group)) for group in sorted(map(sorted, self)))
+
+    def __repr__(self):
+        largest = int(np.diff(self.group_ptr).max()) if len(self) else 0
+        return f"ConflictGroups({len(self)} groups, largest has {largest} courses)"
+
+
+def to_minutes(values):
+    """Converts "HH:MM" strings, or plain minute counts, to minutes since midnight."""
+    values = np.asarray(values)
+    if values.dtype.kind in "iuf":
+        return values.astype(np.int64)
+    parts = np.char.partition(values.astype(str), ":")
+    has_colon = parts[:, 1] == ":"
+    first = parts[:, 0].astype(np.int64)
+    second = np.where(has_colon, parts[:, 2], "0").astype(np.int64)
+    return np.where(has_colon, first * 60 + second, first)
+
+
+def find_conflict_groups(courses, course_idx, day, start, end):
+    """
+    Finds the maximal groups of courses with mutually overlapping meetings.
+
+    Two meetings on the same day overlap when each starts before the other
+    ends; back-to-back meetings do not. Days are laid end to end on one time
+    line, so a single sweep covers all of them: at equal times ends come
+    before starts. A group contained in another one is dropped.
+
+    Args:
+        courses (list): The course names; positions are course ids.
+        course_idx (np.ndarray): The course id of each meeting.
+        day (np.ndarray): The day label of each meeting.
+        start (np.ndarray): The start of each meeting ("HH:MM" or minutes).
+        end (np.ndarray): The end of each meeting ("HH:MM" or minutes).
+
+    Returns:
+        ConflictGroups: The distinct groups with at least two courses.
+
+    Raises:
+        ValueError: If a meeting does not end after it starts.
+    """
+    course_idx = np.asarray(course_idx, dtype=np.int64)
+    start, end = to_minutes(start), to_minutes(end)
+    bad = np.flatnonzero(end <= start)
+    if len(bad):
+        raise ValueError(f"A meeting of {courses[course_idx[bad[0]]]} does not end after it starts.")
+    if not len(start):
+        return ConflictGroups(courses, [0], [])
+
+    day_code = np.unique(np.asarray(day).astype(str), return_inverse=True)[1].ravel()
+    offset = day_code.astype(np.int64) * (int(end.max()) + 1)
+    times = np.concatenate([start + offset, end + offset])
+    is_start = np.concatenate([np.ones(len(start), dtype=np.int8), np.zeros(len(end), dtype=np.int8)])
+    meeting = np.concatenate([np.arange(len(start)), np.arange(len(end))])
+    order = np.lexsort((is_start, times))
+
+    groups = set()
+    active = {}  # meeting -> course id of the meetings in progress
+    grew = False
+    for opening, k in zip(is_start[order].tolist(), meeting[order].tolist()):
+        if opening:
+            active[k] = int(course_idx[k])
+            grew = True
+            continue
+        if grew:
+            group = frozenset(active.values())
+            if len(group) > 1:
+                groups.add(group)
+            grew = False
+        del active[k]
+
+    # A group from one day can lie inside a group from another; its rows would be redundant.
+    containing = {}
+    for group in groups:
+        for j in group:
+            containing.setdefault(j, []).append(group)
+    groups = [group for group in groups
+              if not any(group < other for other in min((containing[j] for j in group), key=len))]
+
+    members = [sorted(group) for group in groups]
+    members.sort()
+    group_ptr = np.zeros(len(members) + 1, dtype=np.int64)
+    np.cumsum([len(group) for group in members], out=group_ptr[1:])
+    group_courses = [j for group in members for j in group]
+    return ConflictGroups(courses, group_ptr, group_courses)
+
+
+def conflict_rows(conflicts, eligibility):
+    """
+    Builds the clique constraints of the conflict groups over the eligible pairs.
+
+    Args:
+        conflicts (ConflictGroups): The groups of overlapping courses.
+        eligibility (EligibilityIndex): The eligible pairs (the model's variables).
+
+    Returns:
+        scipy.sparse.csr_matrix: One row per (group, professor) with at least
+            two eligible pairs in the group; each row's sum must be at most 1.
+    """
+    num_profs = len(eligibility.professors)
+    group_of = np.repeat(np.arange(len(conflicts)), np.diff(conflicts.group_ptr))
+    member = conflicts.group_courses
+    # The pair positions of every member course, laid out member by member.
+    counts = eligibility.course_ptr[member + 1] - eligibility.course_ptr[member]
+    first = np.repeat(eligibility.course_ptr[member] - np.cumsum(counts) + counts, counts)
+    pairs = eligibility.course_order[first + np.arange(counts.sum())]
+    keys = np.repeat(group_of, counts) * num_profs + eligibility.prof_idx[pairs]
+
+    _, row, sizes = np.unique(keys, return_inverse=True, return_counts=True)
+    keep = sizes[row] >= 2
+    rows = np.unique(row[keep], return_inverse=True)[1].ravel()
+    return csr_matrix((np.ones(len(rows)), (rows, pairs[keep])),
+                      shape=(int(rows.max()) + 1 if len(rows) else 0, eligibility.num_pairs))
+
+
+def add_conflict_rows(matrix, rhs, conflicts, eligibility):
+    """
+    Appends the conflict constraints to a matrix-form model (see matrixModel.py).
+
+    Returns:
+        tuple: The matrix, the row lower bounds and the row upper bounds (None
+               when no professor has a conflict, so the model is unchanged).
+    """
+    rows = conflict_rows(conflicts, eligibility)
+    if not rows.shape[0]:
+        return matrix, rhs, None
+    upper = np.concatenate([rhs, np.ones(rows.shape[0])])
+    rhs = np.concatenate([rhs, np.full(rows.shape[0], -np.inf)])
+    return vstack([matrix, rows]).tocsr(), rhs, upper